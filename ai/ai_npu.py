@@ -1,20 +1,26 @@
 # -------------------------------------------------------------------
 # To test API endpoints
 # 1. Get you Gemini API key and copy to .env file
-# 2. pip3 install uvicorn fastapi python-dotenv requests
+# 2. pip3 install uvicorn fastapi python-dotenv "httpx[http2]"
 # 3. python3 -m uvicorn ai_npu:app --reload --host 0.0.0.0
 # 4. Swagger UI: http://127.0.0.1:8000/docs
+#
+# Offline: run the stand-in Gemini server (see stub_gemini.py) and
+# point GEMINI_BASE_URL at it, or replay recorded responses with
+# GEMINI_FIXTURE_MODE=replay (see llm_fixtures.py, bench_nlu.py).
 # -------------------------------------------------------------------
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List,Optional,Dict
 from dotenv import load_dotenv
 from datetime import datetime
+import asyncio
 import os
 import json
+import time
 import traceback
-import requests
 #import google.generativeai as gemini
 #import openai
 
@@ -22,12 +28,67 @@ load_dotenv()
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
 #gemini.configure(api_key=GEMINI_KEY)
 
+# These read their settings from the environment, so import them after load_dotenv()
+from gazetteer import TRIE_NODE_CODES
+from gazetteer_mmap import gazetteer_from_env
+from gemini_client import GeminiClient
+from llm_fixtures import fixture_client_from_env, RecordReplayClient
+from nlu_cache import cache_from_env, cache_key
+from nlu_metrics import LatencyWindow, PathMetrics
+from partial_json import StreamingSlotParser
+from prompt_builder import (
+    BATCH_RESPONSE_SCHEMA, batch_schema_example, build_payload, build_prompt,
+    prompt_tokens_from_response, PromptStats,
+)
+from resilience import CircuitBreaker, CircuitOpenError, Hedger
+from nlu_batch import build_batch_prompt, estimate_tokens, pack_chunks, split_batch_response
+from session_store import merge_slots, new_session, session_store_from_env, SqliteSessionStore
+from singleflight import SingleFlight
+from slot_extractor import extract_single_slot, extract_slots, is_new_topic, missing_slots
+
+# Minimum rule-based extraction score that skips the LLM (see slot_extractor.py)
+NLU_FASTPATH_THRESHOLD = float(os.getenv("NLU_FASTPATH_THRESHOLD", "0.7"))
+
+# Hard deadline for one LLM answer (including a hedged retry); past it we use the local fallback
+NLU_LLM_DEADLINE_MS = float(os.getenv("NLU_LLM_DEADLINE_MS", "8000"))
+
 app = FastAPI (
         title = "TWOS AI NPU Testing",
         description="AI-powered Travel planner",
         version="1.0.0"
     )
 
+# One pooled client per worker, shared by every request (wrapped for record/replay when enabled)
+gemini_client = fixture_client_from_env(GeminiClient(GEMINI_KEY))
+nlu_cache = cache_from_env()
+parse_metrics = PathMetrics()
+sessions = session_store_from_env()
+
+# Upstream latency budget: hedge slow calls, stop calling Gemini while it is failing
+llm_latency = LatencyWindow()
+breaker = CircuitBreaker()
+hedger = Hedger(llm_latency)
+prompt_stats = PromptStats()
+
+# Airport / alias / amenity tables, memory-mapped and shared by all workers
+gazetteer = gazetteer_from_env()
+
+# Identical concurrent prompts / messages share one in-flight call
+gemini_flight = SingleFlight("gemini")
+parse_flight = SingleFlight("parse")
+
+@app.on_event("startup")
+async def startup_event():
+    await gemini_client.start()
+    if isinstance(sessions, SqliteSessionStore):
+        await sessions.purge_expired()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await gemini_client.aclose()
+    await nlu_cache.close()
+    await sessions.close()
+
 #-------------------
 # BaseModel classes
 #-------------------
@@ -58,23 +119,47 @@ class Slots(BaseModel):
 # User's text(natural language). For example, “SF to Doha Nov 10–15…”
 class Request(BaseModel):
     message : str           # {"message": “SF to Doha Nov 10–15…” }
+    session_id: Optional[str] = None    # conversation whose slots this message adds to
 
 # Body for response from AI model
 class ParseResponse(BaseModel):
     slots : Slots
     missing: List[str]              # list of slots that were not filled yet
     confidence: Dict[str,float] = {}
+    source: str = "llm"             # "rules" when the local extractor answered without the LLM,
+                                    # "session" when a clarify answer was merged into the conversation,
+                                    # "fallback" when Gemini was unavailable and the local extractor was used
+
+# nlu/parse_batch endpoint body, e.g. historical chat logs to backfill
+class BatchRequest(BaseModel):
+    messages: List[str]
+
+# One ParseResponse per message, in request order
+class BatchResponse(BaseModel):
+    results: List[ParseResponse]
 
 # nlu/clarify endpoint body
 class ClarifyRequest(BaseModel):
     missing: List[str]
     received: Optional[Slots] = None
+    session_id: Optional[str] = None
     
 # nlu/clarify enpoints response body | Relies from backend to frontend(user UI)
 class ClarifyResponse(BaseModel):
     question: str
     options: Optional[List[str]] = None
 
+# One /nlu/airports/autocomplete suggestion
+class AirportSuggestion(BaseModel):
+    code: str
+    name: str
+    city: str
+    country: str
+
+class AutocompleteResponse(BaseModel):
+    query: str
+    results: List[AirportSuggestion]
+
 # /preference/update endpoint body
 class PreferenceUpdate(BaseModel):
     userID : str
@@ -84,69 +169,70 @@ class PreferenceUpdate(BaseModel):
 # -------------------------------------
 # AI - Gemini to Parse User's request
 # -------------------------------------
-def call_gemini(user_message: str) -> dict:    
-        
-    schema_body = {
-            "slots": {
-                    "origin": "SFO",
-                    "destination": "DOH",
-                    "dates": {"start": "2025-11-10", "end":"2025-11-20"},
-                    "pax": {"adults": 1},
-                    "budget": 1500,
-                    "hotel": {"amenities": ["breakfast", "pool"]},
-                    "car" : False
-                    },
-            "missing": ["car"],
-            "confidence": {
-                    "origin": 0.9,
-                    "destination": 0.9,
-                    "dates": 0.9,
-                    "pax": 0.9,
-                    "budget": 0.9,
-                    "hotel": 0.9
-                    }
-            }
+async def request_gemini(payload: dict) -> dict:
+    started = time.perf_counter()
+    response = await gemini_client.generate_content(payload)
+    raw_json_string = response['candidates'][0]['content']['parts'][0]['text']
+    result = json.loads(raw_json_string)
+    llm_latency.observe((time.perf_counter() - started) * 1000)
+    prompt_stats.observe(payload["contents"][0]["parts"][0]["text"], prompt_tokens_from_response(response))
+    return result
+
+# request_gemini() behind the circuit breaker, the hedger and the per-request deadline
+async def guarded_request(payload: dict, hedge: bool = True) -> dict:
+    if not breaker.allow():
+        raise CircuitOpenError("Gemini circuit breaker is open")
+
+    try:
+        call = hedger.run(lambda: request_gemini(payload)) if hedge else request_gemini(payload)
+        result = await asyncio.wait_for(call, NLU_LLM_DEADLINE_MS / 1000)
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # Cancelled: says nothing about Gemini, but a half-open probe must not stay taken
+        breaker.release_probe()
+        raise
+
+    breaker.record_success()
+    return result
+
+# Degraded answer from the local extractor when Gemini is unavailable
+def fallback_result(message: str) -> dict:
+    result = dict(extract_slots(message).result)
+    result["source"] = "fallback"
+    return result
+
+async def call_gemini(user_message: str) -> dict:
 
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    prompt = (
-        f"You are a helpful travel assistant. Your task is to extract travel information from the user's message. "
-        f"The current date is {current_date}. Respond ONLY with valid JSON that matches this schema.\n"
-        "Do NOT add any extra text, markdown, or code fences.\n\n"
-        f"Schema example:\n{json.dumps(schema_body, indent=2)}\n\n"
-        f'User message: "{user_message}"\n\n'
-        "JSON Response:"
-    )
+    # Near-identical messages asked on the same day share one LLM round trip
+    key = cache_key(user_message, current_date)
+    cached = await nlu_cache.get(key)
+    if cached is not None:
+        return cached
 
-    API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_KEY}"
-    headers = {'Content-Type': 'application/json'}
-    payload = {
-        "contents": [{
-            "parts": [{"text": prompt}]
-        }],
-        "generationConfig": {
-            "response_mime_type": "application/json",
-        }
-    }
+    prompt_stats.observe_message(user_message)
+    payload = build_payload(build_prompt(user_message, current_date))
 
     try:
         # AI_model = gemini.GenerativeModel("gemini-1.5-flash", generation_config={"response_mime_type":"application/json"})
         # response = AI_model.generate_content(prompt)
-        response = requests.post(API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-
-        raw_json_string = response.json()['candidates'][0]['content']['parts'][0]['text']
-        return json.loads(raw_json_string)
-    
+        result = await gemini_flight.do(key, lambda: guarded_request(payload))
+        await nlu_cache.set(key, result)
+        return result
 
+    except CircuitOpenError:
+        return fallback_result(user_message)
 
     except Exception as e:
         print(f"--- GEMINI PARSE ERROR ---")
         traceback.print_exc()
         print(f"--------------------------")
-       
-        # Return an empty structure on failure
-        return {"slots": {}, "missing": [], "confidence": {}}
+
+        # Fall back to whatever the local extractor could find
+        return fallback_result(user_message)
 
 
 #----------
@@ -162,11 +248,32 @@ def root():
 def health():
     return {"Live": True, "mode": "AI"}
 
-# Parse the user's request (natural language text)
-@app.post("/nlu/parse", response_model = ParseResponse)
-def parse(request: Request):
-    result = call_gemini(request.message)
-    
+# Cache and pipeline counters
+@app.get("/nlu/metrics")
+def metrics():
+    parse_summary = parse_metrics.summary()
+    total = parse_summary["total"]
+    offloaded = sum(parse_metrics.count(path) for path in ("rules", "rules_stream", "session"))
+    parse_summary["llm_offload_rate"] = round(offloaded / total, 4) if total else 0.0
+    llm_fixtures = gemini_client.stats() if isinstance(gemini_client, RecordReplayClient) else {"mode": "off"}
+    return {
+        "cache": nlu_cache.stats(),
+        "parse": parse_summary,
+        "coalescing": {"parse": parse_flight.stats(), "gemini": gemini_flight.stats()},
+        "llm": {
+            "latency": llm_latency.summary(),
+            "breaker": breaker.stats(),
+            "hedging": hedger.stats(),
+            "deadline_ms": NLU_LLM_DEADLINE_MS,
+            "fixtures": llm_fixtures,
+            "prompt": prompt_stats.summary(),
+        },
+    }
+
+# Validate a call_gemini()-shaped dict into the response model
+def build_parse_response(result: dict, source: str) -> ParseResponse:
+    # Places become canonical IATA codes (or missing) and amenities canonical names, whichever path produced them
+    result = gazetteer.validate_slots(result)
     slots_dict = result.get("slots", {})
     missing = result.get("missing", [])
     confidence = result.get("confidence", {})
@@ -177,10 +284,216 @@ def parse(request: Request):
         print("SLOTS PARSE ERROR", repr(e), "payload", slots_dict)
         slots = Slots()
 
-    return ParseResponse(slots=slots, missing=missing, confidence=confidence)
+    source = result.get("source", source)
+    return ParseResponse(slots=slots, missing=missing, confidence=confidence, source=source)
+
+# Parse the user's request (natural language text)
+async def parse_message(message: str) -> ParseResponse:
+    # Cheap deterministic pass first; only ambiguous messages go to Gemini
+    extraction = extract_slots(message)
+    if extraction.score >= NLU_FASTPATH_THRESHOLD:
+        return build_parse_response(extraction.result, "rules")
+
+    return build_parse_response(await call_gemini(message), "llm")
+
+# One turn of a conversation: clarify answers are merged into the stored slots,
+# the full parse only runs for the first message or when the user changes topic
+async def parse_in_session(session_id: str, message: str) -> ParseResponse:
+    state = await sessions.get(session_id) or new_session()
+    pending = state.get("pending")
+    extraction = extract_slots(message)
+
+    patch = None
+    if pending and state["slots"] and not is_new_topic(pending, extraction.result["slots"]):
+        patch = extract_single_slot(pending, message)
+
+    if patch is not None:
+        state["slots"] = merge_slots(state["slots"], patch)
+        state["confidence"][pending] = 0.95
+        source = "session"
+    else:
+        key = cache_key(message, datetime.now().strftime("%Y-%m-%d"))
+        response = await parse_flight.do(key, lambda: parse_message(message))
+        if state["slots"] and not is_new_topic(pending, response.slots.dict()):
+            state["slots"] = merge_slots(state["slots"], response.slots.dict())
+            state["confidence"].update(response.confidence)
+        else:
+            state["slots"], state["confidence"] = response.slots.dict(), dict(response.confidence)
+        source = response.source
+
+    state["pending"] = None
+    await sessions.set(session_id, state)
+
+    result = {"slots": state["slots"], "missing": missing_slots(state["slots"]), "confidence": state["confidence"]}
+    return build_parse_response(result, source)
+
+@app.post("/nlu/parse", response_model = ParseResponse)
+async def parse(request: Request):
+    started = time.perf_counter()
+
+    if request.session_id:
+        response = await parse_in_session(request.session_id, request.message)
+    else:
+        key = cache_key(request.message, datetime.now().strftime("%Y-%m-%d"))
+        response = await parse_flight.do(key, lambda: parse_message(request.message))
+
+    parse_metrics.observe(response.source, (time.perf_counter() - started) * 1000)
+    return response
+
+# Iterate an async generator, giving up once the overall deadline has passed
+async def with_deadline(stream, timeout: float):
+    deadline = time.perf_counter() + timeout
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                yield await asyncio.wait_for(stream.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+    finally:
+        await stream.aclose()
+
+# Server-sent events: one "slot" event per slot as soon as it is known, then the validated "result"
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_parse_events(message: str):
+    started = time.perf_counter()
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    extraction = extract_slots(message)
+    if extraction.score >= NLU_FASTPATH_THRESHOLD:
+        result, source = extraction.result, "rules"
+    else:
+        key = cache_key(message, current_date)
+        result, source = await nlu_cache.get(key), "llm"
+
+    if result is None and not breaker.allow():
+        result = fallback_result(message)
+
+    if result is not None:
+        for slot, value in result.get("slots", {}).items():
+            yield sse_event("slot", {"slot": slot, "value": value})
+    else:
+        parser = StreamingSlotParser()
+        emitted = set()
+        try:
+            prompt = build_prompt(message, current_date)
+            prompt_stats.observe_message(message)
+            prompt_stats.observe(prompt)
+            stream = gemini_client.stream_generate_content(build_payload(prompt))
+            async for fragment in with_deadline(stream, NLU_LLM_DEADLINE_MS / 1000):
+                for slot, value in parser.feed(fragment):
+                    emitted.add(slot)
+                    yield sse_event("slot", {"slot": slot, "value": value})
+            result = json.loads(parser.text)
+            breaker.record_success()
+            await nlu_cache.set(key, result)
+        except Exception:
+            breaker.record_failure()
+            print(f"--- GEMINI STREAM PARSE ERROR ---")
+            traceback.print_exc()
+            print(f"---------------------------------")
+            result = fallback_result(message)
+            for slot, value in result["slots"].items():
+                if slot not in emitted:
+                    yield sse_event("slot", {"slot": slot, "value": value})
+        except BaseException:
+            # Client disconnected mid-stream (GeneratorExit) or the task was cancelled
+            breaker.release_probe()
+            raise
+
+    # response.source is "fallback" when the breaker or a failed stream fell back to rules
+    response = build_parse_response(result, source)
+    parse_metrics.observe(f"{response.source}_stream", (time.perf_counter() - started) * 1000)
+    yield sse_event("result", response.dict())
+
+@app.post("/nlu/parse/stream")
+async def parse_stream(request: Request):
+    return StreamingResponse(
+        stream_parse_events(request.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Many messages at once, packed into as few Gemini calls as the token budget allows
+async def call_gemini_batch(items: Dict[int, str], current_date: str) -> Dict[int, Optional[dict]]:
+    payload = build_payload(
+        build_batch_prompt(items, current_date, batch_schema_example()), response_schema=BATCH_RESPONSE_SCHEMA
+    )
+
+    try:
+        # Batch prompts are large, so no hedged duplicate; breaker and deadline still apply
+        parsed = await guarded_request(payload, hedge=False)
+    except CircuitOpenError:
+        return {item_id: None for item_id in items}
+    except Exception:
+        print(f"--- GEMINI BATCH PARSE ERROR ---")
+        traceback.print_exc()
+        print(f"--------------------------------")
+        return {item_id: None for item_id in items}
+
+    return split_batch_response(parsed, list(items))
+
+@app.post("/nlu/parse_batch", response_model=BatchResponse)
+async def parse_batch(request: BatchRequest):
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    results: Dict[int, ParseResponse] = {}
+    pending: Dict[int, str] = {}
+    keys: Dict[int, str] = {}
+    first_by_key: Dict[str, int] = {}
+
+    for i, message in enumerate(request.messages):
+        extraction = extract_slots(message)
+        if extraction.score >= NLU_FASTPATH_THRESHOLD:
+            results[i] = build_parse_response(extraction.result, "rules")
+            continue
+
+        keys[i] = cache_key(message, current_date)
+        if keys[i] in first_by_key:
+            continue    # duplicate inside this batch, copied from the first one below
+        first_by_key[keys[i]] = i
+
+        cached = await nlu_cache.get(keys[i])
+        if cached is not None:
+            results[i] = build_parse_response(cached, "llm")
+        else:
+            pending[i] = message
+
+    overhead = estimate_tokens(build_batch_prompt({}, current_date, batch_schema_example()))
+    chunks = pack_chunks(pending, overhead)
+    chunk_results = await asyncio.gather(
+        *[call_gemini_batch({i: pending[i] for i in chunk}, current_date) for chunk in chunks]
+    )
+
+    for chunk_result in chunk_results:
+        for i, item in chunk_result.items():
+            if item is None:
+                # Same fallback as parse() when Gemini fails
+                results[i] = build_parse_response(fallback_result(pending[i]), "fallback")
+                continue
+            item.pop("id", None)
+            await nlu_cache.set(keys[i], item)
+            results[i] = build_parse_response(item, "llm")
+
+    for i, key in keys.items():
+        if i not in results:
+            results[i] = results[first_by_key[key]]
+
+    return BatchResponse(results=[results[i] for i in range(len(request.messages))])
 
 @app.post("/nlu/clarify", response_model=ClarifyResponse)
-def clarify(request: ClarifyRequest):
+async def clarify(request: ClarifyRequest):
+
+    # Remember what we are about to ask so the answer can be merged without a full parse
+    if request.session_id:
+        state = await sessions.get(request.session_id) or new_session()
+        if request.received is not None:
+            state["slots"] = merge_slots(state["slots"], request.received.dict())
+        state["pending"] = request.missing[0] if request.missing else None
+        await sessions.set(request.session_id, state)
 
     #If there is no missing information
     if not request.missing:
@@ -199,6 +512,15 @@ def clarify(request: ClarifyRequest):
     missing_info = request.missing[0]
     return ClarifyResponse(question=missing_info_map.get(missing_info, f"Could you provide {missing_info}?"))
 
+# Airport suggestions for the origin/destination inputs; the trie keeps at most TRIE_NODE_CODES per prefix
+@app.get("/nlu/airports/autocomplete", response_model=AutocompleteResponse)
+def airports_autocomplete(q: str, limit: int = Query(TRIE_NODE_CODES, ge=1, le=TRIE_NODE_CODES)):
+    results = [
+        AirportSuggestion(code=a.code, name=a.name, city=a.city, country=a.country)
+        for a in gazetteer.autocomplete(q, limit)
+    ]
+    return AutocompleteResponse(query=q, results=results)
+
 """
 @app.post("/preference/update")
 def preference_update(request: PreferenceUpdate): 
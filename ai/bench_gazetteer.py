@@ -0,0 +1,149 @@
+# -------------------------------------------------------------------
+# Startup time and memory per worker: per-process gazetteer tables
+# (NLU_GAZETTEER_BACKEND=memory) vs the shared memory-mapped file.
+#
+# Starts --workers processes per backend, waits until all of them have
+# loaded the tables and run a few lookups, then has each one report
+# from /proc/self/smaps_rollup (Linux): RSS, PSS (shared pages divided
+# among the processes mapping them) and private anonymous memory.
+#
+# Usage:
+#   python3 bench_gazetteer.py [--workers 4] [--synthetic 15000]
+#
+# --synthetic N benchmarks a generated N-airport dataset instead of the
+# bundled one, to see how both layouts scale.
+# -------------------------------------------------------------------
+
+from typing import Dict, List
+import argparse
+import itertools
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+QUERIES = ["Doha", "san fran", "heathr", "new yrok", "par", "JFK", "tok", "frankfort"]
+
+
+def smaps_rollup() -> Dict[str, int]:
+    """kB values of the current process from /proc/self/smaps_rollup."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def worker():
+    # Baseline after interpreter + module imports, before any tables are built
+    import gazetteer_mmap
+    baseline = smaps_rollup()
+
+    started = time.perf_counter()
+    gazetteer = gazetteer_mmap.gazetteer_from_env()
+    startup_ms = (time.perf_counter() - started) * 1000
+    for query in QUERIES:
+        gazetteer.resolve(query)
+        gazetteer.autocomplete(query)
+
+    print("ready", flush=True)
+    sys.stdin.readline()            # parent says "measure" once every worker is loaded
+    memory = smaps_rollup()
+    print(json.dumps({
+        "startup_ms": round(startup_ms, 2),
+        "rss_kb": memory["Rss"] - baseline["Rss"],
+        "pss_kb": memory["Pss"] - baseline["Pss"],
+        "private_anon_kb": memory.get("Pss_Anon", memory["Private_Dirty"]) - baseline.get("Pss_Anon", baseline["Private_Dirty"]),
+    }), flush=True)
+    sys.stdin.readline()            # stay alive (and mapped) until the parent closes stdin
+
+
+def synthetic_airports(path: str, count: int):
+    codes = ["".join(c) for c in itertools.product(string.ascii_uppercase, repeat=3)]
+    random.Random(7).shuffle(codes)
+    if count > len(codes):
+        raise SystemExit(f"--synthetic is limited to {len(codes)} airports (unique 3-letter codes)")
+
+    rng = random.Random(11)
+    syllables = ["ka", "lo", "ri", "san", "ter", "mo", "vil", "port", "ben", "dor", "al", "es", "ton", "ville", "burg"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("iata,name,city,country,lat,lon\n")
+        for code in codes[:count]:
+            city = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+            name = f"{city} {rng.choice(['International', 'Regional', 'Municipal', 'City'])} Airport"
+            f.write(f"{code},{name},{city},XX,{rng.uniform(-60, 70):.4f},{rng.uniform(-180, 180):.4f}\n")
+
+
+def run_backend(backend: str, workers: int, env: Dict[str, str]) -> List[dict]:
+    env = dict(env, NLU_GAZETTEER_BACKEND=backend)
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker"], env=env, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            proc.stdout.readline()
+        for proc in procs:
+            proc.stdin.write("measure\n")
+            proc.stdin.flush()
+        return [json.loads(proc.stdout.readline()) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+
+
+def summarize(results: List[dict]) -> dict:
+    n = len(results)
+    return {
+        "workers": n,
+        "startup_ms_avg": round(sum(r["startup_ms"] for r in results) / n, 2),
+        "rss_kb_avg": round(sum(r["rss_kb"] for r in results) / n),
+        "pss_kb_avg": round(sum(r["pss_kb"] for r in results) / n),
+        "pss_kb_total": sum(r["pss_kb"] for r in results),
+        "private_anon_kb_avg": round(sum(r["private_anon_kb"] for r in results) / n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gazetteer memory / startup benchmark")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many airports instead of the bundled CSV")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, NLU_GAZETTEER_PATH=os.path.join(tmp, "gazetteer.bin"))
+        if args.synthetic:
+            env["NLU_AIRPORTS_PATH"] = os.path.join(tmp, "airports.csv")
+            synthetic_airports(env["NLU_AIRPORTS_PATH"], args.synthetic)
+
+        # First mmap worker builds the file; time only attaching to an existing one
+        subprocess.run(
+            [sys.executable, "-c", "import gazetteer_mmap; gazetteer_mmap.gazetteer_from_env()"],
+            env=env, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        report = {
+            "airports": args.synthetic or "bundled",
+            "memory": summarize(run_backend("memory", args.workers, env)),
+            "mmap": summarize(run_backend("mmap", args.workers, env)),
+            "file_bytes": os.path.getsize(env["NLU_GAZETTEER_PATH"]),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
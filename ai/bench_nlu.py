@@ -0,0 +1,131 @@
+# -------------------------------------------------------------------
+# Offline load test for the NLU pipeline.
+#
+# Drives ai_npu.app in-process (httpx ASGITransport, no sockets) or a
+# running server (--url) at a fixed concurrency and reports req/s,
+# p50/p95/p99 latency, prompt size and the cache / fast-path hit
+# rates from /nlu/metrics, so a change to caching, batching, prompts
+# or the rule-based extractor can be measured before it ships.
+#
+# Reproducible runs without network access:
+#   1. record once against Gemini (or stub_gemini.py):
+#        GEMINI_FIXTURE_MODE=record python3 bench_nlu.py
+#   2. replay with a fixed synthetic upstream latency:
+#        GEMINI_FIXTURE_MODE=replay GEMINI_REPLAY_LATENCY_MS=600 python3 bench_nlu.py
+#
+# Usage:
+#   python3 bench_nlu.py [--requests 500] [--concurrency 32]
+#                        [--messages file.txt] [--url http://127.0.0.1:8000]
+# -------------------------------------------------------------------
+
+from typing import List
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from nlu_metrics import percentile
+
+# Mix of messages the rule-based path settles and ones it leaves to the LLM
+DEFAULT_MESSAGES = [
+    "SFO to Doha from 2025-12-01 to 2025-12-08 for 2 adults, budget $3000, need a car",
+    "Flying from New York to London Dec 3 - Dec 10, 1 adult, hotel with pool and wifi",
+    "LAX -> NRT 2026-03-10 to 2026-03-20, 2 adults 1 child, under 4000 dollars",
+    "Paris to Rome next month for a week, just me",
+    "I want somewhere warm in February with my wife, nothing too pricey",
+    "Book me a beach holiday, kids are 5 and 8, we leave from Chicago",
+    "Thinking about Tokyo or Seoul in spring, maybe two weeks, around 5k",
+    "Weekend getaway from Boston, anywhere with good food",
+    "We need flights and a rental car for a family trip to Orlando in July",
+    "Honeymoon in the Maldives after our wedding on June 14th",
+]
+
+
+def load_messages(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_client(url: str) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+
+    # In-process: import here so GEMINI_FIXTURE_MODE etc. are read from this process's environment
+    import ai_npu
+    transport = httpx.ASGITransport(app=ai_npu.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+
+async def run(messages: List[str], requests: int, concurrency: int, url: str) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(messages[i % len(messages)])
+
+    async with make_client(url) as client:
+        if not url:
+            import ai_npu
+            await ai_npu.startup_event()
+
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    message = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/nlu/parse", json={"message": message})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        server_metrics = (await client.get("/nlu/metrics")).json()
+        if not url:
+            await ai_npu.shutdown_event()
+
+    latencies.sort()
+    parse = server_metrics["parse"]
+    total = parse["total"]
+    rules = parse["paths"].get("rules", {}).get("count", 0)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "cache_hit_rate": server_metrics["cache"].get("hit_rate", 0.0),
+        "fastpath_hit_rate": round(rules / total, 4) if total else 0.0,
+        "llm_offload_rate": parse.get("llm_offload_rate", 0.0),
+        "prompt_tokens": server_metrics["llm"]["prompt"]["estimated_prompt_tokens"],
+        "fixtures": server_metrics["llm"].get("fixtures"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLU /nlu/parse load test")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--messages", help="file with one chat message per line")
+    parser.add_argument("--url", default="", help="benchmark a running server instead of the in-process app")
+    args = parser.parse_args()
+
+    messages = load_messages(args.messages) if args.messages else DEFAULT_MESSAGES
+    report = asyncio.run(run(messages, args.requests, args.concurrency, args.url))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
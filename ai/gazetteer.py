@@ -0,0 +1,321 @@
+# -------------------------------------------------------------------
+# Airport / city gazetteer: canonical IATA codes for free-form places.
+#
+# Built from the bundled data/airports.csv (row order is the ranking:
+# the first airport listed for a city is its primary one) plus the
+# city aliases and amenity synonyms in slot_extractor. Lookups go
+# exact name -> prefix -> trigram fuzzy match, so "DOH", "Doha",
+# "heathr" and "san fransisco" all resolve without an LLM call.
+#
+# BaseGazetteer holds the lookup logic; Gazetteer keeps the tables as
+# Python objects, gazetteer_mmap.MappedGazetteer reads them from a
+# shared memory-mapped file.
+#
+# Settings (environment):
+#   NLU_AIRPORTS_PATH       airport CSV, default data/airports.csv next to this file
+#   NLU_GAZETTEER_FUZZY_MIN minimum trigram similarity for a fuzzy match, default 0.45
+# -------------------------------------------------------------------
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import csv
+import os
+import re
+import unicodedata
+
+from slot_extractor import AMENITY_LOOKUP, CITY_AIRPORTS
+
+NLU_AIRPORTS_PATH = os.getenv(
+    "NLU_AIRPORTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "airports.csv")
+)
+NLU_GAZETTEER_FUZZY_MIN = float(os.getenv("NLU_GAZETTEER_FUZZY_MIN", "0.45"))
+
+# Codes kept per trie node; also the largest autocomplete page
+TRIE_NODE_CODES = 10
+
+# Words that never start an autocomplete key ("international ..." should not match everything)
+NAME_STOPWORDS = {"international", "airport", "airfield", "intercontinental", "regional", "of", "de", "the", "and"}
+
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+CODE_RE = re.compile(r"[A-Za-z]{3}")
+
+
+class Airport(NamedTuple):
+    code: str
+    name: str
+    city: str
+    country: str
+    lat: float
+    lon: float
+
+
+class Resolution(NamedTuple):
+    code: str
+    method: str     # "code" | "exact" | "prefix" | "fuzzy"
+    score: float    # 1.0 for exact matches, trigram similarity for fuzzy ones
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, strip accents and punctuation: "São Paulo-Guarulhos" -> "sao paulo guarulhos"."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def load_airports(path: str = NLU_AIRPORTS_PATH) -> List[Airport]:
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            Airport(row["iata"].upper(), row["name"], row["city"], row["country"], float(row["lat"]), float(row["lon"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+def exact_keys(airport: Airport) -> Iterable[str]:
+    yield airport.code.lower()
+    yield normalize_place(airport.city)
+    yield normalize_place(airport.name)
+
+
+def autocomplete_keys(airport: Airport) -> Iterable[str]:
+    yield airport.code.lower()
+    yield normalize_place(airport.city)
+    # Every word of the airport name can start a match: "kennedy" -> JFK, "heathrow" -> LHR
+    words = normalize_place(airport.name).split()
+    for start, word in enumerate(words):
+        if word not in NAME_STOPWORDS:
+            yield " ".join(words[start:])
+
+
+def name_table(airports: List[Airport], aliases: Dict[str, str]) -> Dict[str, int]:
+    """Every exact-match key -> rank of the best airport for it."""
+    rank = {airport.code: i for i, airport in enumerate(airports)}
+    names: Dict[str, int] = {}
+    for i, airport in enumerate(airports):
+        for key in exact_keys(airport):
+            names.setdefault(key, i)
+    for alias, code in aliases.items():
+        if code in rank:
+            names[normalize_place(alias)] = rank[code]
+    return names
+
+
+def prefix_entries(airports: List[Airport], aliases: Dict[str, str]) -> Iterable[Tuple[str, int]]:
+    """(autocomplete key, airport rank) pairs."""
+    rank = {airport.code: i for i, airport in enumerate(airports)}
+    for i, airport in enumerate(airports):
+        for key in autocomplete_keys(airport):
+            yield key, i
+    for alias, code in aliases.items():
+        if code in rank:
+            yield normalize_place(alias), rank[code]
+
+
+class BaseGazetteer:
+    """Resolve / autocomplete / validate on top of a handful of storage primitives."""
+
+    def airport(self, rank: int) -> Airport:
+        raise NotImplementedError
+
+    def code_rank(self, code: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _exact(self, key: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _prefix(self, key: str) -> List[int]:
+        """Best-ranked airports (at most TRIE_NODE_CODES) with a key starting with `key`."""
+        raise NotImplementedError
+
+    def _postings(self, gram: str) -> Iterable[int]:
+        """Ids of the exact-match keys containing trigram `gram`."""
+        raise NotImplementedError
+
+    def _key_info(self, key_id: int) -> Tuple[int, int]:
+        """(trigram count, airport rank) of an exact-match key."""
+        raise NotImplementedError
+
+    def canonical_amenity(self, phrase: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _fuzzy(self, key: str, limit: int) -> List[Tuple[float, int]]:
+        """(similarity, airport rank) for the keys sharing the most trigrams with `key`."""
+        grams = set(trigrams(key))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for key_id in self._postings(gram):
+                shared[key_id] += 1
+
+        best: Dict[int, float] = {}
+        for key_id, count in shared.items():
+            key_grams, rank = self._key_info(key_id)
+            # Dice coefficient over trigram sets
+            score = 2 * count / (len(grams) + key_grams)
+            if score > best.get(rank, 0.0):
+                best[rank] = score
+        return sorted(((score, rank) for rank, score in best.items()), key=lambda item: (-item[0], item[1]))[:limit]
+
+    def get(self, code: str) -> Optional[Airport]:
+        rank = self.code_rank(code)
+        return self.airport(rank) if rank is not None else None
+
+    def resolve(self, text: str) -> Optional[Resolution]:
+        """Best airport for a place the user (or the LLM) typed, or None."""
+        if not text:
+            return None
+        stripped = text.strip()
+        if len(stripped) == 3:
+            rank = self.code_rank(stripped)
+            if rank is not None:
+                return Resolution(self.airport(rank).code, "code", 1.0)
+
+        key = normalize_place(stripped)
+        if not key:
+            return None
+        rank = self._exact(key)
+        if rank is not None:
+            return Resolution(self.airport(rank).code, "exact", 1.0)
+
+        if len(key) >= 3:
+            ranks = self._prefix(key)
+            if ranks:
+                return Resolution(self.airport(ranks[0]).code, "prefix", 0.9)
+
+        matches = self._fuzzy(key, 1)
+        if matches and matches[0][0] >= NLU_GAZETTEER_FUZZY_MIN:
+            score, rank = matches[0]
+            return Resolution(self.airport(rank).code, "fuzzy", round(score, 3))
+        return None
+
+    def autocomplete(self, query: str, limit: int = TRIE_NODE_CODES) -> List[Airport]:
+        """Airports whose code, city or name starts with `query`, topped up with fuzzy matches."""
+        limit = min(limit, TRIE_NODE_CODES)
+        key = normalize_place(query)
+        if not key:
+            return []
+
+        ranks = list(self._prefix(key)[:limit])
+        if len(ranks) < limit and len(key) >= 3:
+            for score, rank in self._fuzzy(key, limit):
+                if score >= NLU_GAZETTEER_FUZZY_MIN and rank not in ranks:
+                    ranks.append(rank)
+        return [self.airport(rank) for rank in ranks[:limit]]
+
+    def validate_slots(self, result: dict) -> dict:
+        """Canonicalize places and hotel amenities of a call_gemini()-shaped dict.
+
+        Resolvable places become IATA codes; unknown 3-letter codes are kept at
+        reduced confidence; anything else is cleared and reported as missing.
+        Amenity phrases map to their canonical names ("free wi-fi" -> "wifi").
+        """
+        slots = dict(result.get("slots") or {})
+        confidence = dict(result.get("confidence") or {})
+        missing = list(result.get("missing") or [])
+
+        for slot in ("origin", "destination"):
+            value = slots.get(slot)
+            if not isinstance(value, str) or not value.strip():
+                continue
+
+            resolution = self.resolve(value)
+            if resolution is not None:
+                slots[slot] = resolution.code
+                confidence[slot] = round(min(confidence.get(slot, 1.0), resolution.score), 3)
+            elif CODE_RE.fullmatch(value.strip()):
+                slots[slot] = value.strip().upper()
+                confidence[slot] = min(confidence.get(slot, 1.0), 0.5)
+            else:
+                slots[slot] = None
+                confidence[slot] = 0.0
+                if slot not in missing:
+                    missing.append(slot)
+
+        hotel = slots.get("hotel")
+        if isinstance(hotel, dict) and isinstance(hotel.get("amenities"), list):
+            amenities = []
+            for phrase in hotel["amenities"]:
+                if isinstance(phrase, str):
+                    name = self.canonical_amenity(phrase) or phrase
+                    if name not in amenities:
+                        amenities.append(name)
+            slots["hotel"] = dict(hotel, amenities=amenities)
+
+        validated = dict(result)
+        validated.update(slots=slots, confidence=confidence, missing=missing)
+        return validated
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.codes: List[int] = []      # airport ranks, best first, at most TRIE_NODE_CODES
+
+
+class Gazetteer(BaseGazetteer):
+    """Per-process tables: exact names, a prefix trie and a trigram index."""
+
+    def __init__(self, airports: List[Airport], aliases: Dict[str, str], amenities: Optional[Dict[str, str]] = None):
+        self.airports = airports
+        self.rank = {airport.code: i for i, airport in enumerate(airports)}
+        self.names = name_table(airports, aliases)
+        self.amenities = {normalize_place(p): name for p, name in (amenities or {}).items()}
+
+        self._root = _TrieNode()
+        for key, rank in prefix_entries(airports, aliases):
+            self._insert(key, rank)
+
+        self._keys = list(self.names)
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+        self._key_trigrams: List[int] = []
+        for key_id, key in enumerate(self._keys):
+            grams = set(trigrams(key))
+            self._key_trigrams.append(len(grams))
+            for gram in grams:
+                self._trigram_index[gram].append(key_id)
+
+    @classmethod
+    def from_csv(cls, path: str = NLU_AIRPORTS_PATH) -> "Gazetteer":
+        return cls(load_airports(path), CITY_AIRPORTS, AMENITY_LOOKUP)
+
+    def _insert(self, key: str, rank: int):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            codes = node.codes
+            if rank in codes:
+                continue
+            if len(codes) < TRIE_NODE_CODES or rank < codes[-1]:
+                codes.append(rank)
+                codes.sort()
+                del codes[TRIE_NODE_CODES:]
+
+    def airport(self, rank: int) -> Airport:
+        return self.airports[rank]
+
+    def code_rank(self, code: str) -> Optional[int]:
+        return self.rank.get(code.upper())
+
+    def _exact(self, key: str) -> Optional[int]:
+        return self.names.get(key)
+
+    def _prefix(self, key: str) -> List[int]:
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.codes
+
+    def _postings(self, gram: str) -> Iterable[int]:
+        return self._trigram_index.get(gram, ())
+
+    def _key_info(self, key_id: int) -> Tuple[int, int]:
+        return self._key_trigrams[key_id], self.names[self._keys[key_id]]
+
+    def canonical_amenity(self, phrase: str) -> Optional[str]:
+        return self.amenities.get(normalize_place(phrase))
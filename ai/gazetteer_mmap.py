@@ -0,0 +1,397 @@
+# -------------------------------------------------------------------
+# Reference tables (airports, city aliases, amenity synonyms) in one
+# read-only, memory-mapped binary file.
+#
+# Every uvicorn worker maps the same file, so the kernel keeps a
+# single copy of the pages in the page cache instead of each worker
+# building its own dicts, trie and trigram index. Lookups binary-search
+# fixed-width records in place; only the few strings a query touches
+# are materialized as Python objects.
+#
+# The file is rebuilt atomically (write + rename), so workers that
+# already mapped the old version keep using it until they restart.
+#
+#   python3 gazetteer_mmap.py build [--airports data/airports.csv] [--out data/gazetteer.bin]
+#   python3 gazetteer_mmap.py info  [--path data/gazetteer.bin]
+#
+# Settings (environment):
+#   NLU_GAZETTEER_BACKEND  mmap | memory, default mmap
+#   NLU_GAZETTEER_PATH     binary file, default data/gazetteer.bin next to this file
+#                          (built on first start when missing or out of date)
+# -------------------------------------------------------------------
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+from gazetteer import (
+    Airport, BaseGazetteer, Gazetteer, NLU_AIRPORTS_PATH, TRIE_NODE_CODES,
+    load_airports, name_table, normalize_place, prefix_entries, trigrams,
+)
+from slot_extractor import AMENITY_LOOKUP, CITY_AIRPORTS
+
+NLU_GAZETTEER_BACKEND = os.getenv("NLU_GAZETTEER_BACKEND", "mmap")
+NLU_GAZETTEER_PATH = os.getenv(
+    "NLU_GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.bin")
+)
+
+MAGIC = b"TWOSGAZ\0"
+FORMAT_VERSION = 1
+
+# magic, format version, section count, built_at (unix seconds), sha256 of the sources
+HEADER = struct.Struct("<8sIIQ32s")
+# section name, offset, length
+SECTION = struct.Struct("<16sQQ")
+
+# code, country, lat, lon, name (offset, length), city (offset, length)
+AIRPORT_REC = struct.Struct("<3s2s3xffIIII")
+# code, rank
+CODE_REC = struct.Struct("<3sxI")
+# key (offset, length), rank, trigram count
+NAME_REC = struct.Struct("<IIII")
+# key (offset, length), rank
+PREFIX_REC = struct.Struct("<III")
+# short prefix (NUL padded), number of ranks, best ranks
+SHORT_PREFIX_LEN = 3
+SHORT_PREFIX_REC = struct.Struct(f"<{SHORT_PREFIX_LEN}sB{TRIE_NODE_CODES}I")
+# trigram, first posting, posting count
+TRIGRAM_REC = struct.Struct("<3sxII")
+POSTING = struct.Struct("<I")
+# phrase (offset, length), canonical name (offset, length)
+AMENITY_REC = struct.Struct("<IIII")
+
+# Longest run of prefix records scanned for a >3 character prefix
+PREFIX_SCAN_LIMIT = 4096
+
+
+class GazetteerFormatError(Exception):
+    """The file is missing, truncated, or written by another format version."""
+
+
+def source_digest(airports_path: str, aliases: Dict[str, str], amenities: Dict[str, str]) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<I", FORMAT_VERSION))
+    with open(airports_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(aliases, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(amenities, sort_keys=True).encode("utf-8"))
+    return digest.digest()
+
+
+class _StringPool:
+    def __init__(self):
+        self.data = bytearray()
+        self._seen: Dict[bytes, int] = {}
+
+    def add(self, text: str) -> Tuple[int, int]:
+        raw = text.encode("utf-8")
+        offset = self._seen.get(raw)
+        if offset is None:
+            offset = self._seen[raw] = len(self.data)
+            self.data += raw
+        return offset, len(raw)
+
+
+def build_tables(
+    airports: List[Airport],
+    aliases: Dict[str, str],
+    amenities: Dict[str, str],
+    digest: bytes,
+) -> bytes:
+    """Serialize the gazetteer tables into the binary format."""
+    pool = _StringPool()
+
+    airport_section = bytearray()
+    for airport in airports:
+        name, city = pool.add(airport.name), pool.add(airport.city)
+        airport_section += AIRPORT_REC.pack(
+            airport.code.encode("ascii"), airport.country.encode("ascii")[:2],
+            airport.lat, airport.lon, *name, *city,
+        )
+
+    code_section = b"".join(
+        CODE_REC.pack(airport.code.encode("ascii"), rank)
+        for rank, airport in sorted(enumerate(airports), key=lambda item: item[1].code)
+    )
+
+    # Exact-match keys sorted by their bytes; a key's position is its id in the trigram postings
+    names = sorted(name_table(airports, aliases).items(), key=lambda item: item[0].encode("utf-8"))
+    name_section = bytearray()
+    postings: Dict[str, List[int]] = {}
+    for key_id, (key, rank) in enumerate(names):
+        grams = set(trigrams(key))
+        name_section += NAME_REC.pack(*pool.add(key), rank, len(grams))
+        for gram in grams:
+            postings.setdefault(gram, []).append(key_id)
+
+    trigram_section = bytearray()
+    posting_section = bytearray()
+    for gram in sorted(postings, key=lambda g: g.encode("ascii")):
+        ids = postings[gram]
+        trigram_section += TRIGRAM_REC.pack(gram.encode("ascii"), len(posting_section) // POSTING.size, len(ids))
+        posting_section += b"".join(POSTING.pack(key_id) for key_id in ids)
+
+    entries = sorted(set(prefix_entries(airports, aliases)), key=lambda item: (item[0].encode("utf-8"), item[1]))
+    prefix_section = b"".join(PREFIX_REC.pack(*pool.add(key), rank) for key, rank in entries)
+
+    # Short prefixes match too many keys to scan, so their best ranks are precomputed
+    short: Dict[str, List[int]] = {}
+    for key, rank in entries:
+        for length in range(1, min(SHORT_PREFIX_LEN, len(key)) + 1):
+            ranks = short.setdefault(key[:length], [])
+            if rank not in ranks:
+                ranks.append(rank)
+    short_section = bytearray()
+    for prefix in sorted(short, key=lambda p: p.encode("utf-8").ljust(SHORT_PREFIX_LEN, b"\0")):
+        raw = prefix.encode("utf-8")
+        if len(raw) > SHORT_PREFIX_LEN:
+            continue
+        ranks = sorted(short[prefix])[:TRIE_NODE_CODES]
+        padded = ranks + [0] * (TRIE_NODE_CODES - len(ranks))
+        short_section += SHORT_PREFIX_REC.pack(raw, len(ranks), *padded)
+
+    amenity_section = b"".join(
+        AMENITY_REC.pack(*pool.add(phrase), *pool.add(name))
+        for phrase, name in sorted(
+            {normalize_place(p): n for p, n in amenities.items()}.items(), key=lambda item: item[0].encode("utf-8")
+        )
+    )
+
+    sections = [
+        ("airports", bytes(airport_section)),
+        ("codes", code_section),
+        ("names", bytes(name_section)),
+        ("trigrams", bytes(trigram_section)),
+        ("postings", bytes(posting_section)),
+        ("prefixes", prefix_section),
+        ("short_prefixes", bytes(short_section)),
+        ("amenities", amenity_section),
+        ("strings", bytes(pool.data)),
+    ]
+
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), int(time.time()), digest))
+    table_at = len(out)
+    out += b"\0" * (SECTION.size * len(sections))
+    for i, (name, data) in enumerate(sections):
+        out += b"\0" * (-len(out) % 8)
+        SECTION.pack_into(out, table_at + i * SECTION.size, name.encode("ascii"), len(out), len(data))
+        out += data
+    return bytes(out)
+
+
+def build_file(
+    out_path: str = NLU_GAZETTEER_PATH,
+    airports_path: str = NLU_AIRPORTS_PATH,
+    aliases: Dict[str, str] = CITY_AIRPORTS,
+    amenities: Dict[str, str] = AMENITY_LOOKUP,
+) -> str:
+    """Build the binary next to its final path and rename it into place."""
+    digest = source_digest(airports_path, aliases, amenities)
+    data = build_tables(load_airports(airports_path), aliases, amenities, digest)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class _Records:
+    """Fixed-width records of one section, unpacked straight from the mapping."""
+
+    def __init__(self, buf, offset: int, length: int, rec: struct.Struct):
+        self.buf = buf
+        self.offset = offset
+        self.rec = rec
+        self.count = length // rec.size
+
+    def __getitem__(self, i: int) -> tuple:
+        return self.rec.unpack_from(self.buf, self.offset + i * self.rec.size)
+
+    def bisect(self, target: bytes, key) -> int:
+        """First index whose key(record) >= target."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(self[mid]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class MappedGazetteer(BaseGazetteer):
+    """Gazetteer lookups served from a shared read-only mapping of the binary file."""
+
+    def __init__(self, path: str = NLU_GAZETTEER_PATH):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise GazetteerFormatError(f"cannot map {path}: {e}") from e
+
+        if len(self._mm) < HEADER.size:
+            raise GazetteerFormatError(f"{path} is truncated")
+        magic, version, count, self.built_at, self.digest = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise GazetteerFormatError(f"{path} is not a version {FORMAT_VERSION} gazetteer file")
+
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._mm, HEADER.size + i * SECTION.size)
+            if offset + length > len(self._mm):
+                raise GazetteerFormatError(f"{path} is truncated")
+            self.sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+        self._airports = self._records("airports", AIRPORT_REC)
+        self._codes = self._records("codes", CODE_REC)
+        self._names = self._records("names", NAME_REC)
+        self._trigrams = self._records("trigrams", TRIGRAM_REC)
+        self._posting_ids = self._records("postings", POSTING)
+        self._prefixes = self._records("prefixes", PREFIX_REC)
+        self._short = self._records("short_prefixes", SHORT_PREFIX_REC)
+        self._amenities = self._records("amenities", AMENITY_REC)
+        self._strings = self.sections["strings"][0]
+
+    def _records(self, section: str, rec: struct.Struct) -> _Records:
+        if section not in self.sections:
+            raise GazetteerFormatError(f"{self.path} has no {section} section")
+        return _Records(self._mm, *self.sections[section], rec)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings + offset
+        return self._mm[start:start + length]
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self._airports.count
+
+    def airport(self, rank: int) -> Airport:
+        code, country, lat, lon, name_off, name_len, city_off, city_len = self._airports[rank]
+        return Airport(
+            code.decode("ascii"),
+            self._string(name_off, name_len).decode("utf-8"),
+            self._string(city_off, city_len).decode("utf-8"),
+            country.decode("ascii"),
+            round(lat, 4),
+            round(lon, 4),
+        )
+
+    def code_rank(self, code: str) -> Optional[int]:
+        target = code.upper().encode("ascii", "ignore")
+        i = self._codes.bisect(target, lambda rec: rec[0])
+        if i < self._codes.count and self._codes[i][0] == target:
+            return self._codes[i][1]
+        return None
+
+    def _exact(self, key: str) -> Optional[int]:
+        target = key.encode("utf-8")
+        i = self._names.bisect(target, lambda rec: self._string(rec[0], rec[1]))
+        if i < self._names.count:
+            key_off, key_len, rank, _ = self._names[i]
+            if self._string(key_off, key_len) == target:
+                return rank
+        return None
+
+    def _prefix(self, key: str) -> List[int]:
+        target = key.encode("utf-8")
+        if len(target) <= SHORT_PREFIX_LEN:
+            padded = target.ljust(SHORT_PREFIX_LEN, b"\0")
+            i = self._short.bisect(padded, lambda rec: rec[0])
+            if i < self._short.count and self._short[i][0] == padded:
+                record = self._short[i]
+                return list(record[2:2 + record[1]])
+            return []
+
+        ranks = set()
+        i = self._prefixes.bisect(target, lambda rec: self._string(rec[0], rec[1]))
+        for j in range(i, min(i + PREFIX_SCAN_LIMIT, self._prefixes.count)):
+            key_off, key_len, rank = self._prefixes[j]
+            if not self._string(key_off, key_len).startswith(target):
+                break
+            ranks.add(rank)
+        return sorted(ranks)[:TRIE_NODE_CODES]
+
+    def _postings(self, gram: str) -> Iterable[int]:
+        target = gram.encode("ascii", "ignore")
+        i = self._trigrams.bisect(target, lambda rec: rec[0])
+        if i >= self._trigrams.count or self._trigrams[i][0] != target:
+            return ()
+        _, first, count = self._trigrams[i]
+        return [self._posting_ids[first + j][0] for j in range(count)]
+
+    def _key_info(self, key_id: int) -> Tuple[int, int]:
+        _, _, rank, grams = self._names[key_id]
+        return grams, rank
+
+    def canonical_amenity(self, phrase: str) -> Optional[str]:
+        target = normalize_place(phrase).encode("utf-8")
+        i = self._amenities.bisect(target, lambda rec: self._string(rec[0], rec[1]))
+        if i < self._amenities.count:
+            phrase_off, phrase_len, name_off, name_len = self._amenities[i]
+            if self._string(phrase_off, phrase_len) == target:
+                return self._string(name_off, name_len).decode("utf-8")
+        return None
+
+
+def gazetteer_from_env() -> BaseGazetteer:
+    """Shared mapped tables (rebuilt when missing or stale), or per-process tables with NLU_GAZETTEER_BACKEND=memory."""
+    if NLU_GAZETTEER_BACKEND == "memory":
+        return Gazetteer.from_csv(NLU_AIRPORTS_PATH)
+
+    digest = source_digest(NLU_AIRPORTS_PATH, CITY_AIRPORTS, AMENITY_LOOKUP)
+    try:
+        mapped = MappedGazetteer(NLU_GAZETTEER_PATH)
+        if mapped.digest == digest:
+            return mapped
+        mapped.close()
+    except GazetteerFormatError:
+        pass
+
+    build_file(NLU_GAZETTEER_PATH)
+    return MappedGazetteer(NLU_GAZETTEER_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the memory-mapped gazetteer file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="rebuild the binary from the airport CSV and slot_extractor tables")
+    build.add_argument("--airports", default=NLU_AIRPORTS_PATH)
+    build.add_argument("--out", default=NLU_GAZETTEER_PATH)
+
+    info = commands.add_parser("info", help="print the header and section sizes of a binary")
+    info.add_argument("--path", default=NLU_GAZETTEER_PATH)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        started = time.perf_counter()
+        path = build_file(args.out, args.airports)
+        print(f"built {path} ({os.path.getsize(path)} bytes) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return
+
+    mapped = MappedGazetteer(args.path)
+    print(json.dumps({
+        "path": args.path,
+        "format_version": FORMAT_VERSION,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(mapped.built_at)),
+        "source_sha256": mapped.digest.hex(),
+        "airports": len(mapped),
+        "bytes": os.path.getsize(args.path),
+        "sections": {name: length for name, (_, length) in mapped.sections.items()},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# -------------------------------------------------------------------
+# Async, connection-pooled client for the Gemini REST API.
+#
+# One GeminiClient is shared by every request of a worker so that the
+# TLS connection (HTTP/2 via httpx[http2]) is reused instead of
+# being re-opened per chat message. A semaphore bounds the number of
+# in-flight upstream calls so a burst of traffic queues here instead of
+# piling up sockets.
+#
+# Settings (environment):
+#   GEMINI_BASE_URL         default https://generativelanguage.googleapis.com/v1beta
+#   GEMINI_MODEL            default gemini-1.5-flash
+#   GEMINI_CONNECT_TIMEOUT  seconds, default 3
+#   GEMINI_READ_TIMEOUT     seconds, default 20
+#   GEMINI_MAX_INFLIGHT     concurrent upstream calls, default 32
+#   GEMINI_HTTP2            true/false, default true
+# -------------------------------------------------------------------
+
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+import os
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (only needed for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "3"))
+GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "20"))
+GEMINI_MAX_INFLIGHT = int(os.getenv("GEMINI_MAX_INFLIGHT", "32"))
+GEMINI_HTTP2 = os.getenv("GEMINI_HTTP2", "true").lower() in ("true", "1", "t")
+
+
+class GeminiClient:
+    """Shared async client for `models/{model}:generateContent`."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = GEMINI_BASE_URL,
+        model: str = GEMINI_MODEL,
+        connect_timeout: float = GEMINI_CONNECT_TIMEOUT,
+        read_timeout: float = GEMINI_READ_TIMEOUT,
+        max_inflight: int = GEMINI_MAX_INFLIGHT,
+        http2: bool = GEMINI_HTTP2,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_inflight = max_inflight
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_inflight)
+
+    @property
+    def generate_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:generateContent"
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:streamGenerateContent"
+
+    async def start(self):
+        """Open the pooled connection. Called from the app startup hook."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_inflight,
+                    max_keepalive_connections=self.max_inflight,
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+
+    async def aclose(self):
+        """Close the pooled connection. Called from the app shutdown hook."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_content(self, payload: dict) -> dict:
+        """POST a generateContent payload and return the decoded JSON body."""
+        if self._client is None:
+            await self.start()
+
+        async with self._semaphore:
+            response = await self._client.post(
+                self.generate_url, params={"key": self.api_key}, json=payload
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_generate_content(self, payload: dict) -> AsyncIterator[str]:
+        """POST to streamGenerateContent (SSE) and yield the text of each chunk as it arrives."""
+        if self._client is None:
+            await self.start()
+
+        async with self._semaphore:
+            async with self._client.stream(
+                "POST", self.stream_url, params={"key": self.api_key, "alt": "sse"}, json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = json.loads(line[len("data:"):])
+                    for part in chunk["candidates"][0]["content"].get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
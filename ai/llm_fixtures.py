@@ -0,0 +1,164 @@
+# -------------------------------------------------------------------
+# Record/replay layer between call_gemini and the Gemini HTTP client.
+#
+# record: every generateContent payload/response pair is appended to a
+#         gzip'd JSON-lines file (one gzip member per append, so the
+#         file stays valid even if the process dies mid-run).
+# replay: responses are served from that file with synthetic latency,
+#         so /nlu/parse can be benchmarked and regression-tested
+#         without network access or API spend.
+#
+# Settings (environment):
+#   GEMINI_FIXTURE_MODE        off | record | replay, default off
+#   GEMINI_FIXTURE_PATH        default fixtures/gemini.jsonl.gz
+#   GEMINI_REPLAY_LATENCY_MS   synthetic latency per replayed call, default 0
+#   GEMINI_REPLAY_JITTER_MS    +/- uniform jitter, default 0
+#   GEMINI_REPLAY_MISS         error | passthrough, default error
+# -------------------------------------------------------------------
+
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+
+from prompt_builder import DATE_PHRASE
+
+GEMINI_FIXTURE_MODE = os.getenv("GEMINI_FIXTURE_MODE", "off")
+GEMINI_FIXTURE_PATH = os.getenv("GEMINI_FIXTURE_PATH", os.path.join("fixtures", "gemini.jsonl.gz"))
+GEMINI_REPLAY_LATENCY_MS = float(os.getenv("GEMINI_REPLAY_LATENCY_MS", "0"))
+GEMINI_REPLAY_JITTER_MS = float(os.getenv("GEMINI_REPLAY_JITTER_MS", "0"))
+GEMINI_REPLAY_MISS = os.getenv("GEMINI_REPLAY_MISS", "error")
+
+# The prompt embeds today's date; fixtures recorded yesterday should still match today
+CURRENT_DATE = re.compile(re.escape(DATE_PHRASE).replace(re.escape("{date}"), r"\d{4}-\d{2}-\d{2}"))
+
+REPLAY_STREAM_CHUNK_CHARS = 32
+
+
+class FixtureMissError(Exception):
+    """No recorded response for this payload in replay mode."""
+
+
+def fixture_key(payload: dict) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    canonical = CURRENT_DATE.sub(DATE_PHRASE.format(date="<today>"), canonical)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Append-only gzip JSON-lines file of {"k": key, "r": response} records, indexed in memory."""
+
+    def __init__(self, path: str = GEMINI_FIXTURE_PATH):
+        self.path = path
+        self._records: Dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record["k"]] = record["r"]
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._records.get(key)
+
+    async def put(self, key: str, response: dict):
+        if key in self._records:
+            return
+        self._records[key] = response
+        line = json.dumps({"k": key, "r": response}, separators=(",", ":")) + "\n"
+        async with self._lock:
+            await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write(line)
+
+    def __len__(self):
+        return len(self._records)
+
+
+class RecordReplayClient:
+    """Drop-in wrapper around GeminiClient that records or replays generateContent calls."""
+
+    def __init__(
+        self,
+        inner,
+        store: FixtureStore,
+        mode: str,
+        latency_ms: float = GEMINI_REPLAY_LATENCY_MS,
+        jitter_ms: float = GEMINI_REPLAY_JITTER_MS,
+        on_miss: str = GEMINI_REPLAY_MISS,
+    ):
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.on_miss = on_miss
+        self.replayed = 0
+        self.recorded = 0
+        self.misses = 0
+
+    async def start(self):
+        await self.inner.start()
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+    async def _synthetic_delay(self):
+        delay_ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    async def generate_content(self, payload: dict) -> dict:
+        key = fixture_key(payload)
+
+        if self.mode == "replay":
+            response = self.store.get(key)
+            if response is not None:
+                self.replayed += 1
+                await self._synthetic_delay()
+                return response
+            self.misses += 1
+            if self.on_miss != "passthrough":
+                raise FixtureMissError(f"no recorded Gemini response for payload {key}")
+
+        response = await self.inner.generate_content(payload)
+        if self.mode == "record":
+            await self.store.put(key, response)
+            self.recorded += 1
+        return response
+
+    async def stream_generate_content(self, payload: dict) -> AsyncIterator[str]:
+        # Streams replay the recorded non-streaming response in fixed-size chunks
+        response = await self.generate_content(payload)
+        text = response["candidates"][0]["content"]["parts"][0]["text"]
+        chunks = [text[i:i + REPLAY_STREAM_CHUNK_CHARS] for i in range(0, len(text), REPLAY_STREAM_CHUNK_CHARS)]
+        for chunk in chunks:
+            yield chunk
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "fixtures": len(self.store),
+            "replayed": self.replayed,
+            "recorded": self.recorded,
+            "misses": self.misses,
+        }
+
+
+def fixture_client_from_env(inner):
+    """Wrap the real client when GEMINI_FIXTURE_MODE is record/replay, otherwise return it unchanged."""
+    if GEMINI_FIXTURE_MODE not in ("record", "replay"):
+        return inner
+    return RecordReplayClient(inner, FixtureStore(GEMINI_FIXTURE_PATH), GEMINI_FIXTURE_MODE)
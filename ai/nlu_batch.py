@@ -0,0 +1,88 @@
+# -------------------------------------------------------------------
+# Packing helpers for /nlu/parse_batch.
+#
+# Many chat messages are packed into one generateContent prompt that
+# asks for a JSON array with one object per message, as long as the
+# chunk stays inside the token budget. The model's array is split back
+# by "id" (falling back to position) so one bad item does not poison
+# the rest of its chunk.
+#
+# Settings (environment):
+#   NLU_BATCH_TOKEN_BUDGET  input+output tokens per upstream call, default 8000
+#   NLU_BATCH_MAX_ITEMS     messages per upstream call, default 40
+#   NLU_BATCH_ITEM_OUTPUT_TOKENS  expected JSON output per message, default 120
+# -------------------------------------------------------------------
+
+from typing import Dict, List, Optional
+import json
+import os
+
+from prompt_builder import DATE_PHRASE, estimate_tokens, trim_message
+
+NLU_BATCH_TOKEN_BUDGET = int(os.getenv("NLU_BATCH_TOKEN_BUDGET", "8000"))
+NLU_BATCH_MAX_ITEMS = int(os.getenv("NLU_BATCH_MAX_ITEMS", "40"))
+NLU_BATCH_ITEM_OUTPUT_TOKENS = int(os.getenv("NLU_BATCH_ITEM_OUTPUT_TOKENS", "120"))
+
+
+def item_tokens(item_id: int, message: str) -> int:
+    return estimate_tokens(json.dumps({"id": item_id, "message": message})) + NLU_BATCH_ITEM_OUTPUT_TOKENS
+
+
+def pack_chunks(
+    items: Dict[int, str],
+    overhead_tokens: int,
+    token_budget: int = NLU_BATCH_TOKEN_BUDGET,
+    max_items: int = NLU_BATCH_MAX_ITEMS,
+) -> List[List[int]]:
+    """Greedily group message ids so each group fits one upstream call."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    used = overhead_tokens
+
+    for item_id, message in items.items():
+        cost = item_tokens(item_id, message)
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            chunks.append(current)
+            current, used = [], overhead_tokens
+        # An oversized message still gets its own chunk rather than being dropped
+        current.append(item_id)
+        used += cost
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_batch_prompt(items: Dict[int, str], current_date: str, schema_example: str) -> str:
+    """schema_example may be empty when the shape is enforced through response_schema instead."""
+    numbered = json.dumps([{"id": i, "message": trim_message(m)} for i, m in items.items()], ensure_ascii=False)
+    example = f"Example item:{schema_example}\n" if schema_example else ""
+    return (
+        f"Extract travel details from each user message below. {DATE_PHRASE.format(date=current_date)} "
+        'Reply with a JSON array only, one object per message in the same order, each with the message\'s "id". '
+        "No markdown. Use IATA codes for places, ISO dates, null for unknowns.\n"
+        f"{example}"
+        f"User messages:\n{numbered}\n"
+        "JSON:"
+    )
+
+
+def split_batch_response(parsed, ids: List[int]) -> Dict[int, Optional[dict]]:
+    """Map the model's JSON array back onto the requested ids. Missing items map to None."""
+    results: Dict[int, Optional[dict]] = {i: None for i in ids}
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results") or parsed.get("items") or [parsed]
+    if not isinstance(parsed, list):
+        return results
+
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        if isinstance(item_id, str) and item_id.isdigit():
+            item_id = int(item_id)
+        if item_id not in results and position < len(ids):
+            item_id = ids[position]
+        if item_id in results and results[item_id] is None:
+            results[item_id] = item
+    return results
@@ -0,0 +1,156 @@
+# -------------------------------------------------------------------
+# Result cache in front of call_gemini.
+#
+# Chat messages that only differ in casing/whitespace ("SFO to Doha
+# Nov 10-15" vs "sfo  to doha nov 10–15") map to the same key, and the
+# key also carries the date bucket that goes into the prompt so a
+# cached "next Friday" never outlives the day it was computed on.
+#
+# Settings (environment):
+#   NLU_CACHE_BACKEND      memory | redis, default memory
+#   NLU_CACHE_URL          redis URL, default redis://localhost:6379/0
+#   NLU_CACHE_MAX_ENTRIES  LRU bound for the memory backend, default 10000
+#   NLU_CACHE_TTL_SECONDS  per-entry TTL, default 3600
+#
+# The redis backend lets every uvicorn worker share one cache; any
+# Redis-protocol server works (redis-server, KeyDB, a local stand-in).
+# -------------------------------------------------------------------
+
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+
+NLU_CACHE_BACKEND = os.getenv("NLU_CACHE_BACKEND", "memory")
+NLU_CACHE_URL = os.getenv("NLU_CACHE_URL", "redis://localhost:6379/0")
+NLU_CACHE_MAX_ENTRIES = int(os.getenv("NLU_CACHE_MAX_ENTRIES", "10000"))
+NLU_CACHE_TTL_SECONDS = float(os.getenv("NLU_CACHE_TTL_SECONDS", "3600"))
+
+WHITESPACE = re.compile(r"\s+")
+DASHES = re.compile(r"[‐-―−]")
+TRAILING_PUNCTUATION = re.compile(r"[\s.!?,;]+$")
+
+
+def normalize_message(message: str) -> str:
+    """Canonical form of a chat message used for cache / coalescing keys."""
+    text = unicodedata.normalize("NFKC", message)
+    text = DASHES.sub("-", text)
+    text = WHITESPACE.sub(" ", text).strip().lower()
+    return TRAILING_PUNCTUATION.sub("", text)
+
+
+def cache_key(message: str, date_bucket: str) -> str:
+    digest = hashlib.sha1(f"{date_bucket}|{normalize_message(message)}".encode("utf-8")).hexdigest()
+    return f"nlu:{digest}"
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry TTL. Not shared between workers."""
+
+    def __init__(self, max_entries: int = NLU_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def close(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared cache. Size bound comes from the server's maxmemory + allkeys-lru policy."""
+
+    def __init__(self, url: str = NLU_CACHE_URL):
+        import redis.asyncio as redis  # optional dependency, only needed for this backend
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self._redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: dict, ttl: float):
+        await self._redis.set(key, json.dumps(value, separators=(",", ":")), ex=max(1, int(ttl)))
+
+    async def close(self):
+        await self._redis.close()
+
+
+class NLUCache:
+    """Cache facade with hit/miss counters. Backend errors count as misses."""
+
+    def __init__(self, backend, ttl: float = NLU_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            print("NLU CACHE GET ERROR", repr(e))
+            self.errors += 1
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict):
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            print("NLU CACHE SET ERROR", repr(e))
+            self.errors += 1
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["entries"] = len(self.backend)
+            stats["evictions"] = self.backend.evictions
+        return stats
+
+
+def cache_from_env() -> NLUCache:
+    if NLU_CACHE_BACKEND == "redis":
+        return NLUCache(RedisCacheBackend(NLU_CACHE_URL))
+    return NLUCache(MemoryCacheBackend(NLU_CACHE_MAX_ENTRIES))
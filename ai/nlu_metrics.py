@@ -0,0 +1,61 @@
+# -------------------------------------------------------------------
+# Lightweight in-process counters and latency windows for the NLU
+# endpoints. Served as JSON from GET /nlu/metrics.
+# -------------------------------------------------------------------
+
+from collections import deque
+from typing import Dict, Iterable, List
+import math
+
+LATENCY_WINDOW_SIZE = 2048
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class LatencyWindow:
+    """Keeps the last N samples (milliseconds) and reports p50/p95/p99."""
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE):
+        self.count = 0
+        self._samples = deque(maxlen=size)
+
+    def observe(self, ms: float):
+        self.count += 1
+        self._samples.append(ms)
+
+    def quantile(self, pct: float) -> float:
+        return percentile(sorted(self._samples), pct)
+
+    def summary(self, percentiles: Iterable[int] = (50, 95, 99)) -> Dict[str, float]:
+        ordered = sorted(self._samples)
+        summary = {"count": self.count}
+        for pct in percentiles:
+            summary[f"p{pct}_ms"] = round(percentile(ordered, pct), 3)
+        return summary
+
+
+class PathMetrics:
+    """Per-path request counts and latencies (e.g. rules vs llm)."""
+
+    def __init__(self):
+        self._paths: Dict[str, LatencyWindow] = {}
+
+    def observe(self, path: str, ms: float):
+        self._paths.setdefault(path, LatencyWindow()).observe(ms)
+
+    def count(self, path: str) -> int:
+        window = self._paths.get(path)
+        return window.count if window else 0
+
+    def summary(self) -> dict:
+        total = sum(window.count for window in self._paths.values())
+        return {
+            "total": total,
+            "paths": {path: window.summary() for path, window in self._paths.items()},
+        }
@@ -0,0 +1,111 @@
+# -------------------------------------------------------------------
+# Incremental parser for a streamed ParseResponse JSON document.
+#
+# Gemini's streamGenerateContent returns the JSON text in arbitrary
+# fragments. StreamingSlotParser scans each fragment once (no
+# re-parsing of the growing buffer) and reports every member of the
+# top-level "slots" object as soon as its value is complete, so the
+# chat UI can show origin/destination/dates before the whole response
+# has arrived.
+# -------------------------------------------------------------------
+
+from typing import Any, List, Optional, Tuple
+import json
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect_key", "value_start")
+
+    def __init__(self, kind: str):
+        self.kind = kind                    # "obj" or "arr"
+        self.key: Optional[str] = None      # member currently being read (objects only)
+        self.expect_key = kind == "obj"
+        self.value_start: Optional[int] = None
+
+
+class StreamingSlotParser:
+    """Feed JSON text fragments; get back (slot, value) pairs as they complete."""
+
+    def __init__(self, section: str = "slots"):
+        self.section = section
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    @property
+    def text(self) -> str:
+        return self._buf
+
+    def feed(self, fragment: str) -> List[Tuple[str, Any]]:
+        self._buf += fragment
+        buf = self._buf
+        completed: List[Tuple[str, Any]] = []
+
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    top = self._top()
+                    if top is not None and top.expect_key:
+                        top.key = json.loads(buf[self._string_start:i + 1])
+                        top.expect_key = False
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._mark_value(i)
+            elif c in "{[":
+                self._mark_value(i)
+                self._stack.append(_Frame("obj" if c == "{" else "arr"))
+            elif c in "}]":
+                self._complete(i, completed)
+                if self._stack:
+                    self._stack.pop()
+            elif c == ",":
+                self._complete(i, completed)
+                top = self._top()
+                if top is not None and top.kind == "obj":
+                    top.expect_key = True
+            elif c != ":" and not c.isspace():
+                self._mark_value(i)
+
+        self._pos = len(buf)
+        return completed
+
+    def _top(self) -> Optional[_Frame]:
+        return self._stack[-1] if self._stack else None
+
+    def _mark_value(self, i: int):
+        top = self._top()
+        if top is not None and not top.expect_key and top.value_start is None:
+            top.value_start = i
+
+    def _in_section(self) -> bool:
+        # {"slots": {<here>}}
+        return (
+            len(self._stack) == 2
+            and self._stack[0].key == self.section
+            and self._stack[1].kind == "obj"
+        )
+
+    def _complete(self, i: int, completed: List[Tuple[str, Any]]):
+        top = self._top()
+        if top is None or top.value_start is None:
+            return
+
+        if self._in_section() and top.key is not None:
+            try:
+                completed.append((top.key, json.loads(self._buf[top.value_start:i])))
+            except ValueError:
+                pass
+        top.value_start = None
+        top.key = None
@@ -0,0 +1,200 @@
+# -------------------------------------------------------------------
+# Prompt construction for the Gemini slot-filling call.
+#
+# Everything that does not depend on the request (instructions, the
+# minified schema example, the responseSchema) is built once at import;
+# per request only the date and the (budget-trimmed) user message are
+# spliced in. With NLU_PROMPT_STRUCTURED the inline example is dropped
+# and the shape is enforced through generationConfig.response_schema
+# instead, which is the shortest prompt of all.
+#
+# Settings (environment):
+#   NLU_PROMPT_STRUCTURED          true/false, default false
+#   NLU_PROMPT_MAX_MESSAGE_TOKENS  user message budget before trimming, default 512
+# -------------------------------------------------------------------
+
+from collections import deque
+from typing import Iterable, Optional
+import json
+import math
+import os
+
+from nlu_metrics import percentile
+
+NLU_PROMPT_STRUCTURED = os.getenv("NLU_PROMPT_STRUCTURED", "false").lower() in ("true", "1", "t")
+NLU_PROMPT_MAX_MESSAGE_TOKENS = int(os.getenv("NLU_PROMPT_MAX_MESSAGE_TOKENS", "512"))
+
+CHARS_PER_TOKEN = 4
+TRIM_MARKER = " ... "
+
+# Example response shown to the model when structured output is off
+SCHEMA_EXAMPLE = {
+        "slots": {
+                "origin": "SFO",
+                "destination": "DOH",
+                "dates": {"start": "2025-11-10", "end":"2025-11-20"},
+                "pax": {"adults": 1},
+                "budget": 1500,
+                "hotel": {"amenities": ["breakfast", "pool"]},
+                "car" : False
+                },
+        "missing": ["car"],
+        "confidence": {
+                "origin": 0.9,
+                "destination": 0.9,
+                "dates": 0.9,
+                "pax": 0.9,
+                "budget": 0.9,
+                "hotel": 0.9
+                }
+        }
+
+SCHEMA_EXAMPLE_JSON = json.dumps(SCHEMA_EXAMPLE, separators=(",", ":"))
+
+# Same shape as SCHEMA_EXAMPLE, in Gemini's OpenAPI-subset schema dialect
+_NULLABLE_STRING = {"type": "STRING", "nullable": True}
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "slots": {
+            "type": "OBJECT",
+            "properties": {
+                "origin": _NULLABLE_STRING,
+                "destination": _NULLABLE_STRING,
+                "dates": {
+                    "type": "OBJECT",
+                    "properties": {"start": _NULLABLE_STRING, "end": _NULLABLE_STRING},
+                },
+                "pax": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "adults": {"type": "INTEGER", "nullable": True},
+                        "children": {"type": "INTEGER", "nullable": True},
+                    },
+                },
+                "budget": {"type": "NUMBER", "nullable": True},
+                "hotel": {
+                    "type": "OBJECT",
+                    "properties": {"amenities": {"type": "ARRAY", "items": {"type": "STRING"}}},
+                },
+                "car": {"type": "BOOLEAN", "nullable": True},
+            },
+        },
+        "missing": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "confidence": {
+            "type": "OBJECT",
+            "properties": {
+                slot: {"type": "NUMBER"}
+                for slot in ("origin", "destination", "dates", "pax", "budget", "hotel")
+            },
+        },
+    },
+    "required": ["slots", "missing", "confidence"],
+}
+
+# One object per message for /nlu/parse_batch
+BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"id": {"type": "INTEGER"}, **RESPONSE_SCHEMA["properties"]},
+        "required": ["id", "slots", "missing", "confidence"],
+    },
+}
+
+# How every prompt states the date; llm_fixtures masks it so fixtures keep matching on later days
+DATE_PHRASE = "Today is {date}."
+
+# Precomputed prompt pieces; only the date and the message are filled in per request
+_INSTRUCTIONS = (
+    "Extract travel details from the user's message. " + DATE_PHRASE + " "
+    "Reply with JSON only, no markdown. Use IATA codes for places, ISO dates, null for unknowns."
+)
+_EXAMPLE_BLOCK = f"\nExample:{SCHEMA_EXAMPLE_JSON}"
+_MESSAGE_BLOCK = "\nMessage:{message}\nJSON:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def trim_message(message: str, max_tokens: int = NLU_PROMPT_MAX_MESSAGE_TOKENS) -> str:
+    """Cut an over-long message down to the budget, keeping its start and end (where places and dates usually are)."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(message) <= max_chars:
+        return message
+    keep = max(0, max_chars - len(TRIM_MARKER))
+    head = keep - keep // 2
+    return message[:head] + TRIM_MARKER + message[len(message) - keep // 2:]
+
+
+def build_prompt(user_message: str, current_date: str, structured: bool = NLU_PROMPT_STRUCTURED) -> str:
+    message = json.dumps(trim_message(user_message), ensure_ascii=False)
+    instructions = _INSTRUCTIONS.format(date=current_date)
+    example = "" if structured else _EXAMPLE_BLOCK
+    return instructions + example + _MESSAGE_BLOCK.format(message=message)
+
+
+def build_payload(prompt: str, response_schema: Optional[dict] = None, structured: bool = NLU_PROMPT_STRUCTURED) -> dict:
+    generation_config = {"response_mime_type": "application/json"}
+    if structured:
+        generation_config["response_schema"] = response_schema or RESPONSE_SCHEMA
+    return {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": generation_config,
+    }
+
+
+def batch_schema_example(structured: bool = NLU_PROMPT_STRUCTURED) -> str:
+    """Schema text for build_batch_prompt(); empty when the shape comes from response_schema."""
+    return "" if structured else SCHEMA_EXAMPLE_JSON
+
+
+def prompt_tokens_from_response(response: dict) -> Optional[int]:
+    """Gemini's own prompt token count, when the response carries usageMetadata."""
+    usage = response.get("usageMetadata") or {}
+    return usage.get("promptTokenCount")
+
+
+class PromptStats:
+    """Prompt size per upstream request: our estimate, and Gemini's count when reported."""
+
+    def __init__(self, size: int = 2048):
+        self.requests = 0
+        self.trimmed = 0
+        self._estimated = deque(maxlen=size)
+        self._reported = deque(maxlen=size)
+
+    def observe(self, prompt: str, reported: Optional[int] = None):
+        self.requests += 1
+        self._estimated.append(estimate_tokens(prompt))
+        if reported is not None:
+            self._reported.append(reported)
+
+    def observe_message(self, user_message: str):
+        if estimate_tokens(user_message) > NLU_PROMPT_MAX_MESSAGE_TOKENS:
+            self.trimmed += 1
+
+    @staticmethod
+    def _summary(samples: Iterable[int]) -> dict:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"count": 0}
+        return {
+            "count": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 1),
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+        }
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "trimmed_messages": self.trimmed,
+            "structured_output": NLU_PROMPT_STRUCTURED,
+            "estimated_prompt_tokens": self._summary(self._estimated),
+            "reported_prompt_tokens": self._summary(self._reported),
+        }
@@ -0,0 +1,167 @@
+# -------------------------------------------------------------------
+# Latency budget for upstream LLM calls: hedged requests and a
+# circuit breaker.
+#
+# Hedger starts a second identical request when the first one is
+# slower than the recent p95, and takes whichever answers first.
+# CircuitBreaker stops sending traffic to Gemini after consecutive
+# failures so requests go straight to the local fallback extractor
+# instead of each waiting out a timeout.
+#
+# Settings (environment):
+#   NLU_HEDGE_ENABLED          true/false, default true
+#   NLU_HEDGE_PERCENTILE       latency percentile that triggers the hedge, default 95
+#   NLU_HEDGE_MIN_DELAY_MS     lower clamp for the hedge delay, default 250
+#   NLU_HEDGE_MAX_DELAY_MS     upper clamp (also used until enough samples), default 3000
+#   NLU_HEDGE_MIN_SAMPLES      samples needed before the percentile is trusted, default 20
+#   NLU_BREAKER_FAILURES       consecutive failures that open the breaker, default 5
+#   NLU_BREAKER_RESET_SECONDS  time before a half-open probe is allowed, default 30
+# -------------------------------------------------------------------
+
+from typing import Any, Awaitable, Callable
+import asyncio
+import os
+import time
+
+from nlu_metrics import LatencyWindow
+
+NLU_HEDGE_ENABLED = os.getenv("NLU_HEDGE_ENABLED", "true").lower() in ("true", "1", "t")
+NLU_HEDGE_PERCENTILE = float(os.getenv("NLU_HEDGE_PERCENTILE", "95"))
+NLU_HEDGE_MIN_DELAY_MS = float(os.getenv("NLU_HEDGE_MIN_DELAY_MS", "250"))
+NLU_HEDGE_MAX_DELAY_MS = float(os.getenv("NLU_HEDGE_MAX_DELAY_MS", "3000"))
+NLU_HEDGE_MIN_SAMPLES = int(os.getenv("NLU_HEDGE_MIN_SAMPLES", "20"))
+NLU_BREAKER_FAILURES = int(os.getenv("NLU_BREAKER_FAILURES", "5"))
+NLU_BREAKER_RESET_SECONDS = float(os.getenv("NLU_BREAKER_RESET_SECONDS", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the breaker is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = NLU_BREAKER_FAILURES, reset_timeout: float = NLU_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        # Half-open lets exactly one probe through; everybody else keeps using the fallback
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """An admitted call ended without an outcome (cancelled); let the next caller probe instead."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class Hedger:
+    """Runs fn(); if it has not answered after the p95 delay, races a second fn()."""
+
+    def __init__(
+        self,
+        latency: LatencyWindow,
+        enabled: bool = NLU_HEDGE_ENABLED,
+        pct: float = NLU_HEDGE_PERCENTILE,
+        min_delay_ms: float = NLU_HEDGE_MIN_DELAY_MS,
+        max_delay_ms: float = NLU_HEDGE_MAX_DELAY_MS,
+        min_samples: int = NLU_HEDGE_MIN_SAMPLES,
+    ):
+        self.latency = latency
+        self.enabled = enabled
+        self.pct = pct
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        if self.latency.count < self.min_samples:
+            return self.max_delay_ms / 1000
+        delay_ms = self.latency.quantile(self.pct)
+        return min(self.max_delay_ms, max(self.min_delay_ms, delay_ms)) / 1000
+
+    async def run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        primary = asyncio.ensure_future(fn())
+        if not self.enabled:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay())
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(fn())
+            pending.add(hedge)
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary if both finished in the same tick
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+            "current_delay_ms": round(self.delay() * 1000, 1),
+        }
@@ -0,0 +1,123 @@
+# -------------------------------------------------------------------
+# Server-side conversation state for the clarify flow.
+#
+# A session keeps the slots collected so far and the slot the last
+# clarify question asked about ("pending"), so the next chat message
+# can be parsed by the narrow single-slot extractor and merged instead
+# of re-running the full LLM prompt on every turn.
+#
+# Settings (environment):
+#   NLU_SESSION_BACKEND      memory | sqlite, default memory
+#   NLU_SESSION_PATH         sqlite file, default nlu_sessions.sqlite3
+#   NLU_SESSION_TTL_SECONDS  idle time before a session expires, default 1800
+#   NLU_SESSION_MAX          memory backend bound (LRU), default 50000
+# -------------------------------------------------------------------
+
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+NLU_SESSION_BACKEND = os.getenv("NLU_SESSION_BACKEND", "memory")
+NLU_SESSION_PATH = os.getenv("NLU_SESSION_PATH", "nlu_sessions.sqlite3")
+NLU_SESSION_TTL_SECONDS = float(os.getenv("NLU_SESSION_TTL_SECONDS", "1800"))
+NLU_SESSION_MAX = int(os.getenv("NLU_SESSION_MAX", "50000"))
+
+
+def new_session() -> dict:
+    return {"slots": {}, "confidence": {}, "pending": None}
+
+
+def merge_slots(current: dict, patch: dict) -> dict:
+    """Deep-merge a partial Slots dict into the stored one. Empty values never overwrite."""
+    merged = dict(current)
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            merged[key] = merge_slots(merged.get(key) or {}, value)
+        elif value is not None and value != []:
+            merged[key] = value
+    return merged
+
+
+class MemorySessionStore:
+    """Per-worker sessions with idle TTL and an LRU bound."""
+
+    def __init__(self, ttl: float = NLU_SESSION_TTL_SECONDS, max_sessions: int = NLU_SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        expires_at, state = entry
+        if expires_at <= time.monotonic():
+            del self._sessions[session_id]
+            return None
+        return state
+
+    async def set(self, session_id: str, state: dict):
+        self._sessions[session_id] = (time.monotonic() + self.ttl, state)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def close(self):
+        self._sessions.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SqliteSessionStore:
+    """Sessions persisted to a local SQLite file; survives restarts and is shared by workers on one host."""
+
+    def __init__(self, path: str = NLU_SESSION_PATH, ttl: float = NLU_SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS nlu_sessions "
+            "(session_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._lock = asyncio.Lock()
+
+    async def _run(self, sql: str, params: tuple = ()):
+        async with self._lock:
+            return await asyncio.to_thread(lambda: self._db.execute(sql, params).fetchone())
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        row = await self._run(
+            "SELECT state FROM nlu_sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+        )
+        return json.loads(row[0]) if row else None
+
+    async def set(self, session_id: str, state: dict):
+        await self._run(
+            "INSERT OR REPLACE INTO nlu_sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(state, separators=(",", ":")), time.time() + self.ttl),
+        )
+
+    async def delete(self, session_id: str):
+        await self._run("DELETE FROM nlu_sessions WHERE session_id = ?", (session_id,))
+
+    async def purge_expired(self):
+        await self._run("DELETE FROM nlu_sessions WHERE expires_at <= ?", (time.time(),))
+
+    async def close(self):
+        self._db.close()
+
+
+def session_store_from_env():
+    if NLU_SESSION_BACKEND == "sqlite":
+        return SqliteSessionStore(NLU_SESSION_PATH)
+    return MemorySessionStore()
@@ -0,0 +1,47 @@
+# -------------------------------------------------------------------
+# Single-flight request coalescing.
+#
+# Concurrent callers asking for the same key await one shared task
+# instead of each starting their own upstream call. The shared task is
+# shielded, so a client that disconnects (and gets its request
+# cancelled) does not cancel the work the other callers are waiting on.
+# -------------------------------------------------------------------
+
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+
+
+class SingleFlight:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0          # upstream calls actually started
+        self.coalesced = 0      # callers that joined an in-flight call
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        requests = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "coalesced_rate": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
@@ -0,0 +1,404 @@
+# -------------------------------------------------------------------
+# Deterministic slot extraction (fast path before the LLM).
+#
+# Handles the common "X to Y, dates, N people, $budget" sentences with
+# precompiled regexes, python-dateutil and an airport/city table. The
+# result has the same shape as call_gemini() so /nlu/parse can use
+# either one. `score` is a weighted coverage of the slots that matter
+# for planning; /nlu/parse only skips the LLM when it clears
+# NLU_FASTPATH_THRESHOLD.
+# -------------------------------------------------------------------
+
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import re
+
+from dateutil import parser as date_parser
+from dateutil.relativedelta import relativedelta
+
+# City / alias -> IATA code for the destinations we see most often
+CITY_AIRPORTS = {
+    "san francisco": "SFO", "sf": "SFO", "san fran": "SFO", "bay area": "SFO",
+    "oakland": "OAK", "san jose": "SJC",
+    "los angeles": "LAX", "la": "LAX",
+    "san diego": "SAN", "seattle": "SEA", "portland": "PDX",
+    "las vegas": "LAS", "vegas": "LAS", "phoenix": "PHX", "denver": "DEN",
+    "dallas": "DFW", "houston": "IAH", "austin": "AUS", "chicago": "ORD",
+    "atlanta": "ATL", "miami": "MIA", "orlando": "MCO", "boston": "BOS",
+    "new york": "JFK", "nyc": "JFK", "newark": "EWR",
+    "washington": "IAD", "dc": "IAD", "philadelphia": "PHL",
+    "toronto": "YYZ", "vancouver": "YVR", "montreal": "YUL",
+    "mexico city": "MEX", "cancun": "CUN",
+    "london": "LHR", "paris": "CDG", "amsterdam": "AMS", "frankfurt": "FRA",
+    "munich": "MUC", "madrid": "MAD", "barcelona": "BCN", "rome": "FCO",
+    "milan": "MXP", "lisbon": "LIS", "dublin": "DUB", "zurich": "ZRH",
+    "vienna": "VIE", "istanbul": "IST", "athens": "ATH",
+    "doha": "DOH", "dubai": "DXB", "abu dhabi": "AUH", "cairo": "CAI",
+    "lagos": "LOS", "nairobi": "NBO", "johannesburg": "JNB", "cape town": "CPT",
+    "delhi": "DEL", "new delhi": "DEL", "mumbai": "BOM", "bangalore": "BLR",
+    "singapore": "SIN", "bangkok": "BKK", "hong kong": "HKG",
+    "tokyo": "HND", "osaka": "KIX", "seoul": "ICN", "beijing": "PEK",
+    "shanghai": "PVG", "sydney": "SYD", "melbourne": "MEL", "auckland": "AKL",
+    "honolulu": "HNL", "hawaii": "HNL",
+}
+
+AIRPORT_CODES = set(CITY_AIRPORTS.values())
+
+# Canonical amenity -> phrases users type
+AMENITY_SYNONYMS = {
+    "breakfast": ["breakfast", "free breakfast", "breakfast included"],
+    "pool": ["pool", "swimming pool", "infinity pool"],
+    "wifi": ["wifi", "wi-fi", "free wifi", "internet"],
+    "gym": ["gym", "fitness center", "fitness centre"],
+    "parking": ["parking", "free parking"],
+    "spa": ["spa"],
+    "beach": ["beach", "beachfront", "beach access"],
+    "pet_friendly": ["pet friendly", "pet-friendly", "pets allowed"],
+    "airport_shuttle": ["airport shuttle", "shuttle", "airport transfer"],
+    "kitchen": ["kitchen", "kitchenette"],
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+# Weights of each slot in the overall extraction score
+SLOT_WEIGHTS = {"origin": 0.25, "destination": 0.25, "dates": 0.25, "pax": 0.1, "budget": 0.1, "car": 0.05}
+
+# Slots reported in `missing` when empty. Hotel amenities are optional.
+REQUIRED_SLOTS = ("origin", "destination", "dates", "pax", "budget", "car")
+
+
+def _alternation(phrases) -> str:
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+RANGE_SEP = r"\s*(?:-|–|—|to|until|till|through|thru)\s*"
+
+PLACE_RE = re.compile(rf"\b({_alternation(CITY_AIRPORTS)})\b|\b([A-Z]{{3}})\b", re.I)
+ROUTE_SEP_RE = re.compile(r"^\s*(?:to|->|→|-)\s*$", re.I)
+FROM_RE = re.compile(r"\bfrom\s*$", re.I)
+TO_RE = re.compile(r"\b(?:to|into|visit|visiting|->|→)\s*$", re.I)
+
+MONTH_RANGE_RE = re.compile(rf"\b({MONTH})\s*({DAY}){RANGE_SEP}(?:({MONTH})\s*)?({DAY})\b", re.I)
+ISO_RANGE_RE = re.compile(rf"\b(\d{{4}}-\d{{2}}-\d{{2}}){RANGE_SEP}(\d{{4}}-\d{{2}}-\d{{2}})\b")
+NUMERIC_RANGE_RE = re.compile(rf"\b(\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?){RANGE_SEP}(\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?)\b")
+SINGLE_DATE_RE = re.compile(rf"\b(?:on|from|leaving|departing)\s+({MONTH}\s*{DAY}|\d{{4}}-\d{{2}}-\d{{2}}|\d{{1,2}}/\d{{1,2}})\b", re.I)
+
+PAX_RE = re.compile(
+    rf"\b(\d+|{_alternation(NUMBER_WORDS)})\s*"
+    r"(?:adults?|people|persons?|pax|travell?ers|guests|of us|passengers?)\b",
+    re.I,
+)
+PAX_FOR_RE = re.compile(rf"\bfor\s+(\d+|{_alternation(NUMBER_WORDS)})\b(?!\s*(?:days?|nights?|weeks?|\$|usd|dollars))", re.I)
+SOLO_RE = re.compile(r"\b(?:solo|alone|just me|by myself)\b", re.I)
+COUPLE_RE = re.compile(r"\b(?:couple|honeymoon|me and my (?:wife|husband|partner|girlfriend|boyfriend))\b", re.I)
+
+BUDGET_RE = re.compile(
+    r"(?:\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k)?\b)"
+    r"|(?:\b(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:usd|dollars|bucks)\b)"
+    r"|(?:\bbudget\s*(?:of|is|:)?\s*(\d[\d,]*(?:\.\d+)?)\s*(k)?\b)",
+    re.I,
+)
+
+# Short answers to a clarify question ("2", "yes", "around 2000")
+BARE_NUMBER_RE = re.compile(rf"^\s*(?:about|around|maybe|~)?\s*(\d+|{_alternation(NUMBER_WORDS)})\s*$", re.I)
+AMOUNT_RE = re.compile(r"\b(\d[\d,]*(?:\.\d+)?)\s*(k)?\b", re.I)
+YES_RE = re.compile(r"^\s*(?:yes|yeah|yep|yup|sure|please|ok(?:ay)?|y)\b", re.I)
+NO_RE = re.compile(r"^\s*(?:no|nope|nah|not really|none|n)\b", re.I)
+
+NO_CAR_RE = re.compile(r"\b(?:no|without(?: a)?|don'?t need(?: a)?|do not need(?: a)?)\s+(?:rental\s+)?car\b", re.I)
+CAR_RE = re.compile(r"\b(?:rental car|car rental|rent(?:ing)? a car|need a car|with a car|hire a car|car hire)\b", re.I)
+
+AMENITY_RE = re.compile(
+    rf"\b({_alternation(p for phrases in AMENITY_SYNONYMS.values() for p in phrases)})\b",
+    re.I,
+)
+AMENITY_LOOKUP = {p: name for name, phrases in AMENITY_SYNONYMS.items() for p in phrases}
+
+
+class Extraction(NamedTuple):
+    result: dict    # {"slots": ..., "missing": ..., "confidence": ...} like call_gemini()
+    score: float    # weighted slot coverage in [0, 1]
+
+
+def _resolve_place(alias: Optional[str], code: Optional[str]) -> Optional[str]:
+    if alias:
+        return CITY_AIRPORTS.get(alias.lower())
+    if code and code.upper() in AIRPORT_CODES:
+        return code.upper()
+    return None
+
+
+def find_places(message: str) -> List[Tuple[str, int, int]]:
+    """All airports mentioned in the message as (code, start, end), in reading order."""
+    places = []
+    for match in PLACE_RE.finditer(message):
+        alias, code = match.group(1), match.group(2)
+        # Bare codes and two-letter aliases only count when typed in capitals ("SFO", "LA", not "and", "la")
+        token = match.group(0)
+        if (code or len(alias) <= 2) and not token.isupper():
+            continue
+        resolved = _resolve_place(alias, code)
+        if resolved:
+            places.append((resolved, match.start(), match.end()))
+    return places
+
+
+def extract_places(message: str) -> Tuple[Optional[str], Optional[str], float]:
+    """Return (origin, destination, confidence) IATA codes found in the message."""
+    places = find_places(message)
+
+    origin = destination = None
+    assigned = set()
+    for i, (place, start, _) in enumerate(places):
+        if i > 0 and ROUTE_SEP_RE.match(message[places[i - 1][2]:start]):
+            # "SFO to DOH", "SFO-DOH"
+            if origin is None and i - 1 not in assigned:
+                origin = places[i - 1][0]
+                assigned.add(i - 1)
+            if destination is None:
+                destination = place
+                assigned.add(i)
+        elif FROM_RE.search(message[:start]) and origin is None:
+            origin = place
+            assigned.add(i)
+        elif TO_RE.search(message[:start]) and destination is None:
+            destination = place
+            assigned.add(i)
+
+    leftovers = [place for i, (place, _, _) in enumerate(places) if i not in assigned]
+    if origin is None and destination is None:
+        # Two bare places with no connecting words: guess reading order
+        if len(leftovers) >= 2:
+            return leftovers[0], leftovers[1], 0.6
+        return None, None, 0.0
+    if leftovers and (origin is None or destination is None):
+        # "Doha from SFO": the unclaimed place fills the other end
+        if origin is None:
+            origin = leftovers[0]
+        else:
+            destination = leftovers[0]
+        return origin, destination, 0.8
+    return origin, destination, 0.95
+
+
+def _to_date(text: str, today: date, default_month: Optional[str] = None) -> Optional[date]:
+    text = re.sub(r"(?<=\d)(st|nd|rd|th)\b", "", text.strip(), flags=re.I)
+    if default_month:
+        text = f"{default_month} {text}"
+    try:
+        return date_parser.parse(text, default=datetime(today.year, today.month, 1)).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _roll_forward(start: date, end: Optional[date], today: date, explicit_year: bool) -> Tuple[date, Optional[date]]:
+    # "Nov 10" said in December means next year's November
+    if not explicit_year and start < today:
+        start += relativedelta(years=1)
+        if end is not None:
+            end += relativedelta(years=1)
+    if end is not None and end < start:
+        end += relativedelta(years=1)
+    return start, end
+
+
+def extract_dates(message: str, today: date) -> Tuple[Optional[date], Optional[date]]:
+    match = ISO_RANGE_RE.search(message)
+    if match:
+        return _to_date(match.group(1), today), _to_date(match.group(2), today)
+
+    match = MONTH_RANGE_RE.search(message)
+    if match:
+        start_month, start_day, end_month, end_day = match.groups()
+        start = _to_date(f"{start_month} {start_day}", today)
+        end = _to_date(end_day, today, default_month=end_month or start_month)
+        if start and end:
+            return _roll_forward(start, end, today, explicit_year=False)
+
+    match = NUMERIC_RANGE_RE.search(message)
+    if match:
+        start, end = _to_date(match.group(1), today), _to_date(match.group(2), today)
+        if start and end:
+            return _roll_forward(start, end, today, explicit_year=match.group(1).count("/") == 2)
+
+    match = SINGLE_DATE_RE.search(message)
+    if match:
+        start = _to_date(match.group(1), today)
+        if start:
+            return _roll_forward(start, None, today, explicit_year="-" in match.group(1))
+
+    return None, None
+
+
+def _number(text: str) -> int:
+    return NUMBER_WORDS.get(text.lower()) or int(text)
+
+
+def extract_pax(message: str) -> Optional[int]:
+    match = PAX_RE.search(message) or PAX_FOR_RE.search(message)
+    if match:
+        return _number(match.group(1))
+    if SOLO_RE.search(message):
+        return 1
+    if COUPLE_RE.search(message):
+        return 2
+    return None
+
+
+def extract_budget(message: str) -> Optional[float]:
+    match = BUDGET_RE.search(message)
+    if not match:
+        return None
+    groups = match.groups()
+    for amount, thousands in zip(groups[0::2], groups[1::2]):
+        if amount:
+            value = float(amount.replace(",", ""))
+            return value * 1000 if thousands else value
+    return None
+
+
+def extract_car(message: str) -> Optional[bool]:
+    if NO_CAR_RE.search(message):
+        return False
+    if CAR_RE.search(message):
+        return True
+    return None
+
+
+def extract_amenities(message: str) -> List[str]:
+    found = []
+    for match in AMENITY_RE.finditer(message):
+        name = AMENITY_LOOKUP[match.group(1).lower()]
+        if name not in found:
+            found.append(name)
+    return found
+
+
+def missing_slots(slots: dict) -> List[str]:
+    """Required slots that are still empty in a Slots-shaped dict."""
+    filled = {
+        "origin": slots.get("origin"),
+        "destination": slots.get("destination"),
+        "dates": (slots.get("dates") or {}).get("end"),
+        "pax": (slots.get("pax") or {}).get("adults"),
+        "budget": slots.get("budget"),
+        "car": slots.get("car"),
+    }
+    return [slot for slot in REQUIRED_SLOTS if filled[slot] is None]
+
+
+def extract_slots(message: str, today: Optional[date] = None) -> Extraction:
+    """Fill the Slots structure from a chat message without calling the LLM."""
+    today = today or date.today()
+
+    origin, destination, place_confidence = extract_places(message)
+    start, end = extract_dates(message, today)
+    adults = extract_pax(message)
+    budget = extract_budget(message)
+    car = extract_car(message)
+    amenities = extract_amenities(message)
+
+    slots = {
+        "origin": origin,
+        "destination": destination,
+        "dates": {
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+        },
+        "pax": {"adults": adults},
+        "budget": budget,
+        "hotel": {"amenities": amenities},
+        "car": car,
+    }
+
+    confidence: Dict[str, float] = {}
+    if origin:
+        confidence["origin"] = place_confidence
+    if destination:
+        confidence["destination"] = place_confidence
+    if start and end:
+        confidence["dates"] = 0.95
+    elif start:
+        confidence["dates"] = 0.5
+    if adults:
+        confidence["pax"] = 0.95
+    if budget is not None:
+        confidence["budget"] = 0.95
+    if car is not None:
+        confidence["car"] = 0.9
+    if amenities:
+        confidence["hotel"] = 0.9
+
+    missing = missing_slots(slots)
+    score = sum(weight * confidence.get(slot, 0.0) for slot, weight in SLOT_WEIGHTS.items())
+
+    return Extraction(
+        result={"slots": slots, "missing": missing, "confidence": confidence},
+        score=round(score, 4),
+    )
+
+
+def is_new_topic(pending: Optional[str], slots: dict) -> bool:
+    """
+    Whether a message in an ongoing conversation starts a new request
+    instead of answering the pending clarify question: it names a full
+    route, or names a place while we were asking about something else.
+    """
+    if slots.get("origin") and slots.get("destination"):
+        return True
+    return pending not in ("origin", "destination") and bool(slots.get("origin") or slots.get("destination"))
+
+
+def extract_single_slot(slot: str, message: str, today: Optional[date] = None) -> Optional[dict]:
+    """
+    Narrow extractor for the answer to one clarify question.
+    Returns a partial Slots dict for just that slot, or None when the
+    answer does not look like a value for it.
+    """
+    today = today or date.today()
+
+    if slot in ("origin", "destination"):
+        places = find_places(message)
+        return {slot: places[0][0]} if places else None
+
+    if slot == "dates":
+        start, end = extract_dates(message, today)
+        if start is None:
+            return None
+        return {"dates": {"start": start.isoformat(), "end": end.isoformat() if end else None}}
+
+    if slot == "pax":
+        adults = extract_pax(message)
+        if adults is None:
+            match = BARE_NUMBER_RE.match(message)
+            adults = _number(match.group(1)) if match else None
+        return {"pax": {"adults": adults}} if adults else None
+
+    if slot == "budget":
+        budget = extract_budget(message)
+        if budget is None:
+            match = AMOUNT_RE.search(message)
+            if match:
+                budget = float(match.group(1).replace(",", "")) * (1000 if match.group(2) else 1)
+        return {"budget": budget} if budget is not None else None
+
+    if slot == "car":
+        car = extract_car(message)
+        if car is None and YES_RE.match(message):
+            car = True
+        elif car is None and NO_RE.match(message):
+            car = False
+        return {"car": car} if car is not None else None
+
+    if slot == "hotel":
+        amenities = extract_amenities(message)
+        if amenities:
+            return {"hotel": {"amenities": amenities}}
+        return {"hotel": {"amenities": []}} if NO_RE.match(message) else None
+
+    return None
@@ -0,0 +1,94 @@
+# -------------------------------------------------------------------
+# Local stand-in for the Gemini generateContent API.
+#
+# Lets ai_npu be load-tested offline without spending API quota:
+# 1. python3 -m uvicorn stub_gemini:app --port 8001 --workers 4
+# 2. GEMINI_BASE_URL=http://127.0.0.1:8001/v1beta python3 -m uvicorn ai_npu:app
+#
+# STUB_GEMINI_LATENCY_MS / STUB_GEMINI_JITTER_MS emulate upstream latency.
+# -------------------------------------------------------------------
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+import random
+import re
+
+STUB_LATENCY_MS = float(os.getenv("STUB_GEMINI_LATENCY_MS", "400"))
+STUB_JITTER_MS = float(os.getenv("STUB_GEMINI_JITTER_MS", "150"))
+STUB_STREAM_CHUNK_CHARS = int(os.getenv("STUB_GEMINI_STREAM_CHUNK_CHARS", "24"))
+
+app = FastAPI(
+        title="Gemini stand-in",
+        description="Offline replacement for generateContent used for benchmarking",
+        version="1.0.0"
+    )
+
+CANNED_RESPONSE = {
+    "slots": {
+        "origin": "SFO",
+        "destination": "DOH",
+        "dates": {"start": "2025-11-10", "end": "2025-11-15"},
+        "pax": {"adults": 2},
+        "budget": 1500,
+        "hotel": {"amenities": ["breakfast", "pool"]},
+        "car": False
+    },
+    "missing": [],
+    "confidence": {"origin": 0.9, "destination": 0.9, "dates": 0.9, "pax": 0.9, "budget": 0.9}
+}
+
+
+# Batch prompts (see nlu_batch.py) list the messages as a JSON array
+BATCH_MESSAGES = re.compile(r"User messages:\n(\[.*\])\n", re.S)
+
+
+def prompt_text(payload: dict) -> str:
+    try:
+        return payload["contents"][0]["parts"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+def candidate(text: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP"
+        }]
+    }
+
+
+async def upstream_delay():
+    delay_ms = STUB_LATENCY_MS + random.uniform(-STUB_JITTER_MS, STUB_JITTER_MS)
+    await asyncio.sleep(max(0.0, delay_ms) / 1000)
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    payload = await request.json()
+    await upstream_delay()
+
+    batch = BATCH_MESSAGES.search(prompt_text(payload))
+    if batch:
+        items = json.loads(batch.group(1))
+        return candidate(json.dumps([dict(CANNED_RESPONSE, id=item["id"]) for item in items]))
+    return candidate(json.dumps(CANNED_RESPONSE))
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def stream_generate_content(model: str, request: Request):
+    await request.json()
+    text = json.dumps(CANNED_RESPONSE)
+    chunks = [text[i:i + STUB_STREAM_CHUNK_CHARS] for i in range(0, len(text), STUB_STREAM_CHUNK_CHARS)]
+
+    async def events():
+        # Spread the emulated latency over the chunks like a real token stream
+        delay_ms = max(0.0, STUB_LATENCY_MS + random.uniform(-STUB_JITTER_MS, STUB_JITTER_MS))
+        for chunk in chunks:
+            await asyncio.sleep(delay_ms / len(chunks) / 1000)
+            yield f"data: {json.dumps(candidate(chunk))}\r\n\r\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
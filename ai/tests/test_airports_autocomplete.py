@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+import ai_npu
+from gazetteer import TRIE_NODE_CODES
+
+client = TestClient(ai_npu.app)
+
+
+def test_limit_up_to_the_trie_cap():
+    response = client.get("/nlu/airports/autocomplete", params={"q": "a", "limit": TRIE_NODE_CODES})
+    assert response.status_code == 200
+    assert 0 < len(response.json()["results"]) <= TRIE_NODE_CODES
+    assert len(client.get("/nlu/airports/autocomplete", params={"q": "a", "limit": 3}).json()["results"]) <= 3
+
+
+def test_limit_outside_the_range_is_rejected():
+    for limit in (0, TRIE_NODE_CODES + 1, 50):
+        response = client.get("/nlu/airports/autocomplete", params={"q": "a", "limit": limit})
+        assert response.status_code == 422, limit
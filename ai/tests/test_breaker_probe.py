@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+import ai_npu
+from resilience import CircuitBreaker
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 60
+    return breaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = half_open_breaker()
+    monkeypatch.setattr(ai_npu, "breaker", breaker)
+    return breaker
+
+
+class HangingClient:
+    """Streams one fragment, then never answers."""
+
+    async def stream_generate_content(self, payload):
+        yield '{"slots":{"origin":"JFK",'
+        await asyncio.sleep(3600)
+        yield "}"
+
+
+def test_disconnected_half_open_stream_releases_the_probe(breaker, monkeypatch):
+    monkeypatch.setattr(ai_npu, "gemini_client", HangingClient())
+
+    async def disconnect_mid_stream():
+        events = ai_npu.stream_parse_events("somewhere warm for the holidays, maybe, not sure yet")
+        first = await events.__anext__()
+        assert breaker._probe_in_flight
+        await events.aclose()  # what Starlette does when the client goes away
+        return first
+
+    assert asyncio.run(disconnect_mid_stream()).startswith("event: slot")
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cancelled_half_open_stream_task_releases_the_probe(breaker, monkeypatch):
+    monkeypatch.setattr(ai_npu, "gemini_client", HangingClient())
+
+    async def cancel_consumer():
+        async def consume():
+            async for _ in ai_npu.stream_parse_events("a quiet beach trip sometime soon, flexible"):
+                pass
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_consumer())
+    assert breaker.allow()
+
+
+def test_cancelled_guarded_request_releases_the_probe(breaker, monkeypatch):
+    async def never_answers(payload):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(ai_npu, "request_gemini", never_answers)
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(ai_npu.guarded_request({}, hedge=False))
+        await asyncio.sleep(0.05)
+        assert breaker._probe_in_flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = half_open_breaker()
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
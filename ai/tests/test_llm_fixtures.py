@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from llm_fixtures import FixtureMissError, FixtureStore, RecordReplayClient, fixture_key
+from nlu_batch import build_batch_prompt
+from prompt_builder import build_payload, build_prompt
+
+RESPONSE = {"candidates": [{"content": {"parts": [{"text": '{"slots":{},"missing":[],"confidence":0.9}'}]}}]}
+
+
+class RecordingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, payload):
+        self.calls += 1
+        return RESPONSE
+
+
+@pytest.mark.parametrize("structured", [False, True])
+def test_key_ignores_the_date(structured):
+    message = "Paris to Rome 2026-12-01 to 2026-12-08, 2 adults"
+    keys = {fixture_key(build_payload(build_prompt(message, day, structured), structured=structured))
+            for day in ("2026-10-17", "2026-10-18", "2027-01-01")}
+    assert len(keys) == 1
+    batch_keys = {fixture_key(build_payload(build_batch_prompt({1: message}, day, ""))) for day in ("2026-10-17", "2026-10-18")}
+    assert len(batch_keys) == 1
+
+
+def test_key_still_depends_on_the_message():
+    first = fixture_key(build_payload(build_prompt("Paris to Rome", "2026-10-17")))
+    second = fixture_key(build_payload(build_prompt("Paris to Lisbon", "2026-10-17")))
+    assert first != second
+
+
+def test_fixture_recorded_on_one_day_replays_on_another(tmp_path):
+    path = str(tmp_path / "gemini.jsonl.gz")
+    recorded_payload = build_payload(build_prompt("NYC to Doha next week", "2026-10-17"))
+    replayed_payload = build_payload(build_prompt("NYC to Doha next week", "2026-10-18"))
+
+    inner = RecordingClient()
+    recorder = RecordReplayClient(inner, FixtureStore(path), "record")
+    assert asyncio.run(recorder.generate_content(recorded_payload)) == RESPONSE
+
+    replayer = RecordReplayClient(RecordingClient(), FixtureStore(path), "replay")
+    assert asyncio.run(replayer.generate_content(replayed_payload)) == RESPONSE
+    assert replayer.replayed == 1 and replayer.misses == 0
+
+    other = build_payload(build_prompt("NYC to Tokyo next week", "2026-10-18"))
+    with pytest.raises(FixtureMissError):
+        asyncio.run(replayer.generate_content(other))
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from slot_extractor import extract_dates, extract_single_slot, extract_slots
+
+TODAY = date(2026, 10, 1)
+
+
+@pytest.mark.parametrize("message", [
+    "SF to Doha Nov 10-15 for 2 people budget 2k",
+    "SF to Doha Nov 10–15 for 2 people budget 2k",
+    "SF to Doha Nov 10—15 for 2 people budget 2k",
+    "SF to Doha Nov 10 to 15 for 2 people budget 2k",
+])
+def test_full_message_takes_the_fast_path(message):
+    extraction = extract_slots(message, TODAY)
+    slots = extraction.result["slots"]
+    assert slots["origin"] == "SFO"
+    assert slots["destination"] == "DOH"
+    assert slots["dates"] == {"start": "2026-11-10", "end": "2026-11-15"}
+    assert slots["pax"] == {"adults": 2}
+    assert slots["budget"] == 2000.0
+    assert extraction.result["missing"] == ["car"]
+    assert extraction.score >= 0.7
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("2026-11-10 – 2026-11-15", (date(2026, 11, 10), date(2026, 11, 15))),
+    ("11/10—11/15", (date(2026, 11, 10), date(2026, 11, 15))),
+    ("dec 28 - jan 3", (date(2026, 12, 28), date(2027, 1, 3))),
+    ("nov 28th through dec 2nd", (date(2026, 11, 28), date(2026, 12, 2))),
+    ("leaving on sep 5", (date(2027, 9, 5), None)),
+    ("sometime soon", (None, None)),
+])
+def test_date_ranges(message, expected):
+    assert extract_dates(message, TODAY) == expected
+
+
+def test_places_pax_budget_car_and_amenities():
+    slots = extract_slots("from London to Paris, just me, under $1,500, no car, hotel with a pool", TODAY).result["slots"]
+    assert (slots["origin"], slots["destination"]) == ("LHR", "CDG")
+    assert slots["pax"] == {"adults": 1}
+    assert slots["budget"] == 1500.0
+    assert slots["car"] is False
+    assert slots["hotel"]["amenities"] == ["pool"]
+
+
+def test_single_slot_answers():
+    assert extract_single_slot("car", "yes please", TODAY) == {"car": True}
+    assert extract_single_slot("pax", "three", TODAY) == {"pax": {"adults": 3}}
@@ -6,7 +6,7 @@ from fastapi import APIRouter
 from core.config import settings
 
 # Import all API route modules
-from . import auth, users, trips, packages, components, bookings
+from . import auth, users, trips, packages, components, bookings, plan
 
 # Create main API router
 api_router = APIRouter()
@@ -48,6 +48,12 @@ api_router.include_router(
     tags=["bookings"]
 )
 
+api_router.include_router(
+    plan.router,
+    prefix="/plan",
+    tags=["planning"]
+)
+
 # Health check endpoint
 @api_router.get("/health", tags=["health"])
 async def health_check():
@@ -3,20 +3,62 @@ Package management API endpoints.
 """
 
 from typing import List, Optional, Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from dependencies import get_db, get_package_service, get_trip_service
+from dependencies import get_db, get_itinerary_service, get_package_service, get_trip_service, get_rescoring_job
+from services.itinerary_service import ItineraryService, parse_hhmm
 from services.package_service import PackageService
+from services.rescoring_job import RescoringJob
 from services.trip_service import TripService
 from models.package import Package, PackageCreate, PackageUpdate
 from core.security import get_current_active_user
 from models.user import User
+from core.config import settings
 
 router = APIRouter()
 
 
+@router.post("/rescore-all", status_code=status.HTTP_202_ACCEPTED)
+def rescore_all_packages(
+    background_tasks: BackgroundTasks,
+    restart: bool = Query(False),
+    rescoring_job: RescoringJob = Depends(get_rescoring_job),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Start re-scoring every package in the background, resuming from the last checkpoint (admin only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if rescoring_job.is_running():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Package re-scoring is already running"
+        )
+    
+    background_tasks.add_task(rescoring_job.run, restart=restart)
+    return {"message": "Package re-scoring started", "checkpoint": rescoring_job.load_checkpoint()}
+
+
+@router.get("/rescore-all/status")
+def get_rescore_all_status(
+    rescoring_job: RescoringJob = Depends(get_rescoring_job),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get progress of the bulk package re-scoring job (admin only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return rescoring_job.status()
+
+
 @router.get("/trip/{trip_id}", response_model=List[Package])
 def get_trip_packages(
     trip_id: UUID,
@@ -100,6 +142,42 @@ def get_package(
     return package
 
 
+@router.get("/{package_id}/itinerary")
+def get_package_itinerary(
+    package_id: UUID,
+    day_start: str = Query(settings.ITINERARY_DAY_START, regex=r"^([01]\d|2[0-3]):[0-5]\d$"),
+    day_end: str = Query(settings.ITINERARY_DAY_END, regex=r"^([01]\d|2[0-3]):[0-5]\d$"),
+    db: Session = Depends(get_db),
+    package_service: PackageService = Depends(get_package_service),
+    trip_service: TripService = Depends(get_trip_service),
+    itinerary_service: ItineraryService = Depends(get_itinerary_service),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Order the package's attractions into a day-by-day itinerary from the package hotel."""
+    if parse_hhmm(day_start, 0) >= parse_hhmm(day_end, 0):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="day_start must be before day_end"
+        )
+    
+    package = package_service.get_by_id(db, package_id)
+    if not package:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Package not found"
+        )
+    
+    # Verify user owns the trip this package belongs to
+    trip = trip_service.get_by_id(db, package.trip_id)
+    if not trip or trip.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return itinerary_service.build_itinerary(package, trip, day_start=day_start, day_end=day_end)
+
+
 @router.put("/{package_id}", response_model=Package)
 def update_package(
     package_id: UUID,
@@ -321,6 +399,33 @@ def update_package_score(
     return {"message": "Package score updated successfully", "package": updated_package}
 
 
+@router.put("/trip/{trip_id}/rescore")
+def rescore_trip_packages(
+    trip_id: UUID,
+    db: Session = Depends(get_db),
+    package_service: PackageService = Depends(get_package_service),
+    trip_service: TripService = Depends(get_trip_service),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Recalculate the scores of all packages of a trip in one batch."""
+    # Verify trip exists and user owns it
+    trip = trip_service.get_by_id(db, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+    
+    if trip.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    updated = package_service.rescore_trip_packages(db, trip_id)
+    return {"message": "Package scores updated successfully", "updated": updated}
+
+
 @router.get("/search/")
 def search_packages(
     trip_id: Optional[UUID] = Query(None),
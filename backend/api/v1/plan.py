@@ -0,0 +1,77 @@
+"""
+Trip planning API endpoints.
+"""
+
+import time
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from dependencies import get_db, get_planning_service, get_trip_service
+from services.planning_service import PlanningService
+from services.trip_service import TripService
+from schemas.plan import PlanBuildRequest, PlanBuildResponse
+from core.security import get_current_active_user
+from models.user import User
+
+router = APIRouter()
+
+
+@router.post("/build", response_model=PlanBuildResponse)
+async def build_plan(
+    plan_in: PlanBuildRequest,
+    db: Session = Depends(get_db),
+    planning_service: PlanningService = Depends(get_planning_service),
+    trip_service: TripService = Depends(get_trip_service),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Build travel packages for the given NLU slots by querying all providers concurrently."""
+    started = time.perf_counter()
+    missing = planning_service.missing_slots(plan_in.slots)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Missing slots: {', '.join(missing)}"
+        )
+    
+    query = planning_service.build_query(plan_in.slots)
+    if plan_in.prefs.trip_id:
+        # Verify trip exists and user owns it
+        trip = await run_in_threadpool(trip_service.get_by_id, db, plan_in.prefs.trip_id)
+        if not trip:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Trip not found"
+            )
+        
+        if trip.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+    else:
+        trip = await run_in_threadpool(
+            trip_service.create_trip, db, current_user.id, planning_service.trip_create(query)
+        )
+    
+    packages, providers = await planning_service.build_plan(
+        db, trip, query, max_packages=plan_in.prefs.max_packages
+    )
+    return {
+        "trip_id": trip.id,
+        "packages": packages,
+        "providers": providers,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@router.get("/cache/stats")
+def get_quote_cache_stats(
+    planning_service: PlanningService = Depends(get_planning_service),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get provider quote cache hit rates per provider."""
+    if planning_service.quote_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **planning_service.quote_cache.stats()}
@@ -2,13 +2,17 @@
 Trip management API endpoints.
 """
 
+import json
 from typing import List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 
-from dependencies import get_db, get_trip_service
+from dependencies import get_db, get_trip_service, get_price_matrix_service
 from services.trip_service import TripService
+from services.price_matrix_service import PriceMatrixService
 from models.trip import Trip, TripCreate, TripUpdate, TripPublic
 from core.security import get_current_active_user
 from models.user import User
@@ -207,6 +211,39 @@ def get_trip_stats(
     return stats
 
 
+@router.get("/{trip_id}/price-matrix")
+async def get_trip_price_matrix(
+    trip_id: UUID,
+    flex_days: int = Query(3, ge=0, le=7),
+    db: Session = Depends(get_db),
+    trip_service: TripService = Depends(get_trip_service),
+    price_matrix_service: PriceMatrixService = Depends(get_price_matrix_service),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Stream a start x end date price grid (trip dates +/- flex_days) as NDJSON:
+    a meta line, one line per start date as soon as its quotes are in, then a summary.
+    """
+    trip = await run_in_threadpool(trip_service.get_by_id, db, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+    
+    if trip.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    async def lines():
+        async for item in price_matrix_service.stream_matrix(trip, flex_days):
+            yield json.dumps(item) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/search/")
 def search_trips(
     destination: Optional[str] = Query(None),
@@ -50,7 +50,21 @@ CREATE TABLE packages (
     hotel_data JSONB,
     car_data JSONB,
     attractions_data JSONB,
-    deeplinks JSONB NOT NULL DEFAULT '{}' -- e.g., {'expedia': 'https://...', 'hertz': '...'}
+    deeplinks JSONB NOT NULL DEFAULT '{}', -- e.g., {'expedia': 'https://...', 'hertz': '...'}
+    flight_ref VARCHAR(64), -- package_components.hash; flight_data is then left empty
+    hotel_ref VARCHAR(64),
+    car_ref VARCHAR(64)
+);
+
+-- Table: package_components (Flight / hotel / car JSON shared by packages, stored once per content)
+CREATE TABLE package_components (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    hash VARCHAR(64) UNIQUE NOT NULL, -- SHA-256 of the canonical JSON
+    kind VARCHAR(20) NOT NULL, -- 'flight', 'hotel', 'car'
+    data JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Table: trip_components (The user's FINAL chosen components, linked to a package)
@@ -76,10 +90,67 @@ CREATE TABLE booking_references (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Table: hotel_inventory (Hotels streamed in from provider inventory feeds)
+CREATE TABLE hotel_inventory (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    provider VARCHAR(100) NOT NULL, -- e.g., 'acme'
+    provider_id VARCHAR(255) NOT NULL, -- The hotel's id in that provider's feed
+    destination_code VARCHAR(3) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    stars INTEGER,
+    nightly_price DOUBLE PRECISION NOT NULL,
+    currency VARCHAR(3) NOT NULL DEFAULT 'USD',
+    amenities JSONB, -- e.g., ['breakfast', 'pool']
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_hotel_inventory_provider_id UNIQUE (provider, provider_id) -- Target of the ingestion upsert
+);
+
+-- Table: attraction_inventory (Attractions streamed in from provider inventory feeds)
+CREATE TABLE attraction_inventory (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    provider VARCHAR(100) NOT NULL,
+    provider_id VARCHAR(255) NOT NULL,
+    destination_code VARCHAR(3) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    category VARCHAR(50), -- e.g., 'museum', 'park'
+    duration_minutes INTEGER,
+    price DOUBLE PRECISION NOT NULL DEFAULT 0,
+    currency VARCHAR(3) NOT NULL DEFAULT 'USD',
+    opens VARCHAR(5), -- Local time, 'HH:MM'
+    closes VARCHAR(5),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_attraction_inventory_provider_id UNIQUE (provider, provider_id) -- Target of the ingestion upsert
+);
+
 -- Indexes for performance
 CREATE INDEX idx_trips_user_id ON trips(user_id);
 CREATE INDEX idx_trips_share_code ON trips(share_code);
 CREATE INDEX idx_packages_trip_id ON packages(trip_id);
 CREATE INDEX idx_trip_components_trip_id ON trip_components(trip_id);
 CREATE INDEX idx_booking_refs_user_id ON booking_references(user_id);
-CREATE INDEX idx_booking_refs_component_id ON booking_references(trip_component_id);
\ No newline at end of file
+CREATE INDEX idx_booking_refs_component_id ON booking_references(trip_component_id);
+CREATE INDEX idx_hotel_inventory_destination ON hotel_inventory(destination_code);
+CREATE INDEX idx_attraction_inventory_destination ON attraction_inventory(destination_code);
+
+-- Migration: package component store. Required on databases created before packages had the
+-- *_ref columns; run this section on its own there (it is a no-op on a database created above).
+-- Existing packages keep their inline JSON; `python -m repositories.package_component_repository
+-- migrate` moves it into package_components afterwards if wanted.
+ALTER TABLE packages ADD COLUMN IF NOT EXISTS flight_ref VARCHAR(64);
+ALTER TABLE packages ADD COLUMN IF NOT EXISTS hotel_ref VARCHAR(64);
+ALTER TABLE packages ADD COLUMN IF NOT EXISTS car_ref VARCHAR(64);
+CREATE TABLE IF NOT EXISTS package_components (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    hash VARCHAR(64) UNIQUE NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    data JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,154 @@
+"""
+Load test for the request-scoped database session (core.database.get_db).
+
+Runs the app in-process against a SQLite file behind the same pool settings as production
+(QueuePool, pool_size=10, max_overflow=20) and fires concurrent authenticated requests at
+GET /api/v1/trips/. Counts pool checkouts per request and the peak number of connections
+checked out at once, and reports throughput and latency, in two modes:
+
+- separate_sessions: auth resolves its own session, as when core.security and the routers
+  depended on two different get_db callables (two sessions, two connections per request);
+- shared_session: the current wiring, one session per request.
+
+With two sessions, more than (pool_size + max_overflow) / 2 concurrent requests can exhaust
+the pool outright: each request holds one connection while it waits for its second, until
+pool_timeout. The default concurrency stays below that so both modes complete.
+
+Usage (from backend/):
+    python bench_db_sessions.py [--requests 2000] [--concurrency 12] [--pool-size 10] [--max-overflow 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+import numpy as np
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from sqlmodel import SQLModel
+
+
+class PoolCounter:
+    """Pool checkouts and the peak number of connections checked out at once."""
+
+    def __init__(self, engine):
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak = 0
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _checkout(self, *args):
+        self.checkouts += 1
+        self.checked_out += 1
+        self.peak = max(self.peak, self.checked_out)
+
+    def _checkin(self, *args):
+        self.checked_out -= 1
+
+    def reset(self):
+        self.checkouts = 0
+        self.peak = self.checked_out
+
+
+async def load(client, token: str, requests: int, concurrency: int):
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            started = time.perf_counter()
+            response = await client.get("/api/v1/trips/", headers={"Authorization": f"Bearer {token}"})
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request-scoped session load test")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--max-overflow", type=int, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    import httpx
+    import core.database
+    from core.security import create_access_token, get_current_user, oauth2_scheme
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'sessions.db')}", connect_args={"check_same_thread": False},
+            poolclass=QueuePool, pool_size=args.pool_size, max_overflow=args.max_overflow, pool_timeout=args.pool_timeout,
+        )
+        core.database.engine = engine
+        core.database.SessionLocal.configure(bind=engine)
+        core.database.init_db = lambda: None
+        import main as app_module
+        from models.trip import Trip
+        from models.user import User
+
+        SQLModel.metadata.create_all(engine)
+        db = core.database.SessionLocal()
+        user = User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        for i in range(20):
+            start = date(2026, 12, 1) + timedelta(days=i)
+            db.add(Trip(user_id=user.id, origin_code="SFO", origin_name="San Francisco", destination_code="DOH",
+                        destination_name="Doha", start_date=start, end_date=start + timedelta(days=7), budget=3000))
+        db.commit()
+        token = create_access_token(user.id)
+        db.close()
+
+        def separate_get_db():
+            # A second, distinct session dependency: what auth used before the two were unified
+            separate = core.database.SessionLocal()
+            try:
+                yield separate
+            finally:
+                separate.close()
+
+        def separate_session_user(session: Session = Depends(separate_get_db), token: str = Depends(oauth2_scheme)):
+            return get_current_user(db=session, token=token)
+
+        counter = PoolCounter(engine)
+        report = {"requests": args.requests, "concurrency": args.concurrency,
+                  "pool_size": args.pool_size, "max_overflow": args.max_overflow}
+
+        async def run_modes():
+            transport = httpx.ASGITransport(app=app_module.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for mode in ("separate_sessions", "shared_session"):
+                    app_module.app.dependency_overrides.clear()
+                    if mode == "separate_sessions":
+                        app_module.app.dependency_overrides[get_current_user] = separate_session_user
+                    await load(client, token, min(200, args.requests), args.concurrency)  # warm up
+                    counter.reset()
+                    elapsed, latencies, errors = await load(client, token, args.requests, args.concurrency)
+                    report[mode] = {
+                        "checkouts_per_request": round(counter.checkouts / args.requests, 2),
+                        "peak_connections": counter.peak,
+                        "requests_per_sec": round(args.requests / elapsed, 1),
+                        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+                        "errors": errors,
+                    }
+
+        asyncio.run(run_modes())
+        engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark for the hotel inventory index (providers.hotel_index).
+
+Loads N synthetic hotels (into one destination by default, the worst case for a query) and
+times amenity + price-cap searches against a plain Python scan of the same records, checking
+that both return the same hotels. Also times an incremental feed update of a fraction of the
+hotels against rebuilding the index from scratch.
+
+Usage (from backend/):
+    python bench_hotel_index.py [--hotels 1000000] [--destinations 1] [--queries 200] [--update-fraction 0.01]
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+
+from providers.hotel_index import HotelIndex
+
+AMENITIES = ["breakfast", "pool", "wifi", "gym", "parking", "spa", "beach", "airport_shuttle", "kitchen"]
+
+
+def make_hotels(rng: np.random.Generator, n: int, destinations: int):
+    stars = rng.integers(2, 6, size=n)
+    prices = (rng.uniform(35, 90, size=n) + stars * rng.uniform(25, 60, size=n)).round(2)
+    # Each amenity present with its own probability, so some combinations are rare
+    has = rng.random((n, len(AMENITIES))) < np.linspace(0.7, 0.15, len(AMENITIES))
+    codes = [f"D{i:04d}" for i in range(destinations)]
+    dest = rng.integers(0, destinations, size=n)
+    return [
+        {
+            "hotel_id": f"H{i:07d}",
+            "destination_code": codes[dest[i]],
+            "name": f"Hotel {i}",
+            "stars": int(stars[i]),
+            "nightly_price": float(prices[i]),
+            "amenities": [a for a, present in zip(AMENITIES, has[i]) if present],
+        }
+        for i in range(n)
+    ], codes
+
+
+def naive_search(hotels, destination, amenities, max_price, limit):
+    wanted = set(amenities)
+    matches = [
+        h for h in hotels
+        if h["destination_code"] == destination and h["nightly_price"] <= max_price and wanted <= set(h["amenities"])
+    ]
+    matches.sort(key=lambda h: h["nightly_price"])
+    return matches[:limit]
+
+
+def percentile_ms(timings, q):
+    return round(float(np.percentile(timings, q)), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hotel inventory index benchmark")
+    parser.add_argument("--hotels", type=int, default=1_000_000)
+    parser.add_argument("--destinations", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--naive-queries", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--update-fraction", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    hotels, codes = make_hotels(rng, args.hotels, args.destinations)
+
+    index = HotelIndex()
+    started = time.perf_counter()
+    index.apply(hotels)
+    build_s = time.perf_counter() - started
+
+    queries = []
+    for _ in range(args.queries):
+        amenities = list(rng.choice(AMENITIES, size=rng.integers(1, 4), replace=False))
+        queries.append((codes[rng.integers(len(codes))], amenities, float(rng.uniform(80, 400))))
+
+    timings = []
+    for destination, amenities, max_price in queries:
+        started = time.perf_counter()
+        index.search(destination, amenities, max_price=max_price, limit=args.limit)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    naive_timings, mismatches = [], 0
+    for destination, amenities, max_price in queries[:args.naive_queries]:
+        started = time.perf_counter()
+        expected = naive_search(hotels, destination, amenities, max_price, args.limit)
+        naive_timings.append((time.perf_counter() - started) * 1000)
+        found = index.search(destination, amenities, max_price=max_price, limit=args.limit)
+        # Hotels with equal prices may come in either order, so the price sequences are compared
+        if [h["nightly_price"] for h in found] != [h["nightly_price"] for h in expected]:
+            mismatches += 1
+
+    changed = rng.choice(len(hotels), size=int(len(hotels) * args.update_fraction), replace=False)
+    updates = [dict(hotels[i], nightly_price=round(hotels[i]["nightly_price"] * float(rng.uniform(0.8, 1.2)), 2)) for i in changed]
+    started = time.perf_counter()
+    index.apply(updates)
+    update_s = time.perf_counter() - started
+
+    print(json.dumps({
+        "hotels": args.hotels,
+        "destinations": args.destinations,
+        "build_s": round(build_s, 2),
+        "column_bytes": index.stats()["column_bytes"],
+        "query_ms_p50": percentile_ms(timings, 50),
+        "query_ms_p95": percentile_ms(timings, 95),
+        "naive_query_ms_p50": percentile_ms(naive_timings, 50) if naive_timings else None,
+        "mismatches": mismatches,
+        "updated_hotels": len(updates),
+        "incremental_update_s": round(update_s, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark for streaming inventory ingestion (services.inventory_ingestion).
+
+Writes a synthetic hotel feed of N records (streamed to disk, never held in memory), then
+ingests it into --database-url (a temporary SQLite file by default; pass a Postgres URL to
+exercise COPY) and reports rows/sec and peak memory. Run it at two sizes to see that peak
+memory does not follow the feed size. A second pass over the same feed measures the
+update path of the upsert.
+
+Usage (from backend/):
+    python bench_inventory_ingestion.py [--rows 1000000] [--format json|jsonl|csv] [--database-url URL]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.inventory import AttractionInventory, HotelInventory
+from services.inventory_ingestion import InventoryIngestion, peak_memory_mb
+
+AMENITIES = ["breakfast", "pool", "wifi", "gym", "parking", "spa", "beach", "airport_shuttle", "kitchen"]
+FIELDS = ["provider_id", "destination_code", "name", "stars", "nightly_price", "amenities", "latitude", "longitude"]
+
+
+def make_record(rng: random.Random, i: int) -> dict:
+    return {
+        "provider_id": f"H{i:08d}",
+        "destination_code": f"{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i // 676 % 26)}",
+        "name": f"Hotel {i}",
+        "stars": rng.randint(1, 5),
+        "nightly_price": round(rng.uniform(40, 400), 2),
+        "amenities": rng.sample(AMENITIES, rng.randint(0, 5)),
+        "latitude": round(rng.uniform(-60, 70), 5),
+        "longitude": round(rng.uniform(-180, 180), 5),
+    }
+
+
+def write_feed(path: str, rows: int, fmt: str, seed: int, invalid_every: int) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, FIELDS) if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        elif fmt == "json":
+            f.write('{"hotels": [\n')
+        for i in range(rows):
+            record = make_record(rng, i)
+            if invalid_every and i % invalid_every == 0:
+                record["nightly_price"] = -1  # rejected by validation
+            if writer:
+                writer.writerow(dict(record, amenities="|".join(record["amenities"])))
+            else:
+                f.write(("," if fmt == "json" and i else "") + json.dumps(record) + "\n")
+        if fmt == "json":
+            f.write("]}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory feed ingestion benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["json", "jsonl", "csv"], default="json")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--invalid-every", type=int, default=1000, help="make every Nth record invalid (0: none)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = os.path.join(tmp, f"hotels.{args.format}")
+        write_feed(feed, args.rows, args.format, args.seed, args.invalid_every)
+        memory_before = peak_memory_mb()
+
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'inventory.db')}")
+        HotelInventory.metadata.create_all(engine, tables=[HotelInventory.__table__, AttractionInventory.__table__])
+        ingestion = InventoryIngestion(sessionmaker(bind=engine), batch_size=args.batch_size)
+
+        passes = {}
+        for name in ("insert", "update"):
+            report = ingestion.run("hotels", feed, provider="bench", json_prefix="hotels.item")
+            passes[name] = {key: report[key] for key in ("read", "valid", "invalid", "upserted", "elapsed_s", "rows_per_sec")}
+
+        print(json.dumps({
+            "rows": args.rows,
+            "format": args.format,
+            "feed_mb": round(os.path.getsize(feed) / 1024 / 1024, 1),
+            "database": engine.dialect.name,
+            "peak_memory_mb_before_ingest": memory_before,
+            "peak_memory_mb": peak_memory_mb(),
+            **passes,
+        }, indent=2))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
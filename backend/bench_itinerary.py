@@ -0,0 +1,117 @@
+"""
+Benchmark for package itineraries (services.itinerary_service).
+
+Generates random attractions around a city centre (random opening hours and visit lengths)
+and plans them over a few days from a hotel, reporting planning latency against the time
+budget and how much 2-opt shortens the nearest-neighbour routes. Every planned day is
+re-simulated independently to check that no stop is visited outside its opening hours and
+that the day ends back at the hotel in time.
+The "dense" scenario puts all stops in one long day, the worst case for 2-opt.
+
+Usage (from backend/):
+    python bench_itinerary.py [--stops 100] [--days 12] [--trials 200] [--budget-ms 50]
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+import numpy as np
+
+from core.config import settings
+from providers.attraction_index import AttractionIndex
+from services.itinerary_service import ItineraryService, parse_hhmm
+
+CENTER = (48.8566, 2.3522)
+
+
+def make_stops(rng: np.random.Generator, stops: int, short_visits: bool):
+    latitude = CENTER[0] + rng.normal(0, 0.04, stops)
+    longitude = CENTER[1] + rng.normal(0, 0.06, stops)
+    opens = rng.choice([0, 8, 9, 10, 11, 14], stops)
+    closes = np.minimum(opens + rng.integers(4, 12, stops), 23)
+    durations = rng.integers(5, 20, stops) if short_visits else rng.choice([30, 45, 60, 90, 120], stops)
+    return [
+        {
+            'id': f"a{i}",
+            'name': f"Attraction {i}",
+            'latitude': float(latitude[i]),
+            'longitude': float(longitude[i]),
+            'opens': None if opens[i] == 0 else f"{opens[i]:02d}:00",
+            'closes': None if opens[i] == 0 else f"{closes[i]:02d}:00",
+            'duration_minutes': int(durations[i]),
+        }
+        for i in range(stops)
+    ]
+
+
+def violations(itinerary, day_start: str, day_end: str) -> int:
+    """Visits starting before opening, ending after closing or outside the day, or overlapping; days back late."""
+    count = 0
+    for day in itinerary['days']:
+        previous_end = parse_hhmm(day_start, 0)
+        for stop in day['stops']:
+            start, end = parse_hhmm(stop['start'], 0), parse_hhmm(stop['end'], 0)
+            count += (
+                start < parse_hhmm(stop['opens'], 0)
+                or end > parse_hhmm(stop['closes'], 24 * 60) + 1       # +1: HH:MM rounding
+                or end > parse_hhmm(day_end, 24 * 60) + 1
+                or start < previous_end - 1
+                or end - start < stop['duration_minutes'] - 1
+            )
+            previous_end = end
+        count += parse_hhmm(day['back_at_hotel'], 0) > parse_hhmm(day_end, 24 * 60) + 1
+    return count
+
+
+def run(service: ItineraryService, rng, args, stops: int, days: int, short_visits: bool, day_end: str):
+    elapsed, saved, scheduled, exhausted, broken = [], [], [], 0, 0
+    day_start = settings.ITINERARY_DAY_START
+    for _ in range(args.trials):
+        attractions = make_stops(rng, stops, short_visits)
+        started = time.perf_counter()
+        itinerary = service.plan_stops(attractions, CENTER, date(2026, 12, 1), days,
+                                       day_start=day_start, day_end=day_end, budget_ms=args.budget_ms)
+        elapsed.append((time.perf_counter() - started) * 1000)
+        if itinerary['nearest_neighbour_km']:
+            saved.append(1 - itinerary['distance_km'] / itinerary['nearest_neighbour_km'])
+        scheduled.append(stops - len(itinerary['unscheduled']))
+        exhausted += itinerary['budget_exhausted']
+        broken += violations(itinerary, day_start, day_end)
+    return {
+        'stops': stops,
+        'days': days,
+        'day': f"{day_start}-{day_end}",
+        'ms_p50': round(float(np.percentile(elapsed, 50)), 2),
+        'ms_p99': round(float(np.percentile(elapsed, 99)), 2),
+        'ms_max': round(float(np.max(elapsed)), 2),
+        'budget_exhausted': exhausted,
+        'scheduled_mean': round(float(np.mean(scheduled)), 1),
+        'two_opt_saving_pct': round(float(np.mean(saved)) * 100, 1) if saved else None,
+        'hour_violations': broken,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Itinerary planning benchmark")
+    parser.add_argument("--stops", type=int, default=100)
+    parser.add_argument("--days", type=int, default=12)
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=settings.ITINERARY_BUDGET_MS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    service = ItineraryService(attraction_index=AttractionIndex.build([]))
+    service.plan_stops(make_stops(rng, 10, False), CENTER, date(2026, 12, 1), 1)  # warm up NumPy
+
+    print(json.dumps({
+        'budget_ms': args.budget_ms,
+        'multi_day': run(service, rng, args, args.stops, args.days, False, settings.ITINERARY_DAY_END),
+        'dense': run(service, rng, args, args.stops, 1, True, "23:59"),
+        'package_sized': run(service, rng, args, 3, 1, False, settings.ITINERARY_DAY_END),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for the vectorized package combiner (services.package_combiner).
+
+Generates N flights, hotels and cars with correlated prices / values, then times
+top_k_combinations at each size. Where the cross product is small enough, a plain
+Python loop over every combination is timed too and the results are compared.
+
+Usage (from backend/):
+    python bench_package_combiner.py [--sizes 100 1000 10000] [--k 5] [--repeat 5]
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import time
+import numpy as np
+
+from services.package_combiner import top_k_combinations
+
+# Largest cross product the naive loop is run on
+NAIVE_MAX_COMBINATIONS = 2_000_000
+
+
+def make_inventory(rng: np.random.Generator, n: int, price_range, value_per_dollar: float):
+    prices = rng.uniform(*price_range, size=n).round(2)
+    values = (prices * value_per_dollar + rng.normal(0, price_range[1] * 0.1, size=n)).round(2)
+    return prices, values
+
+
+def naive_top_k(prices, values, k, budget):
+    combos = (
+        (sum(values[c][i] for c, i in enumerate(ix)) - total, -total, ix)
+        for ix in itertools.product(*(range(len(p)) for p in prices))
+        for total in [sum(prices[c][i] for c, i in enumerate(ix))]
+        if total <= budget
+    )
+    return heapq.nlargest(k, combos)
+
+
+def best_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(min(timings), 3)
+
+
+def run(n: int, k: int, repeat: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    flights = make_inventory(rng, n, (300, 1500), 0.9)
+    hotels = make_inventory(rng, n, (200, 2500), 1.1)
+    cars = make_inventory(rng, n, (100, 600), 0.8)
+    prices = [flights[0], hotels[0], cars[0]]
+    values = [flights[1], hotels[1], cars[1]]
+    budget = 2500.0
+
+    result = top_k_combinations(prices, values, k, budget=budget)
+    report = {
+        "options_per_category": n,
+        "combinations": n ** 3,
+        "numpy_ms": best_ms(lambda: top_k_combinations(prices, values, k, budget=budget), repeat),
+        "best_utility": round(result[0].utility, 2) if result else None,
+    }
+
+    if n ** 3 <= NAIVE_MAX_COMBINATIONS:
+        py_prices = [p.tolist() for p in prices]
+        py_values = [v.tolist() for v in values]
+        naive = naive_top_k(py_prices, py_values, k, budget)
+        report["naive_ms"] = best_ms(lambda: naive_top_k(py_prices, py_values, k, budget), 1)
+        report["speedup"] = round(report["naive_ms"] / report["numpy_ms"], 1)
+        report["matches_naive"] = np.allclose([c.utility for c in result], [u for u, _, _ in naive])
+    else:
+        report["naive_ms"] = None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-k package combiner benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(json.dumps([run(n, args.k, args.repeat, args.seed) for n in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
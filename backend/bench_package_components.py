@@ -0,0 +1,159 @@
+"""
+Benchmark for the content-addressed package component store (repositories.package_component_repository).
+
+Fills two SQLite databases with the same packages (trips to a few popular destinations whose
+packages mix and match the stub providers' flight, hotel and car offers for the trip, like
+repeated plan builds do; trips with the same route and dates see the same offers): one with every
+package holding its own JSON copies, one through the component store. Reports the database
+size and component bytes of each, then the latency of the package endpoints' reads (a
+trip's package list, the best packages, one package by id, serialized as the API does) with
+inline JSON, a cold component LRU and a warm one.
+
+Usage (from backend/):
+    python bench_package_components.py [--trips 500] [--packages-per-trip 20] [--start-dates 30] [--requests 300]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from core.config import settings
+from models.package import PackageCreate
+from models.trip import Trip
+from models.user import User
+from providers import ProviderQuery, StubCarProvider, StubFlightProvider, StubHotelProvider
+from repositories.package_component_repository import get_component_cache, get_component_repository, register_listeners
+from repositories.package_repository import PackageRepository
+
+DESTINATIONS = ["DOH", "LHR", "CDG", "JFK", "NRT", "DXB", "SIN", "BCN"]
+
+
+def make_packages(rng: random.Random, trip_id, query: ProviderQuery, count: int):
+    # The stub providers answer the same query with the same offers, as a quote cache would
+    offers = {
+        kind: asyncio.run(provider.search(query))
+        for kind, provider in (("flight", StubFlightProvider()), ("hotel", StubHotelProvider()), ("car", StubCarProvider()))
+    }
+    packages = []
+    for _ in range(count):
+        flight, hotel, car = (rng.choice(offers[kind]) for kind in ("flight", "hotel", "car"))
+        packages.append(PackageCreate(
+            trip_id=trip_id,
+            total_price=round(flight["price"] + hotel["price"] + car["price"], 2),
+            score=round(rng.uniform(3, 9), 2),
+            explanation=f"{flight['description']}; {hotel['description']}; {car['description']}",
+            flight_data=flight, hotel_data=hotel, car_data=car,
+            deeplinks={"flight": flight["deeplink"], "hotel": hotel["deeplink"], "car": car["deeplink"]},
+        ))
+    return packages
+
+
+def populate(path: str, args, dedup: bool):
+    settings.PACKAGE_COMPONENT_DEDUP = dedup
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    repository = PackageRepository()
+    rng = random.Random(args.seed)
+
+    db = Session()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    trip_ids, package_ids = [], []
+    started = time.perf_counter()
+    for t in range(args.trips):
+        start = date(2026, 12, 1) + timedelta(days=rng.randrange(args.start_dates))
+        trip = Trip(
+            user_id=user.id, origin_code="SFO", origin_name="San Francisco",
+            destination_code=DESTINATIONS[t % len(DESTINATIONS)], destination_name="Destination",
+            start_date=start, end_date=start + timedelta(days=7), budget=5000,
+        )
+        db.add(trip)
+        db.commit()
+        query = ProviderQuery(origin_code="SFO", destination_code=trip.destination_code,
+                              start_date=trip.start_date, end_date=trip.end_date, adults=2, need_car=True)
+        created = repository.create_many(db, make_packages(rng, trip.id, query, args.packages_per_trip))
+        trip_ids.append(trip.id)
+        package_ids.extend(p.id for p in created)
+    write_s = time.perf_counter() - started
+    stats = get_component_repository().storage_stats(db)
+    db.close()
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    return engine, Session, trip_ids, package_ids, write_s, stats
+
+
+def read_latency(Session, trip_ids, package_ids, args, cold: bool):
+    """Per-request milliseconds of the reads behind GET /packages/trip/{id}, /trip/{id}/best and /{id}."""
+    repository = PackageRepository()
+    rng = random.Random(args.seed + 1)
+    timings = {"trip_packages": [], "best_packages": [], "package": []}
+    for _ in range(args.requests):
+        for name in timings:
+            if cold:
+                get_component_cache().clear()
+            started = time.perf_counter()
+            db = Session()
+            if name == "trip_packages":
+                result = repository.get_trip_packages(db, rng.choice(trip_ids))
+            elif name == "best_packages":
+                result = repository.get_best_packages_for_trip(db, rng.choice(trip_ids), limit=5)
+            else:
+                result = [repository.get_by_id(db, rng.choice(package_ids))]
+            json.dumps([p.dict() for p in result], default=str)
+            db.close()
+            timings[name].append((time.perf_counter() - started) * 1000)
+    return {
+        name: {"p50_ms": round(float(np.percentile(t, 50)), 3), "p99_ms": round(float(np.percentile(t, 99)), 3)}
+        for name, t in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Package component store benchmark")
+    parser.add_argument("--trips", type=int, default=500)
+    parser.add_argument("--packages-per-trip", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--start-dates", type=int, default=30, help="distinct trip start dates per destination")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    settings.PROVIDER_STUB_LATENCY_MS = 0
+    register_listeners()
+
+    report = {"packages": args.trips * args.packages_per_trip}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, dedup in (("inline", False), ("component_store", True)):
+            path = os.path.join(tmp, f"{label}.db")
+            engine, Session, trip_ids, package_ids, write_s, stats = populate(path, args, dedup)
+            get_component_cache().clear()
+            report[label] = {
+                "database_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+                "component_json_mb": round(stats["stored_bytes"] / 1024 / 1024, 2),
+                "unique_components": stats["components"],
+                "write_s": round(write_s, 2),
+                "read": read_latency(Session, trip_ids, package_ids, args, cold=False),
+            }
+            if dedup:
+                report[label]["read_cold_lru"] = read_latency(Session, trip_ids, package_ids, args, cold=True)
+                report[label]["read"] = read_latency(Session, trip_ids, package_ids, args, cold=False)
+                report[label]["lru"] = get_component_cache().stats()
+            engine.dispose()
+    report["database_saved_pct"] = round(100 * (1 - report["component_store"]["database_mb"] / report["inline"]["database_mb"]), 1)
+    report["component_json_saved_pct"] = round(
+        100 * (1 - report["component_store"]["component_json_mb"] / report["inline"]["component_json_mb"]), 1
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark for the offline route graph (providers.route_graph).
+
+Generates a synthetic hub-and-spoke network (regional airports fly to their two nearest hubs,
+hubs fly to every other hub, several departures a day), then reports build time, adjacency
+array size and Pareto search latency for random airport pairs.
+With --verify, the first queries are checked against brute-force enumeration of every
+itinerary within the same stop / connection limits.
+
+Usage (from backend/):
+    python bench_route_graph.py [--airports 10000] [--hubs 100] [--queries 200] [--verify 20]
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+
+from core.config import settings
+from providers.route_graph import MINUTES_PER_DAY, RouteGraph
+
+
+def make_schedule(rng: np.random.Generator, airports: int, hubs: int):
+    codes = [f"A{i:05d}" for i in range(airports)]
+    xy = rng.uniform(0, 10000, size=(airports, 2))  # km on a flat map, good enough for durations and fares
+    hub_ids = range(hubs)
+    hub_distance = np.linalg.norm(xy[:, None, :] - xy[None, :hubs, :], axis=2)
+
+    routes = set()
+    for spoke in range(hubs, airports):
+        for hub in np.argsort(hub_distance[spoke])[:2]:
+            routes.add((spoke, int(hub)))
+            routes.add((int(hub), spoke))
+    for a in hub_ids:
+        for b in hub_ids:
+            if a != b:
+                routes.add((int(a), int(b)))
+
+    rows = []
+    for n, (a, b) in enumerate(sorted(routes)):
+        distance = float(np.linalg.norm(xy[a] - xy[b]))
+        duration = int(40 + distance / 13)
+        base_fare = 60 + distance * 0.09
+        daily = 4 if a < hubs and b < hubs else 2
+        for departure in rng.choice(np.arange(0, MINUTES_PER_DAY, 5), size=daily, replace=False):
+            fare = round(base_fare * rng.uniform(0.7, 1.4), 2)
+            rows.append((codes[a], codes[b], int(departure), duration, fare, "XX", f"XX{n}-{departure}"))
+    return codes[hubs:], rows
+
+
+def brute_force(graph: RouteGraph, origin: str, destination: str):
+    """Every itinerary within the search limits by depth-first enumeration, reduced to its Pareto set."""
+    source, target = graph.index[origin], graph.index[destination]
+    found = []
+
+    def extend(node, first, arrive, price, stops):
+        if node == target:
+            found.append((round(price, 2), arrive - first, stops))
+            return
+        if stops >= settings.ROUTE_MAX_STOPS:
+            return
+        for edge, departure in graph._departures(node, arrive + settings.ROUTE_MIN_CONNECTION_MINUTES,
+                                                 arrive + settings.ROUTE_MAX_LAYOVER_MINUTES):
+            if graph.destination[edge] != source:
+                extend(graph.destination[edge], first, departure + graph.duration[edge], price + graph.fare[edge], stops + 1)
+
+    for edge, departure in graph._departures(source, 0, MINUTES_PER_DAY - 1):
+        extend(graph.destination[edge], departure, departure + graph.duration[edge], graph.fare[edge], 0)
+
+    front = []
+    for candidate in sorted(found):
+        if not any(f[0] <= candidate[0] and f[1] <= candidate[1] and f[2] <= candidate[2] for f in front):
+            front.append(candidate)
+    return front
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route graph Pareto search benchmark")
+    parser.add_argument("--airports", type=int, default=10000)
+    parser.add_argument("--hubs", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--verify", type=int, default=0, help="check this many queries against brute force")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    spokes, rows = make_schedule(rng, args.airports, args.hubs)
+
+    started = time.perf_counter()
+    graph = RouteGraph.from_rows(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    pairs = [tuple(rng.choice(spokes, size=2, replace=False)) for _ in range(args.queries)]
+    timings, labels, results = [], [], []
+    for origin, destination in pairs:
+        stats = {}
+        started = time.perf_counter()
+        itineraries = graph.search(origin, destination, stats=stats)
+        timings.append((time.perf_counter() - started) * 1000)
+        labels.append(stats["labels"])
+        results.append(itineraries)
+
+    report = {
+        "airports": len(graph.codes),
+        "flights": len(graph.depart),
+        "build_ms": round(build_ms, 1),
+        "adjacency_bytes": graph.nbytes,
+        "queries": len(pairs),
+        "query_ms_p50": round(float(np.percentile(timings, 50)), 2),
+        "query_ms_p95": round(float(np.percentile(timings, 95)), 2),
+        "query_ms_max": round(max(timings), 2),
+        "labels_mean": round(float(np.mean(labels)), 1),
+        "pareto_size_mean": round(float(np.mean([len(r) for r in results])), 2),
+        "no_route": sum(1 for r in results if not r),
+    }
+
+    if args.verify:
+        mismatches = 0
+        for (origin, destination), itineraries in list(zip(pairs, results))[:args.verify]:
+            expected = brute_force(graph, origin, destination)
+            if [(i.price, i.duration, i.stops) for i in itineraries] != expected:
+                mismatches += 1
+        report["verified"] = min(args.verify, len(pairs))
+        report["mismatches"] = mismatches
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import os
-from typing import Optional, List
+from typing import Optional, List, Dict
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -50,6 +50,71 @@ class Settings:
     GOOGLE_MAPS_API_KEY: Optional[str] = os.getenv("GOOGLE_MAPS_API_KEY")
     WEATHER_API_KEY: Optional[str] = os.getenv("WEATHER_API_KEY")
     
+    # Trip planning (/plan/build)
+    PLAN_PROVIDERS: List[str] = [
+        name.strip()
+        for name in os.getenv("PLAN_PROVIDERS", "stub_flights,graph_flights,stub_hotels,inventory_hotels,stub_cars,stub_attractions").split(",")
+        if name.strip()
+    ]
+    PLAN_PROVIDER_TIMEOUT_MS: int = int(os.getenv("PLAN_PROVIDER_TIMEOUT_MS", "2500"))  # per-provider deadline
+    PLAN_MAX_PACKAGES: int = int(os.getenv("PLAN_MAX_PACKAGES", "3"))
+    PROVIDER_STUB_LATENCY_MS: int = int(os.getenv("PROVIDER_STUB_LATENCY_MS", "150"))
+    
+    # Provider quote cache
+    QUOTE_CACHE_BACKEND: str = os.getenv("QUOTE_CACHE_BACKEND", "memory")  # memory, redis or none
+    QUOTE_CACHE_URL: str = os.getenv("QUOTE_CACHE_URL", "redis://localhost:6379/1")
+    QUOTE_CACHE_MAX_BYTES: int = int(os.getenv("QUOTE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # memory backend
+    QUOTE_CACHE_TTL_SECONDS: float = float(os.getenv("QUOTE_CACHE_TTL_SECONDS", "600"))
+    QUOTE_CACHE_STALE_SECONDS: float = float(os.getenv("QUOTE_CACHE_STALE_SECONDS", "1800"))
+    QUOTE_CACHE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("QUOTE_CACHE_NEGATIVE_TTL_SECONDS", "60"))
+    # Per-provider TTL overrides, e.g. "stub_flights=120,stub_hotels=1800"
+    QUOTE_CACHE_TTLS: Dict[str, float] = {
+        name.strip(): float(ttl)
+        for name, _, ttl in (item.partition("=") for item in os.getenv("QUOTE_CACHE_TTLS", "").split(","))
+        if name.strip() and ttl.strip()
+    }
+    
+    # Offline route graph (graph_flights provider)
+    ROUTE_SCHEDULE_PATH: str = os.getenv(
+        "ROUTE_SCHEDULE_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "flight_schedule.csv")
+    )
+    ROUTE_MAX_STOPS: int = int(os.getenv("ROUTE_MAX_STOPS", "2"))
+    ROUTE_MIN_CONNECTION_MINUTES: int = int(os.getenv("ROUTE_MIN_CONNECTION_MINUTES", "45"))
+    ROUTE_MAX_LAYOVER_MINUTES: int = int(os.getenv("ROUTE_MAX_LAYOVER_MINUTES", "720"))
+    
+    # Local hotel inventory (inventory_hotels provider); changes to the file are picked up incrementally
+    HOTEL_INVENTORY_PATH: str = os.getenv(
+        "HOTEL_INVENTORY_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "hotel_inventory.csv")
+    )
+    
+    # Attraction spatial index (fills packages' attractions_data near the hotel)
+    ATTRACTION_DATA_PATH: str = os.getenv(
+        "ATTRACTION_DATA_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "attractions.csv")
+    )
+    ATTRACTION_INDEX_PATH: str = os.getenv(
+        "ATTRACTION_INDEX_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "attractions.idx.npy")
+    )
+    ATTRACTION_MAX_RADIUS_KM: float = float(os.getenv("ATTRACTION_MAX_RADIUS_KM", "25"))
+    
+    # Package itineraries (attractions ordered into days)
+    ITINERARY_DAY_START: str = os.getenv("ITINERARY_DAY_START", "09:00")
+    ITINERARY_DAY_END: str = os.getenv("ITINERARY_DAY_END", "20:00")
+    ITINERARY_SPEED_KMH: float = float(os.getenv("ITINERARY_SPEED_KMH", "20"))  # door to door, city traffic
+    ITINERARY_BUDGET_MS: float = float(os.getenv("ITINERARY_BUDGET_MS", "50"))
+    
+    # Content-addressed store for package flight / hotel / car JSON
+    PACKAGE_COMPONENT_DEDUP: bool = os.getenv("PACKAGE_COMPONENT_DEDUP", "true").lower() in ("true", "1", "t")
+    COMPONENT_CACHE_MAX_BYTES: int = int(os.getenv("COMPONENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    
+    # Inventory feed ingestion
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+    
+    # Bulk package re-scoring job
+    RESCORE_CHUNK_SIZE: int = int(os.getenv("RESCORE_CHUNK_SIZE", "5000"))
+    RESCORE_CHECKPOINT_PATH: str = os.getenv(
+        "RESCORE_CHECKPOINT_PATH", os.path.join(os.path.dirname(__file__), "..", "rescore_checkpoint.json")
+    )
+    
     # AI/ML settings
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
@@ -1,5 +1,6 @@
+from typing import Generator
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
 
@@ -24,11 +25,19 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Dependency to get DB session
-def get_db():
-    """Database session dependency for FastAPI."""
+def get_db() -> Generator[Session, None, None]:
+    """
+    Request-scoped database session for FastAPI. Every dependency of a request (auth,
+    services, repositories) resolves this same callable, so FastAPI creates one session per
+    request: one pooled connection and one identity map. Uncommitted work is rolled back if
+    the request fails; the session is closed when the request ends.
+    """
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -37,8 +46,9 @@ def init_db():
     # Import models to ensure they are registered with SQLAlchemy
     from models.user import User, UserPreference
     from models.trip import Trip
-    from models.package import Package
+    from models.package import Package, PackageComponent
     from models.booking import BookingReference
+    from models.inventory import HotelInventory, AttractionInventory
     from models.base import BaseModel
     
     BaseModel.metadata.create_all(bind=engine)
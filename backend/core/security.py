@@ -58,10 +58,13 @@ def create_refresh_token(subject: Union[str, Any], expires_delta: timedelta = No
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
+def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
-    """Get the current user from the token."""
+    """
+    Get the current user from the token. Loaded through the request's session, so routes
+    see the same User instance in their identity map.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -3,26 +3,26 @@ Dependency injection for services and repositories.
 This module provides dependency injection for the application layers.
 """
 
-from typing import Generator
-from sqlalchemy.orm import Session
 from fastapi import Depends
 
-from core.database import SessionLocal
+# Database dependency: re-exported, never redefined. FastAPI shares a dependency's value within a
+# request only for the same callable, so routers and core.security get the same session.
+from core.database import get_db
 from services.auth_service import AuthService
 from services.user_service import UserService
 from services.trip_service import TripService
 from services.package_service import PackageService
 from services.booking_service import BookingService
+from services.planning_service import PlanningService
+from services.itinerary_service import ItineraryService
+from services.price_matrix_service import PriceMatrixService
+from services.rescoring_job import RescoringJob
+from repositories.package_component_repository import register_listeners
 
 
-# Database dependency
-def get_db() -> Generator[Session, None, None]:
-    """Get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Package flight / hotel / car JSON is stored once per content and filled back in on load,
+# for every session the app's services open
+register_listeners()
 
 
 # Service dependencies
@@ -51,6 +51,26 @@ def get_booking_service() -> BookingService:
     return BookingService()
 
 
+def get_planning_service() -> PlanningService:
+    """Get planning service instance."""
+    return PlanningService()
+
+
+def get_itinerary_service() -> ItineraryService:
+    """Get package itinerary service instance."""
+    return ItineraryService()
+
+
+def get_price_matrix_service() -> PriceMatrixService:
+    """Get flexible-date price matrix service instance."""
+    return PriceMatrixService()
+
+
+def get_rescoring_job() -> RescoringJob:
+    """Get package re-scoring job instance."""
+    return RescoringJob()
+
+
 # Repository dependencies (if needed directly)
 def get_user_repository():
     """Get user repository instance."""
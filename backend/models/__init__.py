@@ -5,15 +5,17 @@ Database models for the AI Travel Companion application.
 from .base import BaseModel
 from .user import User, UserPreference
 from .trip import Trip, TripCreate, TripPublic
-from .package import Package, PackageBase
+from .package import Package, PackageBase, PackageComponent
 from .trip_component import TripComponent, TripComponentBase
 from .booking import BookingReference, BookingReferenceBase
+from .inventory import HotelInventory, HotelInventoryBase, AttractionInventory, AttractionInventoryBase
 
 __all__ = [
     'BaseModel',
     'User', 'UserPreference',
     'Trip', 'TripCreate', 'TripPublic',
-    'Package', 'PackageBase',
+    'Package', 'PackageBase', 'PackageComponent',
     'TripComponent', 'TripComponentBase',
-    'BookingReference', 'BookingReferenceBase'
+    'BookingReference', 'BookingReferenceBase',
+    'HotelInventory', 'HotelInventoryBase', 'AttractionInventory', 'AttractionInventoryBase'
 ]
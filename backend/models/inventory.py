@@ -0,0 +1,54 @@
+from typing import List, Optional
+from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import UniqueConstraint
+from pydantic import validator
+
+from .base import BaseModel
+
+class InventoryRecordBase(SQLModel):
+    """Fields shared by all provider inventory records."""
+    provider: str = Field(max_length=100, nullable=False)
+    provider_id: str = Field(max_length=255, nullable=False)
+    destination_code: str = Field(max_length=3, nullable=False, index=True)
+    name: str = Field(max_length=255, nullable=False)
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+    @validator('destination_code')
+    def upper_destination_code(cls, v: str) -> str:
+        return v.strip().upper()
+
+class HotelInventoryBase(InventoryRecordBase):
+    """Base hotel inventory model with common fields."""
+    stars: Optional[int] = Field(default=None, ge=1, le=5)
+    nightly_price: float = Field(ge=0, nullable=False)
+    currency: str = Field(default="USD", max_length=3)
+    amenities: List[str] = Field(default=[], sa_column=Column(JSON))
+
+    @validator('amenities', pre=True)
+    def split_amenities(cls, v):
+        # CSV feeds carry amenities as "breakfast|pool", or an empty cell for none
+        if v is None:
+            return []
+        if isinstance(v, str):
+            return [a.strip().lower() for a in v.split('|') if a.strip()]
+        return v
+
+class HotelInventory(HotelInventoryBase, BaseModel, table=True):
+    """Hotel from a provider inventory feed, unique per (provider, provider_id)."""
+    __tablename__ = "hotel_inventory"
+    __table_args__ = (UniqueConstraint("provider", "provider_id", name="uq_hotel_inventory_provider_id"),)
+
+class AttractionInventoryBase(InventoryRecordBase):
+    """Base attraction inventory model with common fields."""
+    category: Optional[str] = Field(default=None, max_length=50)
+    duration_minutes: Optional[int] = Field(default=None, ge=0)
+    price: float = Field(default=0, ge=0)
+    currency: str = Field(default="USD", max_length=3)
+    opens: Optional[str] = Field(default=None, regex=r"^\d{2}:\d{2}$")   # local time, HH:MM
+    closes: Optional[str] = Field(default=None, regex=r"^\d{2}:\d{2}$")
+
+class AttractionInventory(AttractionInventoryBase, BaseModel, table=True):
+    """Attraction from a provider inventory feed, unique per (provider, provider_id)."""
+    __tablename__ = "attraction_inventory"
+    __table_args__ = (UniqueConstraint("provider", "provider_id", name="uq_attraction_inventory_provider_id"),)
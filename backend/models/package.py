@@ -36,6 +36,21 @@ class Package(PackageBase, BaseModel, table=True):
     
     trip_id: uuid.UUID = Field(foreign_key="trips.id", nullable=False)
     
+    # Content hashes of the flight / hotel / car JSON in package_components; when set, the
+    # matching *_data column is stored empty and filled from the component store on load
+    flight_ref: Optional[str] = Field(default=None, max_length=64)
+    hotel_ref: Optional[str] = Field(default=None, max_length=64)
+    car_ref: Optional[str] = Field(default=None, max_length=64)
+    
     # Relationships
     trip: "Trip" = Relationship(back_populates="packages")
     components: List["TripComponent"] = Relationship(back_populates="package")
+
+class PackageComponent(BaseModel, table=True):
+    """Flight, hotel or car JSON shared by packages, stored once under the SHA-256 of its canonical form."""
+    __tablename__ = "package_components"
+    
+    hash: str = Field(max_length=64, nullable=False, unique=True, index=True)
+    kind: str = Field(max_length=20, nullable=False)
+    data: Dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    size_bytes: int = Field(nullable=False)
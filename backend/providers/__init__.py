@@ -0,0 +1,30 @@
+"""
+Travel inventory providers (flights, hotels, cars, attractions) for the planning engine.
+"""
+
+from .attraction_index import AttractionIndex, get_attraction_index
+from .base import BaseProvider, ProviderQuery
+from .registry import PROVIDER_FACTORIES, get_providers, register_provider
+from .quote_cache import MemoryQuoteStore, QuoteCache, RedisQuoteStore, get_quote_cache
+from .graph_flights import GraphFlightProvider
+from .hotel_index import HotelIndex, get_hotel_index
+from .inventory_hotels import InventoryHotelProvider
+from .route_graph import RouteGraph, get_route_graph
+from .stub import StubAttractionProvider, StubCarProvider, StubFlightProvider, StubHotelProvider
+
+register_provider(StubFlightProvider.name, StubFlightProvider)
+register_provider(StubHotelProvider.name, StubHotelProvider)
+register_provider(StubCarProvider.name, StubCarProvider)
+register_provider(StubAttractionProvider.name, StubAttractionProvider)
+register_provider(GraphFlightProvider.name, GraphFlightProvider)
+register_provider(InventoryHotelProvider.name, InventoryHotelProvider)
+
+__all__ = [
+    'BaseProvider', 'ProviderQuery',
+    'PROVIDER_FACTORIES', 'get_providers', 'register_provider',
+    'QuoteCache', 'MemoryQuoteStore', 'RedisQuoteStore', 'get_quote_cache',
+    'StubFlightProvider', 'StubHotelProvider', 'StubCarProvider', 'StubAttractionProvider',
+    'RouteGraph', 'get_route_graph', 'GraphFlightProvider',
+    'HotelIndex', 'get_hotel_index', 'InventoryHotelProvider',
+    'AttractionIndex', 'get_attraction_index',
+]
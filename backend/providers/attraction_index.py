@@ -0,0 +1,281 @@
+"""
+Spatial index of attractions per city, persisted as one memory-mappable .npy file.
+
+Rows are fixed-width records sorted by (city, geohash), where the geohash is the 52-bit
+Morton code of the quantized latitude / longitude: every geohash cell at any precision is a
+contiguous range of rows. A radius query picks the precision at which a handful of cells
+cover the search box, binary-searches each cell's range and keeps the rows whose haversine
+distance is within the radius; k-nearest widens the radius until k rows are inside it.
+
+Workers open the file with np.load(mmap_mode="r"): nothing is parsed or copied up front,
+and the OS shares the pages between processes.
+
+Build from the bundled CSV or the attraction_inventory table (run from backend/):
+    python -m providers.attraction_index [--source csv|db] [--output path]
+"""
+
+import argparse
+import csv
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+from core.config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_BITS = 26          # per coordinate: ~0.3 m cells at full precision
+MAX_COVER_CELLS = 16       # cells scanned per radius query
+NEAREST_START_RADIUS_KM = 2.0
+
+RECORD_DTYPE = np.dtype([
+    ('city', 'S3'),
+    ('geohash', '<u8'),
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('price', '<f4'),               # per person, USD
+    ('duration_minutes', '<i2'),
+    ('opens', '<i2'),               # minutes after local midnight, -1 when unknown
+    ('closes', '<i2'),
+    ('provider_id', 'S48'),
+    ('name', 'S96'),                # UTF-8, truncated to fit
+    ('category', 'S24'),
+])
+
+
+def _spread_bits(x):
+    """Interleave zeros between the low 32 bits of x (works on ints and uint64 arrays)."""
+    # Explicit uint64 constants keep array math unsigned on every NumPy version
+    c = np.uint64 if isinstance(x, np.ndarray) else int
+    x = x & c(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        x = (x | (x << c(shift))) & c(mask)
+    return x
+
+
+def _quantize(latitude, longitude):
+    scale = (1 << GEOHASH_BITS) - 1
+    lat = np.clip((np.asarray(latitude, dtype=np.float64) + 90.0) / 180.0, 0.0, 1.0)
+    lon = np.clip((np.asarray(longitude, dtype=np.float64) + 180.0) / 360.0, 0.0, 1.0)
+    return (lat * scale).astype(np.uint64), (lon * scale).astype(np.uint64)
+
+
+def geohash(latitude, longitude) -> np.ndarray:
+    """52-bit Morton geohash (latitude bits interleaved with longitude bits)."""
+    lat, lon = _quantize(latitude, longitude)
+    return (_spread_bits(lat) << np.uint64(1)) | _spread_bits(lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _minutes(value: Optional[str]) -> int:
+    if not value:
+        return -1
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def _hhmm(minutes: int) -> Optional[str]:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}" if minutes >= 0 else None
+
+
+class AttractionIndex:
+    """Attractions of every city, queried by distance from a point."""
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+        cities, starts = np.unique(records['city'], return_index=True)
+        bounds = list(starts) + [len(records)]
+        self._cities: Dict[str, Tuple[int, int]] = {
+            city.decode(): (int(bounds[i]), int(bounds[i + 1])) for i, city in enumerate(cities)
+        }
+
+    @classmethod
+    def build(cls, attractions: Iterable[Dict[str, Any]]) -> "AttractionIndex":
+        """Index attraction dicts (AttractionInventory fields); ones without coordinates are skipped."""
+        rows = [
+            (
+                a['destination_code'].upper().encode(), 0, float(a['latitude']), float(a['longitude']),
+                float(a.get('price') or 0), int(a.get('duration_minutes') or 0),
+                _minutes(a.get('opens')), _minutes(a.get('closes')),
+                str(a['provider_id']).encode()[:48], a['name'].encode()[:96], (a.get('category') or '').encode()[:24],
+            )
+            for a in attractions
+            if a.get('latitude') is not None and a.get('longitude') is not None
+        ]
+        records = np.array(rows, dtype=RECORD_DTYPE)
+        records['geohash'] = geohash(records['latitude'], records['longitude'])
+        records = records[np.lexsort((records['geohash'], records['city']))]
+        return cls(records)
+
+    def save(self, path: str) -> None:
+        # Write-then-rename so workers never map a half-written file
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, self.records)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AttractionIndex":
+        return cls(np.load(path, mmap_mode='r'))
+
+    @property
+    def cities(self) -> List[str]:
+        return list(self._cities)
+
+    def __contains__(self, city: str) -> bool:
+        return city.upper() in self._cities
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def city_center(self, city: str) -> Optional[Tuple[float, float]]:
+        """Mean position of the city's attractions."""
+        bounds = self._cities.get(city.upper())
+        if bounds is None:
+            return None
+        rows = self.records[bounds[0]:bounds[1]]
+        return float(rows['latitude'].mean()), float(rows['longitude'].mean())
+
+    def _candidates(self, rows: np.ndarray, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Row positions in the geohash cells covering the radius' bounding box."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        dlon = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+        (lat_lo, lat_hi), (lon_lo, lon_hi) = _quantize([latitude - dlat, latitude + dlat], [longitude - dlon, longitude + dlon])
+        lat_lo, lat_hi, lon_lo, lon_hi = int(lat_lo), int(lat_hi), int(lon_lo), int(lon_hi)
+
+        # Finest precision at which the box needs at most MAX_COVER_CELLS cells
+        shift = 0
+        while ((lat_hi >> shift) - (lat_lo >> shift) + 1) * ((lon_hi >> shift) - (lon_lo >> shift) + 1) > MAX_COVER_CELLS:
+            shift += 1
+
+        codes = rows['geohash']
+        found = []
+        for lat_cell in range(lat_lo >> shift, (lat_hi >> shift) + 1):
+            for lon_cell in range(lon_lo >> shift, (lon_hi >> shift) + 1):
+                low = ((_spread_bits(lat_cell) << 1) | _spread_bits(lon_cell)) << (2 * shift)
+                high = low + (1 << (2 * shift))
+                start, stop = np.searchsorted(codes, np.array([low, high], dtype=np.uint64))
+                if stop > start:
+                    found.append(np.arange(start, stop))
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def within(self, city: str, latitude: float, longitude: float, radius_km: float,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Attractions of `city` within `radius_km` of the point, nearest first."""
+        bounds = self._cities.get(city.upper())
+        if bounds is None:
+            return []
+        rows = self.records[bounds[0]:bounds[1]]
+        candidates = self._candidates(rows, latitude, longitude, radius_km)
+        distances = haversine_km(latitude, longitude, rows['latitude'][candidates], rows['longitude'][candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')[:limit]
+        return [self._item(rows[i], d) for i, d in zip(candidates[order].tolist(), distances[order].tolist())]
+
+    def nearest(self, city: str, latitude: float, longitude: float, k: int,
+                max_radius_km: float = settings.ATTRACTION_MAX_RADIUS_KM) -> List[Dict[str, Any]]:
+        """The `k` attractions of `city` nearest to the point, up to `max_radius_km` away."""
+        bounds = self._cities.get(city.upper())
+        if bounds is None or k <= 0:
+            return []
+        # Widen until k are inside: the k nearest are then exactly the k closest of those
+        radius = min(NEAREST_START_RADIUS_KM, max_radius_km)
+        while True:
+            found = self.within(city, latitude, longitude, radius, limit=k)
+            if len(found) >= k or radius >= max_radius_km:
+                return found
+            radius = min(radius * 2, max_radius_km)
+
+    @staticmethod
+    def _item(row, distance_km: float) -> Dict[str, Any]:
+        return {
+            'id': row['provider_id'].decode(),
+            'name': row['name'].decode(errors='ignore'),
+            'category': row['category'].decode() or None,
+            'latitude': float(row['latitude']),
+            'longitude': float(row['longitude']),
+            'price': round(float(row['price']), 2),
+            'duration_minutes': int(row['duration_minutes']),
+            'opens': _hhmm(int(row['opens'])),
+            'closes': _hhmm(int(row['closes'])),
+            'distance_km': round(distance_km, 3),
+        }
+
+
+def read_attractions_csv(path: str) -> Iterable[Dict[str, Any]]:
+    """Attractions from a CSV with the attraction_inventory columns."""
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+
+
+def read_attractions_db(db, chunk_size: int = 5000) -> Iterable[Dict[str, Any]]:
+    """Attractions from the attraction_inventory table, in keyset-paginated chunks."""
+    from models.inventory import AttractionInventory
+    last_id = None
+    while True:
+        query = db.query(AttractionInventory).order_by(AttractionInventory.id)
+        if last_id is not None:
+            query = query.filter(AttractionInventory.id > last_id)
+        chunk = query.limit(chunk_size).all()
+        if not chunk:
+            return
+        for attraction in chunk:
+            yield attraction.dict()
+        last_id = chunk[-1].id
+
+
+_attraction_index: Optional[AttractionIndex] = None
+_load_lock = threading.Lock()
+
+
+def get_attraction_index() -> AttractionIndex:
+    """
+    Process-wide index mapped from settings.ATTRACTION_INDEX_PATH. The file is (re)built from
+    settings.ATTRACTION_DATA_PATH first when it is missing or older than the CSV; without
+    either file the index is empty and package assembly falls back to provider attractions.
+    """
+    global _attraction_index
+    if _attraction_index is None:
+        with _load_lock:
+            if _attraction_index is None:
+                index_path, data_path = settings.ATTRACTION_INDEX_PATH, settings.ATTRACTION_DATA_PATH
+                stale = not os.path.exists(index_path) or (
+                    os.path.exists(data_path) and os.path.getmtime(data_path) > os.path.getmtime(index_path)
+                )
+                if stale:
+                    attractions = read_attractions_csv(data_path) if os.path.exists(data_path) else []
+                    AttractionIndex.build(attractions).save(index_path)
+                _attraction_index = AttractionIndex.load(index_path)
+    return _attraction_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mappable attraction index")
+    parser.add_argument("--source", choices=["csv", "db"], default="csv")
+    parser.add_argument("--csv", default=settings.ATTRACTION_DATA_PATH)
+    parser.add_argument("--output", default=settings.ATTRACTION_INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        from core.database import SessionLocal
+        db = SessionLocal()
+        try:
+            index = AttractionIndex.build(read_attractions_db(db))
+        finally:
+            db.close()
+    else:
+        index = AttractionIndex.build(read_attractions_csv(args.csv))
+    index.save(args.output)
+    print(f"{len(index)} attractions in {len(index.cities)} cities -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Base classes for travel inventory providers used by the planning engine.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+class ProviderQuery(BaseModel):
+    """What the planning engine asks every provider for."""
+    origin_code: str
+    destination_code: str
+    start_date: date
+    end_date: date
+    adults: int = 1
+    children: int = 0
+    budget: Optional[float] = None
+    need_car: bool = False
+    hotel_amenities: List[str] = Field(default_factory=list)
+    one_way: bool = False  # flights: only the start_date leg from origin to destination
+
+    @property
+    def nights(self) -> int:
+        return max(1, (self.end_date - self.start_date).days)
+
+
+class BaseProvider(ABC):
+    """
+    A source of offers of one kind ("flight", "hotel", "car" or "attraction").
+    Subclasses implement search(); the planning engine applies the deadline.
+    """
+
+    name: str = "provider"
+    kind: str = "flight"
+    timeout_ms: Optional[int] = None    # falls back to settings.PLAN_PROVIDER_TIMEOUT_MS
+    cache_ttl_s: Optional[float] = None  # quote freshness, falls back to settings.QUOTE_CACHE_TTL_SECONDS
+    # Query fields beyond route, dates and party that change this provider's offers (part of the quote cache key)
+    cache_key_fields: Tuple[str, ...] = ()
+
+    @abstractmethod
+    async def search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        """
+        Return offers for the query. Every offer has at least
+        "id", "provider", "price" (total for the party, USD), "description" and "deeplink".
+        """
+        raise NotImplementedError
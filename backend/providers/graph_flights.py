@@ -0,0 +1,94 @@
+"""
+Flight provider backed by the offline route graph: itineraries are searched locally over the
+bundled schedule instead of calling a partner API, so it answers for any covered airport pair
+without credentials or network latency.
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from .base import BaseProvider, ProviderQuery
+from .route_graph import Itinerary, RouteGraph, get_route_graph
+
+# Pareto itineraries per direction that are paired into round-trip offers
+ITINERARIES_PER_DIRECTION = 3
+
+
+class GraphFlightProvider(BaseProvider):
+    name = "graph_flights"
+    kind = "flight"
+    cache_ttl_s = 3600  # fares only change with the bundled dataset
+
+    def __init__(self, graph: Optional[RouteGraph] = None):
+        self._graph = graph
+
+    @property
+    def graph(self) -> RouteGraph:
+        if self._graph is None:
+            self._graph = get_route_graph()
+        return self._graph
+
+    async def search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        # CPU-bound; kept off the event loop so slower providers' I/O still overlaps
+        return await asyncio.to_thread(self._search, query)
+
+    def _search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        outbound = self.graph.search(query.origin_code, query.destination_code)[:ITINERARIES_PER_DIRECTION]
+        if query.one_way:
+            return [self._offer(query, out, None, f"{self.name}-{i}") for i, out in enumerate(outbound)]
+
+        inbound = self.graph.search(query.destination_code, query.origin_code)[:ITINERARIES_PER_DIRECTION]
+        return [
+            self._offer(query, out, back, f"{self.name}-{i}-{j}")
+            for i, out in enumerate(outbound)
+            for j, back in enumerate(inbound)
+        ]
+
+    def _offer(self, query: ProviderQuery, outbound: Itinerary, inbound: Optional[Itinerary], offer_id: str) -> Dict[str, Any]:
+        travellers = query.adults + 0.75 * query.children
+        itineraries = [outbound] if inbound is None else [outbound, inbound]
+        fare = sum(itinerary.price for itinerary in itineraries)
+        stops = sum(itinerary.stops for itinerary in itineraries)
+        carriers = sorted({leg.carrier for itinerary in itineraries for leg in itinerary.legs})
+        stops_text = "Non-stop" if stops == 0 else f"{stops} stop" + ("s" if stops > 1 else "")
+        flights = " / ".join(" ".join(leg.flight_no for leg in itinerary.legs) for itinerary in itineraries)
+        return {
+            "id": offer_id,
+            "provider": self.name,
+            "airline": ", ".join(carriers),
+            "stops": stops,
+            "cabin": "Economy",
+            "outbound": self._leg_details(query.start_date, outbound),
+            "inbound": None if inbound is None else self._leg_details(query.end_date, inbound),
+            "duration_minutes": sum(itinerary.duration for itinerary in itineraries),
+            "price": round(fare * travellers, 2),
+            "description": f"{flights}, Economy, {stops_text}" + (", one-way" if inbound is None else ""),
+            "deeplink": f"https://www.example.com/flights/{query.origin_code}-{query.destination_code}?offer={offer_id}",
+        }
+
+    @staticmethod
+    def _leg_details(day: date, itinerary: Itinerary) -> Dict[str, Any]:
+        midnight = datetime.combine(day, time())
+
+        def at(minutes: int) -> datetime:
+            return midnight + timedelta(minutes=minutes)
+
+        return {
+            "date": str(day),
+            "depart": at(itinerary.depart).strftime("%H:%M"),
+            "arrive": at(itinerary.arrive).isoformat(timespec="minutes"),
+            "stops": itinerary.stops,
+            "duration_minutes": itinerary.duration,
+            "legs": [
+                {
+                    "flight_no": leg.flight_no,
+                    "carrier": leg.carrier,
+                    "origin": leg.origin,
+                    "destination": leg.destination,
+                    "depart": at(leg.depart).isoformat(timespec="minutes"),
+                    "arrive": at(leg.arrive).isoformat(timespec="minutes"),
+                }
+                for leg in itinerary.legs
+            ],
+        }
@@ -0,0 +1,240 @@
+"""
+Local hotel inventory index, one segment per destination.
+
+Each segment keeps its hotels sorted by nightly price in parallel NumPy columns (price,
+amenity bitmask, stars, hotel key, record), so "breakfast AND pool under $200" is a binary search
+for the price cut-off plus one vectorized mask test over the hotels below it, and results
+come out cheapest first without sorting.
+
+Feed changes are applied incrementally: only changed or removed hotels are touched, and only
+their destinations' segments are rebuilt, by merging the new rows into the already sorted
+columns instead of re-sorting. Segments are never modified once built and results are read
+from the segment's own record column, so a search running during an update sees one version.
+"""
+
+import csv
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from core.config import settings
+
+# Hotels below the price cut-off are tested in blocks of this many, stopping once `limit` match
+SCAN_BLOCK = 65536
+MAX_AMENITIES = 64
+
+
+class HotelSegment:
+    """Hotels of one destination as price-sorted columns."""
+
+    def __init__(self, price: np.ndarray, amenities: np.ndarray, stars: np.ndarray, keys: np.ndarray, records: np.ndarray):
+        self.price = price
+        self.amenities = amenities
+        self.stars = stars
+        self.keys = keys
+        self.records = records  # object column of the hotel dicts
+
+    @classmethod
+    def empty(cls) -> "HotelSegment":
+        return cls(np.empty(0, np.float64), np.empty(0, np.uint64), np.empty(0, np.int8), np.empty(0, np.int64), np.empty(0, object))
+
+    @classmethod
+    def build(cls, price: np.ndarray, amenities: np.ndarray, stars: np.ndarray, keys: np.ndarray, records: np.ndarray) -> "HotelSegment":
+        order = np.argsort(price, kind='stable')
+        return cls(price[order], amenities[order], stars[order], keys[order], records[order])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.price.nbytes + self.amenities.nbytes + self.stars.nbytes + self.keys.nbytes
+
+    def merge(self, removed: np.ndarray, added: "HotelSegment") -> "HotelSegment":
+        """New segment without the `removed` keys and with `added` merged in at its price positions."""
+        keep = ~np.isin(self.keys, removed) if len(removed) else slice(None)
+        price, amenities, stars, keys = self.price[keep], self.amenities[keep], self.stars[keep], self.keys[keep]
+        records = self.records[keep]
+        if len(added):
+            positions = np.searchsorted(price, added.price, side='right')
+            price = np.insert(price, positions, added.price)
+            amenities = np.insert(amenities, positions, added.amenities)
+            stars = np.insert(stars, positions, added.stars)
+            keys = np.insert(keys, positions, added.keys)
+            records = np.insert(records, positions, added.records)
+        return HotelSegment(price, amenities, stars, keys, records)
+
+    def search(self, required: int, max_price: Optional[float], min_stars: int, limit: int) -> np.ndarray:
+        """Positions of the `limit` cheapest hotels having every `required` amenity bit, cheapest first."""
+        end = len(self.price) if max_price is None else int(np.searchsorted(self.price, max_price, side='right'))
+        required = np.uint64(required)
+        found: List[np.ndarray] = []
+        count = 0
+        for start in range(0, end, SCAN_BLOCK):
+            stop = min(start + SCAN_BLOCK, end)
+            match = (self.amenities[start:stop] & required) == required
+            if min_stars:
+                match &= self.stars[start:stop] >= min_stars
+            hits = np.flatnonzero(match)
+            found.append(start + hits[:limit - count])
+            count += len(found[-1])
+            if count >= limit:
+                break
+        return np.concatenate(found) if found else np.empty(0, np.int64)
+
+
+class HotelIndex:
+    """Amenity/price index over the local hotel inventory."""
+
+    def __init__(self):
+        self.segments: Dict[str, HotelSegment] = {}
+        self.records: Dict[int, Dict[str, Any]] = {}
+        self.amenity_bits: Dict[str, int] = {}
+        self.segment_rebuilds = 0
+        self._keys: Dict[str, int] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()  # one writer at a time; readers use whatever segment is current
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def mask(self, amenities: Iterable[str], assign: bool = False) -> Optional[int]:
+        """Bitmask of `amenities`; None if one was never seen (no hotel can have it) unless `assign`."""
+        bits = 0
+        for amenity in amenities:
+            amenity = amenity.strip().lower()
+            if amenity not in self.amenity_bits:
+                if not assign:
+                    return None
+                if len(self.amenity_bits) >= MAX_AMENITIES:
+                    raise ValueError(f"More than {MAX_AMENITIES} distinct amenities")
+                self.amenity_bits[amenity] = 1 << len(self.amenity_bits)
+            bits |= self.amenity_bits[amenity]
+        return bits
+
+    def apply(self, upserts: Iterable[Dict[str, Any]] = (), removed: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Add or replace hotels (dicts with hotel_id, destination_code, name, stars, nightly_price
+        and amenities) and drop `removed` hotel ids, rebuilding only the destinations touched.
+        """
+        with self._lock:
+            touched: Dict[str, Tuple[List[int], List[Dict[str, Any]]]] = {}
+            upserted = deleted = 0
+            for hotel_id in removed:
+                key = self._keys.pop(hotel_id, None)
+                if key is not None:
+                    old = self.records.pop(key)
+                    touched.setdefault(old['destination_code'], ([], []))[0].append(key)
+                    deleted += 1
+            # Last version wins when a batch repeats a hotel
+            for hotel in {hotel['hotel_id']: hotel for hotel in upserts}.values():
+                key = self._keys.get(hotel['hotel_id'])
+                if key is None:
+                    key = self._keys[hotel['hotel_id']] = self._next_key
+                    self._next_key += 1
+                old = self.records.get(key)
+                if old is not None:
+                    touched.setdefault(old['destination_code'], ([], []))[0].append(key)
+                record = dict(hotel, key=key, mask=self.mask(hotel['amenities'], assign=True))
+                self.records[key] = record
+                touched.setdefault(record['destination_code'], ([], []))[1].append(record)
+                upserted += 1
+
+            for destination, (removed_keys, added) in touched.items():
+                added = HotelSegment.build(
+                    np.array([r['nightly_price'] for r in added], dtype=np.float64),
+                    np.array([r['mask'] for r in added], dtype=np.uint64),
+                    np.array([r['stars'] for r in added], dtype=np.int8),
+                    np.array([r['key'] for r in added], dtype=np.int64),
+                    np.array(added, dtype=object),
+                )
+                segment = self.segments.get(destination, HotelSegment.empty())
+                segment = segment.merge(np.array(removed_keys, dtype=np.int64), added)
+                if len(segment):
+                    self.segments[destination] = segment
+                else:
+                    self.segments.pop(destination, None)
+                self.segment_rebuilds += 1
+            return {'upserted': upserted, 'removed': deleted, 'destinations': len(touched)}
+
+    def apply_feed(self, hotels: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Sync to a full feed snapshot: only new/changed hotels are upserted and missing ones removed."""
+        seen = set()
+        changed = []
+        for hotel in hotels:
+            seen.add(hotel['hotel_id'])
+            key = self._keys.get(hotel['hotel_id'])
+            old = self.records.get(key) if key is not None else None
+            if old is None or any(old[field] != hotel[field] for field in hotel):
+                changed.append(hotel)
+        return self.apply(changed, [hotel_id for hotel_id in self._keys if hotel_id not in seen])
+
+    def search(
+        self,
+        destination_code: str,
+        amenities: Sequence[str] = (),
+        max_price: Optional[float] = None,
+        min_stars: int = 0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Cheapest hotels at the destination with all `amenities`, a nightly price <= `max_price` and >= `min_stars`."""
+        segment = self.segments.get(destination_code.upper())
+        required = self.mask(amenities)
+        if segment is None or required is None or limit <= 0:
+            return []
+        # From the segment, not self.records: an update running meanwhile may already have replaced or dropped them
+        return segment.records[segment.search(required, max_price, min_stars, limit)].tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hotels': len(self.records),
+            'destinations': len(self.segments),
+            'amenities': len(self.amenity_bits),
+            'column_bytes': sum(segment.nbytes for segment in self.segments.values()),
+            'segment_rebuilds': self.segment_rebuilds,
+        }
+
+
+def read_inventory_csv(path: str) -> Iterable[Dict[str, Any]]:
+    """
+    Hotels from a feed CSV (hotel_id, destination_code, name, stars, nightly_price,
+    amenities as a|b|c, and optionally latitude / longitude).
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {
+                'hotel_id': row['hotel_id'],
+                'destination_code': row['destination_code'].upper(),
+                'name': row['name'],
+                'stars': int(row['stars']),
+                'nightly_price': float(row['nightly_price']),
+                'amenities': [a for a in row['amenities'].split('|') if a],
+                'latitude': float(row['latitude']) if row.get('latitude') else None,
+                'longitude': float(row['longitude']) if row.get('longitude') else None,
+            }
+
+
+_hotel_index: Optional[HotelIndex] = None
+_loaded_mtime: Optional[float] = None
+_load_lock = threading.Lock()
+
+
+def get_hotel_index() -> HotelIndex:
+    """
+    Process-wide index over settings.HOTEL_INVENTORY_PATH; when the feed file changes,
+    the differences are applied on the next call.
+    """
+    global _hotel_index, _loaded_mtime
+    if _hotel_index is None:
+        _hotel_index = HotelIndex()
+    try:
+        mtime = os.path.getmtime(settings.HOTEL_INVENTORY_PATH)
+    except OSError:
+        return _hotel_index
+    if mtime != _loaded_mtime:
+        with _load_lock:
+            if mtime != _loaded_mtime:
+                _hotel_index.apply_feed(read_inventory_csv(settings.HOTEL_INVENTORY_PATH))
+                _loaded_mtime = mtime
+    return _hotel_index
@@ -0,0 +1,55 @@
+"""
+Hotel provider backed by the local inventory index (data/hotel_inventory.csv): must-have
+amenities and the budget are applied inside the index instead of after fetching offers.
+"""
+
+import asyncio
+import math
+from typing import Any, Dict, List, Optional
+
+from .base import BaseProvider, ProviderQuery
+from .hotel_index import HotelIndex, get_hotel_index
+
+
+class InventoryHotelProvider(BaseProvider):
+    name = "inventory_hotels"
+    kind = "hotel"
+    cache_ttl_s = 900
+    cache_key_fields = ("budget", "hotel_amenities")  # both filter the hotels returned
+    offers_per_query = 10
+
+    def __init__(self, index: Optional[HotelIndex] = None):
+        self._index = index
+
+    @property
+    def index(self) -> HotelIndex:
+        return self._index if self._index is not None else get_hotel_index()
+
+    async def search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        # Off the event loop: the first call (or a changed feed file) loads the inventory
+        return await asyncio.to_thread(self._search, query)
+
+    def _search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        rooms = math.ceil((query.adults + query.children) / 2)
+        # No single stay can cost more than the whole trip budget
+        max_nightly = query.budget / (query.nights * rooms) if query.budget else None
+        hotels = self.index.search(query.destination_code, query.hotel_amenities, max_price=max_nightly, limit=self.offers_per_query)
+        return [self.make_offer(query, hotel, rooms) for hotel in hotels]
+
+    def make_offer(self, query: ProviderQuery, hotel: Dict[str, Any], rooms: int) -> Dict[str, Any]:
+        amenities = sorted(hotel["amenities"])
+        return {
+            "id": hotel["hotel_id"],
+            "provider": self.name,
+            "name": hotel["name"],
+            "stars": hotel["stars"],
+            "amenities": amenities,
+            "latitude": hotel.get("latitude"),
+            "longitude": hotel.get("longitude"),
+            "nightly_rate": hotel["nightly_price"],
+            "nights": query.nights,
+            "rooms": rooms,
+            "price": round(hotel["nightly_price"] * query.nights * rooms, 2),
+            "description": f"{hotel['name']}, {hotel['stars']} stars" + (", Breakfast included" if "breakfast" in amenities else ""),
+            "deeplink": f"https://www.example.com/hotels/{query.destination_code}?hotel={hotel['hotel_id']}",
+        }
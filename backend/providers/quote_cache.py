@@ -0,0 +1,249 @@
+"""
+Quote cache in front of the providers.
+
+The same route/date searches repeat across users, so provider offers are cached per
+(provider, origin_code, destination_code, start_date, end_date, adults), plus children and
+one_way when set and whichever query fields the provider lists in cache_key_fields (e.g.
+the budget and amenities a provider filters on). Entries are fresh
+for the provider's TTL, then served stale for up to QUOTE_CACHE_STALE_SECONDS while one
+background refresh replaces them. Empty results and provider errors are cached briefly
+(negative caching) so a failing provider is not hit by every request.
+
+Stores are pluggable: an in-process LRU bounded by bytes, or Redis (any Redis-protocol
+server, shared by all workers).
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+from .base import BaseProvider, ProviderQuery
+
+
+class MemoryQuoteStore:
+    """In-process LRU bounded by the encoded size of its entries. Not shared between workers."""
+
+    def __init__(self, max_bytes: int = settings.QUOTE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, raw = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        # Stored encoded: the size is exact and callers never share mutable offers
+        raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        if len(raw) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, raw)
+        self.bytes += len(raw)
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, raw = self._entries.pop(key)
+        self.bytes -= len(raw)
+
+    async def close(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class RedisQuoteStore:
+    """Shared store. Size bound comes from the server's maxmemory + allkeys-lru policy."""
+
+    def __init__(self, url: str = settings.QUOTE_CACHE_URL):
+        import redis.asyncio as redis  # optional dependency, only needed for this store
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        raw = json.dumps(value, separators=(",", ":"), default=str)
+        await self._redis.set(key, raw, ex=max(1, int(ttl)))
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class QuoteCache:
+    """Stale-while-revalidate cache with per-provider TTLs, negative caching and hit counters."""
+
+    def __init__(
+        self,
+        store,
+        default_ttl: float = settings.QUOTE_CACHE_TTL_SECONDS,
+        stale_ttl: float = settings.QUOTE_CACHE_STALE_SECONDS,
+        negative_ttl: float = settings.QUOTE_CACHE_NEGATIVE_TTL_SECONDS,
+        provider_ttls: Optional[Dict[str, float]] = None
+    ):
+        self.store = store
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.provider_ttls = provider_ttls if provider_ttls is not None else settings.QUOTE_CACHE_TTLS
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def ttl_for(self, provider: BaseProvider) -> float:
+        """Freshness window: settings override, then the provider's own, then the default."""
+        if provider.name in self.provider_ttls:
+            return self.provider_ttls[provider.name]
+        return provider.cache_ttl_s if provider.cache_ttl_s is not None else self.default_ttl
+
+    @staticmethod
+    def key(provider: BaseProvider, query: ProviderQuery) -> str:
+        key = f"quote:{provider.name}:{query.origin_code}:{query.destination_code}:{query.start_date}:{query.end_date}:{query.adults}"
+        # Children change party prices; keep the common adults-only key unchanged
+        if query.children:
+            key += f":c{query.children}"
+        # Filters some providers apply themselves; without them one user's filtered offers would be served to all
+        for field in provider.cache_key_fields:
+            value = getattr(query, field)
+            if isinstance(value, (list, tuple, set)):
+                value = "|".join(sorted({str(v).strip().lower() for v in value}))
+            key += f":{field}={value}"
+        return f"{key}:one_way" if query.one_way else key
+
+    async def search(self, provider: BaseProvider, query: ProviderQuery) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Offers for the query and how they were served: "hit", "stale", "negative" or "miss".
+        A cancelled caller (e.g. a missed deadline) does not cancel the fetch, which still fills the cache.
+        """
+        key = self.key(provider, query)
+        counters = self._counters[provider.name]
+        entry = await self._get(key, counters)
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if entry.get("negative"):
+                if age < self.negative_ttl:
+                    counters["negative_hits"] += 1
+                    return [], "negative"
+            elif age < self.ttl_for(provider):
+                counters["hits"] += 1
+                return entry["offers"], "hit"
+            elif age < self.ttl_for(provider) + self.stale_ttl:
+                counters["stale_hits"] += 1
+                if time.time() >= entry.get("retry_after", 0) and self._fetch(provider, query, key) is not None:
+                    counters["refreshes"] += 1
+                return entry["offers"], "stale"
+
+        counters["misses"] += 1
+        task = self._fetch(provider, query, key) or self._inflight[key]
+        return await asyncio.shield(task), "miss"
+
+    def _fetch(self, provider: BaseProvider, query: ProviderQuery, key: str) -> Optional[asyncio.Task]:
+        """Start loading `key` unless a load is already running; returns the new task, if any."""
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return None
+
+        task = asyncio.ensure_future(self._load(provider, query, key))
+        self._inflight[key] = task
+
+        def _finished(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # retrieved here so background refresh failures are not reported as unhandled
+
+        task.add_done_callback(_finished)
+        return task
+
+    async def _load(self, provider: BaseProvider, query: ProviderQuery, key: str) -> List[Dict[str, Any]]:
+        counters = self._counters[provider.name]
+        try:
+            offers = await provider.search(query)
+        except Exception as e:
+            counters["errors"] += 1
+            current = await self._get(key, counters)
+            if current is None or current.get("negative"):
+                entry = {"offers": [], "fetched_at": time.time(), "negative": True, "error": repr(e)}
+                await self._set(key, entry, self.negative_ttl, counters)
+            else:
+                # A failed refresh keeps serving the stale offers, and waits out the negative TTL before retrying
+                remaining = current["fetched_at"] + self.ttl_for(provider) + self.stale_ttl - time.time()
+                if remaining > 0:
+                    current["retry_after"] = time.time() + self.negative_ttl
+                    await self._set(key, current, remaining, counters)
+            raise
+
+        if offers:
+            entry = {"offers": offers, "fetched_at": time.time()}
+            await self._set(key, entry, self.ttl_for(provider) + self.stale_ttl, counters)
+        else:
+            entry = {"offers": [], "fetched_at": time.time(), "negative": True}
+            await self._set(key, entry, self.negative_ttl, counters)
+        return offers
+
+    async def _get(self, key: str, counters: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        # A broken store degrades to a miss, never to a failed plan
+        try:
+            return await self.store.get(key)
+        except Exception as e:
+            print("QUOTE CACHE GET ERROR", repr(e))
+            counters["store_errors"] += 1
+            return None
+
+    async def _set(self, key: str, entry: Dict[str, Any], ttl: float, counters: Dict[str, int]) -> None:
+        try:
+            await self.store.set(key, entry, ttl)
+        except Exception as e:
+            print("QUOTE CACHE SET ERROR", repr(e))
+            counters["store_errors"] += 1
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate per provider plus store occupancy."""
+        providers = {}
+        for name, counters in self._counters.items():
+            served = counters["hits"] + counters["stale_hits"] + counters["negative_hits"]
+            lookups = served + counters["misses"]
+            providers[name] = dict(counters, lookups=lookups, hit_rate=round(served / lookups, 4) if lookups else 0.0)
+        return {"store": type(self.store).__name__, **self.store.stats(), "providers": providers}
+
+
+_quote_cache: Optional[QuoteCache] = None
+
+
+def get_quote_cache() -> Optional[QuoteCache]:
+    """Process-wide quote cache from settings.QUOTE_CACHE_BACKEND, or None when it is "none"."""
+    global _quote_cache
+    if _quote_cache is None and settings.QUOTE_CACHE_BACKEND != "none":
+        if settings.QUOTE_CACHE_BACKEND == "redis":
+            store = RedisQuoteStore(settings.QUOTE_CACHE_URL)
+        elif settings.QUOTE_CACHE_BACKEND == "memory":
+            store = MemoryQuoteStore(settings.QUOTE_CACHE_MAX_BYTES)
+        else:
+            raise ValueError(f"Unknown QUOTE_CACHE_BACKEND: {settings.QUOTE_CACHE_BACKEND}")
+        _quote_cache = QuoteCache(store)
+    return _quote_cache
@@ -0,0 +1,22 @@
+"""
+Provider registry. Adapters register under a name and are enabled through settings.PLAN_PROVIDERS.
+"""
+
+from typing import Callable, Dict, List
+
+from .base import BaseProvider
+
+PROVIDER_FACTORIES: Dict[str, Callable[[], BaseProvider]] = {}
+
+
+def register_provider(name: str, factory: Callable[[], BaseProvider]) -> None:
+    """Make a provider available to settings.PLAN_PROVIDERS."""
+    PROVIDER_FACTORIES[name] = factory
+
+
+def get_providers(names: List[str]) -> List[BaseProvider]:
+    """Instantiate the enabled providers, in order."""
+    unknown = [name for name in names if name not in PROVIDER_FACTORIES]
+    if unknown:
+        raise ValueError(f"Unknown providers: {', '.join(unknown)}")
+    return [PROVIDER_FACTORIES[name]() for name in names]
@@ -0,0 +1,291 @@
+"""
+Offline flight-route graph built from a bundled daily schedule (data/flight_schedule.csv).
+
+Flights are stored as compact adjacency arrays (CSR): the departures of airport i are
+positions indptr[i]:indptr[i + 1], sorted by departure minute, with parallel arrays for
+destination, departure, duration and fare. Schedules repeat daily and all times are UTC
+minutes.
+
+search() is a multi-criteria label-setting search over the time-expanded network: labels
+(first departure, arrival, price, stops) are settled in arrival order and a label is dropped
+when another one at the same airport departs no earlier, arrives no later, costs no more, has
+no more stops and can still catch every onward flight it could (the layover cap). The result
+is the Pareto set over price, duration and stops.
+"""
+
+import csv
+import heapq
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+from core.config import settings
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class Leg(NamedTuple):
+    flight_no: str
+    carrier: str
+    origin: str
+    destination: str
+    depart: int     # minutes from 00:00 UTC of the search date
+    arrive: int
+    fare: float
+
+
+class Itinerary(NamedTuple):
+    legs: Tuple[Leg, ...]
+    price: float
+
+    @property
+    def depart(self) -> int:
+        return self.legs[0].depart
+
+    @property
+    def arrive(self) -> int:
+        return self.legs[-1].arrive
+
+    @property
+    def duration(self) -> int:
+        return self.arrive - self.depart
+
+    @property
+    def stops(self) -> int:
+        return len(self.legs) - 1
+
+
+class RouteGraph:
+    """Daily flight schedule as CSR adjacency arrays."""
+
+    def __init__(self, codes: List[str], indptr: array, destination: array, depart: array,
+                 duration: array, fare: array, flight_no: List[str], carrier: List[str],
+                 in_indptr: array, in_origin: array):
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.indptr = indptr
+        self.destination = destination
+        self.depart = depart
+        self.duration = duration
+        self.fare = fare
+        self.flight_no = flight_no
+        self.carrier = carrier
+        # Distinct inbound routes per airport (in_origin[in_indptr[i]:in_indptr[i + 1]] fly to i)
+        self.in_indptr = in_indptr
+        self.in_origin = in_origin
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, int, int, float, str, str]]) -> "RouteGraph":
+        """Build from (origin, destination, departure minute, duration, fare, carrier, flight_no) rows."""
+        rows = list(rows)
+        codes = sorted({row[0] for row in rows} | {row[1] for row in rows})
+        index = {code: i for i, code in enumerate(codes)}
+        origin = np.fromiter((index[row[0]] for row in rows), dtype=np.int32, count=len(rows))
+        depart = np.fromiter((row[2] for row in rows), dtype=np.int32, count=len(rows))
+        order = np.lexsort((depart, origin))
+
+        indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origin, minlength=len(codes)), out=indptr[1:])
+        destination = np.fromiter((index[row[1]] for row in rows), dtype=np.int32, count=len(rows))[order]
+        duration = np.fromiter((row[3] for row in rows), dtype=np.int32, count=len(rows))[order]
+        fare = np.fromiter((row[4] for row in rows), dtype=np.float64, count=len(rows))[order]
+        ordered = order.tolist()
+
+        routes = np.unique(np.stack([destination, origin[order]], axis=1), axis=0)
+        in_indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(routes[:, 0], minlength=len(codes)), out=in_indptr[1:])
+        return cls(
+            codes,
+            array('q', indptr.tobytes()),
+            array('i', destination.tobytes()),
+            array('i', depart[order].tobytes()),
+            array('i', duration.tobytes()),
+            array('d', fare.tobytes()),
+            [rows[i][6] for i in ordered],
+            [rows[i][5] for i in ordered],
+            array('q', in_indptr.tobytes()),
+            array('i', routes[:, 1].astype(np.int32).tobytes()),
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "RouteGraph":
+        def rows():
+            with open(path, encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    hours, minutes = row['departure_utc'].split(':')
+                    yield (
+                        row['origin'], row['destination'], int(hours) * 60 + int(minutes),
+                        int(row['duration_minutes']), float(row['fare_usd']), row['carrier'], row['flight_no'],
+                    )
+        return cls.from_rows(rows())
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the adjacency arrays (flight numbers / carriers not included)."""
+        arrays = (self.indptr, self.destination, self.depart, self.duration, self.fare, self.in_indptr, self.in_origin)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _departures(self, node: int, earliest: int, latest: int) -> Iterable[Tuple[int, int]]:
+        """(edge, absolute departure minute) for flights leaving `node` within [earliest, latest]."""
+        lo, hi = self.indptr[node], self.indptr[node + 1]
+        if lo == hi:
+            return
+        for day in range(earliest // MINUTES_PER_DAY, latest // MINUTES_PER_DAY + 1):
+            offset = day * MINUTES_PER_DAY
+            start = bisect_left(self.depart, max(earliest - offset, 0), lo, hi)
+            stop = bisect_right(self.depart, min(latest - offset, MINUTES_PER_DAY - 1), lo, hi)
+            for edge in range(start, stop):
+                yield edge, offset + self.depart[edge]
+
+    def hops_to(self, target: int, max_hops: int) -> Dict[int, int]:
+        """Fewest flights from each airport to `target`, for airports within `max_hops` flights."""
+        hops = {target: 0}
+        frontier = [target]
+        for hop in range(1, max_hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for i in range(self.in_indptr[node], self.in_indptr[node + 1]):
+                    origin = self.in_origin[i]
+                    if origin not in hops:
+                        hops[origin] = hop
+                        next_frontier.append(origin)
+            frontier = next_frontier
+        return hops
+
+    def _last_departure(self, node: int, latest: int) -> float:
+        """Absolute minute of the last flight leaving `node` at or before `latest`, or -inf."""
+        lo, hi = self.indptr[node], self.indptr[node + 1]
+        if lo == hi:
+            return -math.inf
+        day, minute = divmod(latest, MINUTES_PER_DAY)
+        position = bisect_right(self.depart, minute, lo, hi)
+        if position > lo:
+            return day * MINUTES_PER_DAY + self.depart[position - 1]
+        return (day - 1) * MINUTES_PER_DAY + self.depart[hi - 1]
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        depart_after: int = 0,
+        depart_before: int = MINUTES_PER_DAY - 1,
+        arrive_by: Optional[int] = None,
+        max_stops: int = settings.ROUTE_MAX_STOPS,
+        min_connection: int = settings.ROUTE_MIN_CONNECTION_MINUTES,
+        max_layover: int = settings.ROUTE_MAX_LAYOVER_MINUTES,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> List[Itinerary]:
+        """
+        Pareto-optimal itineraries (price, duration, stops) from `origin` to `destination`
+        departing within [depart_after, depart_before] and arriving by `arrive_by`, cheapest first.
+        """
+        source, target = self.index.get(origin), self.index.get(destination)
+        if source is None or target is None or source == target:
+            return []
+
+        # Label i: (first departure, arrival, price, stops, last catchable departure, node, edge, parent label)
+        labels: List[Tuple[int, int, float, int, float, int, int, int]] = []
+        alive: List[bool] = []
+        bags: Dict[int, List[int]] = {}     # node -> live label ids
+        heap: List[Tuple[int, float, int, int]] = []
+        arrivals: List[int] = []
+        # Lower bound on the flights still needed; prunes labels that can't reach the target within max_stops
+        hops = self.hops_to(target, max_stops + 1)
+
+        def dominated(node: int, first: int, arrive: int, price: float, stops: int, reach: float) -> bool:
+            for other in bags.get(node, ()):
+                o_first, o_arrive, o_price, o_stops, o_reach = labels[other][:5]
+                if o_first >= first and o_arrive <= arrive and o_price <= price and o_stops <= stops and o_reach >= reach:
+                    return True
+            return False
+
+        def add(first: int, arrive: int, price: float, stops: int, node: int, edge: int, parent: int) -> None:
+            if arrive_by is not None and arrive > arrive_by:
+                return
+            if node == target:
+                reach = math.inf
+            elif stops + hops.get(node, max_stops + 1) > max_stops:
+                return
+            else:
+                # An earlier arrival only beats this label if the layover cap doesn't cost it a connection
+                reach = self._last_departure(node, arrive + max_layover)
+                if reach < arrive + min_connection:
+                    return
+            # A label beaten at its own airport, or by an itinerary already at the target, can't lead anywhere better
+            if dominated(node, first, arrive, price, stops, reach) or dominated(target, first, arrive, price, stops, reach):
+                return
+            keep = []
+            for other in bags.get(node, ()):
+                o_first, o_arrive, o_price, o_stops, o_reach = labels[other][:5]
+                if first >= o_first and arrive <= o_arrive and price <= o_price and stops <= o_stops and reach >= o_reach:
+                    alive[other] = False
+                else:
+                    keep.append(other)
+            label_id = len(labels)
+            labels.append((first, arrive, price, stops, reach, node, edge, parent))
+            alive.append(True)
+            keep.append(label_id)
+            bags[node] = keep
+            heapq.heappush(heap, (arrive, price, stops, label_id))
+
+        for edge, departure in self._departures(source, depart_after, depart_before):
+            add(departure, departure + self.duration[edge], self.fare[edge], 0, self.destination[edge], edge, -1)
+
+        settled = 0
+        while heap:
+            arrive, price, stops, label_id = heapq.heappop(heap)
+            if not alive[label_id]:
+                continue
+            settled += 1
+            first, node = labels[label_id][0], labels[label_id][5]
+            if node == target:
+                arrivals.append(label_id)
+                continue
+            for edge, departure in self._departures(node, arrive + min_connection, arrive + max_layover):
+                next_node = self.destination[edge]
+                if next_node == source or stops + 1 + hops.get(next_node, max_stops + 1) > max_stops:
+                    continue
+                add(first, departure + self.duration[edge], price + self.fare[edge], stops + 1, next_node, edge, label_id)
+
+        if stats is not None:
+            stats.update(labels=len(labels), settled=settled)
+
+        itineraries = [self._itinerary(labels, label_id) for label_id in arrivals if alive[label_id]]
+        return self.pareto(itineraries)
+
+    def _itinerary(self, labels: List[Tuple], label_id: int) -> Itinerary:
+        legs: List[Leg] = []
+        while label_id != -1:
+            _, arrive, _, _, _, node, edge, parent = labels[label_id]
+            # An edge belongs to the airport whose indptr range contains it
+            origin = bisect_right(self.indptr, edge) - 1
+            legs.append(Leg(
+                self.flight_no[edge], self.carrier[edge], self.codes[origin], self.codes[node],
+                arrive - self.duration[edge], arrive, self.fare[edge],
+            ))
+            label_id = parent
+        legs.reverse()
+        return Itinerary(tuple(legs), round(sum(leg.fare for leg in legs), 2))
+
+    @staticmethod
+    def pareto(itineraries: List[Itinerary]) -> List[Itinerary]:
+        """Drop itineraries beaten on price, duration and stops at once; cheapest first."""
+        itineraries = sorted(itineraries, key=lambda i: (i.price, i.duration, i.stops))
+        front: List[Itinerary] = []
+        for candidate in itineraries:
+            if not any(f.price <= candidate.price and f.duration <= candidate.duration and f.stops <= candidate.stops for f in front):
+                front.append(candidate)
+        return front
+
+
+_route_graph: Optional[RouteGraph] = None
+
+
+def get_route_graph() -> RouteGraph:
+    """Process-wide graph loaded from settings.ROUTE_SCHEDULE_PATH on first use."""
+    global _route_graph
+    if _route_graph is None:
+        _route_graph = RouteGraph.from_csv(settings.ROUTE_SCHEDULE_PATH)
+    return _route_graph
@@ -0,0 +1,151 @@
+"""
+Local stand-in providers. They return deterministic offers for a query after a simulated
+network delay, so the planning engine can be exercised without partner API credentials.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+from typing import Any, Dict, List
+
+from core.config import settings
+from .base import BaseProvider, ProviderQuery
+
+AIRLINES = ["Qatar Airways", "Emirates", "Lufthansa", "Delta", "United", "British Airways", "Turkish Airlines", "Air France"]
+HOTEL_BRANDS = ["Grand", "Harbor", "Central", "Royal", "Garden", "Skyline", "Boutique", "Riverside"]
+HOTEL_AMENITIES = ["breakfast", "pool", "wifi", "gym", "parking", "spa", "beach", "airport_shuttle", "kitchen"]
+CAR_COMPANIES = ["Hertz", "Avis", "Enterprise", "Sixt", "Budget"]
+CAR_CLASSES = [("Economy", 32), ("Compact", 38), ("Intermediate SUV", 55), ("Full-size", 60), ("Minivan", 75)]
+ATTRACTION_TEMPLATES = [
+    ("Old Town Walking Tour", "tour", 120), ("National Museum", "museum", 150), ("Food Market Tasting", "food", 90),
+    ("Sunset Boat Cruise", "tour", 120), ("Botanical Gardens", "park", 90), ("Modern Art Gallery", "museum", 120),
+    ("Desert Safari", "adventure", 300), ("Cooking Class", "food", 180), ("Historic Fort", "landmark", 60),
+    ("City Viewpoint", "landmark", 45), ("Aquarium", "family", 120), ("Night Market", "food", 120),
+]
+
+
+class StubProvider(BaseProvider):
+    """Shared plumbing for the stand-in providers."""
+
+    offers_per_query: int = 8
+
+    def _rng(self, query: ProviderQuery) -> random.Random:
+        key = f"{self.name}|{query.origin_code}|{query.destination_code}|{query.start_date}|{query.end_date}|{query.adults}"
+        if query.one_way:
+            key += "|one_way"
+        return random.Random(hashlib.sha256(key.encode()).digest())
+
+    async def _delay(self) -> None:
+        latency_ms = settings.PROVIDER_STUB_LATENCY_MS * random.uniform(0.5, 1.5)
+        await asyncio.sleep(latency_ms / 1000)
+
+    async def search(self, query: ProviderQuery) -> List[Dict[str, Any]]:
+        await self._delay()
+        rng = self._rng(query)
+        return [self.make_offer(query, rng, i) for i in range(self.offers_per_query)]
+
+    def make_offer(self, query: ProviderQuery, rng: random.Random, i: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class StubFlightProvider(StubProvider):
+    name = "stub_flights"
+    kind = "flight"
+    cache_ttl_s = 300
+
+    def make_offer(self, query: ProviderQuery, rng: random.Random, i: int) -> Dict[str, Any]:
+        airline = rng.choice(AIRLINES)
+        stops = rng.choice([0, 0, 1, 1, 2])
+        fare = round(rng.uniform(350, 1100) * (1 - 0.12 * stops) * (0.55 if query.one_way else 1), 2)
+        travellers = query.adults + 0.75 * query.children
+        stops_text = "Non-stop" if stops == 0 else f"{stops} stop" + ("s" if stops > 1 else "")
+        return {
+            "id": f"{self.name}-{i}",
+            "provider": self.name,
+            "airline": airline,
+            "stops": stops,
+            "cabin": "Economy",
+            "outbound": {"date": str(query.start_date), "depart": f"{rng.randint(6, 22):02d}:{rng.choice(['00', '15', '30', '45'])}"},
+            "inbound": None if query.one_way else {"date": str(query.end_date), "depart": f"{rng.randint(6, 22):02d}:{rng.choice(['00', '15', '30', '45'])}"},
+            "duration_minutes": (rng.randint(90, 450) if query.one_way else rng.randint(180, 900)) + 90 * stops,
+            "price": round(fare * travellers, 2),
+            "description": f"{airline}, Economy, {stops_text}" + (", one-way" if query.one_way else ""),
+            "deeplink": f"https://www.example.com/flights/{query.origin_code}-{query.destination_code}?offer={i}",
+        }
+
+
+class StubHotelProvider(StubProvider):
+    name = "stub_hotels"
+    kind = "hotel"
+    cache_ttl_s = 900
+    offers_per_query = 10
+
+    def make_offer(self, query: ProviderQuery, rng: random.Random, i: int) -> Dict[str, Any]:
+        # The same offer index is the same property for every stay at the destination; only rates move with dates
+        identity = random.Random(hashlib.sha256(f"{self.name}|{query.destination_code}|{i}".encode()).digest())
+        stars = identity.randint(2, 5)
+        nightly = round((identity.uniform(40, 90) + stars * identity.uniform(30, 60)) * rng.uniform(0.85, 1.2), 2)
+        rooms = math.ceil((query.adults + query.children) / 2)
+        amenities = sorted(set(identity.sample(HOTEL_AMENITIES, identity.randint(2, 6))))
+        name = f"{identity.choice(HOTEL_BRANDS)} {query.destination_code} Hotel"
+        return {
+            "id": f"{self.name}-{i}",
+            "provider": self.name,
+            "name": name,
+            "stars": stars,
+            "amenities": amenities,
+            "nightly_rate": nightly,
+            "nights": query.nights,
+            "rooms": rooms,
+            "price": round(nightly * query.nights * rooms, 2),
+            "description": f"{name}, {stars} stars" + (", Breakfast included" if "breakfast" in amenities else ""),
+            "deeplink": f"https://www.example.com/hotels/{query.destination_code}?offer={i}",
+        }
+
+
+class StubCarProvider(StubProvider):
+    name = "stub_cars"
+    kind = "car"
+    cache_ttl_s = 900
+    offers_per_query = 5
+
+    def make_offer(self, query: ProviderQuery, rng: random.Random, i: int) -> Dict[str, Any]:
+        company = rng.choice(CAR_COMPANIES)
+        car_class, base_rate = CAR_CLASSES[i % len(CAR_CLASSES)]
+        daily = round(base_rate * rng.uniform(0.85, 1.3), 2)
+        return {
+            "id": f"{self.name}-{i}",
+            "provider": self.name,
+            "company": company,
+            "car_class": car_class,
+            "daily_rate": daily,
+            "days": query.nights,
+            "price": round(daily * query.nights, 2),
+            "description": f"{company} {car_class} with unlimited mileage",
+            "deeplink": f"https://www.example.com/cars/{query.destination_code}?offer={i}",
+        }
+
+
+class StubAttractionProvider(StubProvider):
+    name = "stub_attractions"
+    kind = "attraction"
+    cache_ttl_s = 3600
+    offers_per_query = 12
+
+    def make_offer(self, query: ProviderQuery, rng: random.Random, i: int) -> Dict[str, Any]:
+        title, category, duration = ATTRACTION_TEMPLATES[i % len(ATTRACTION_TEMPLATES)]
+        opens = rng.choice([8, 9, 10, 11, 16])
+        ticket = round(rng.uniform(0, 80), 2)
+        return {
+            "id": f"{self.name}-{i}",
+            "provider": self.name,
+            "name": f"{query.destination_code} {title}",
+            "category": category,
+            "duration_minutes": duration,
+            "opens": f"{opens:02d}:00",
+            "closes": f"{min(opens + rng.randint(6, 12), 23):02d}:00",
+            "price": round(ticket * (query.adults + query.children), 2),
+            "description": title,
+            "deeplink": f"https://www.example.com/attractions/{query.destination_code}?offer={i}",
+        }
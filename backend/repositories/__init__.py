@@ -7,12 +7,19 @@ from .base_repository import BaseRepository
 from .user_repository import UserRepository
 from .trip_repository import TripRepository
 from .package_repository import PackageRepository
+from .package_component_repository import ComponentCache, PackageComponentRepository
 from .booking_repository import BookingRepository
+from .inventory_repository import AttractionInventoryRepository, HotelInventoryRepository, InventoryRepository
 
 __all__ = [
     'BaseRepository',
     'UserRepository',
     'TripRepository', 
     'PackageRepository',
-    'BookingRepository'
+    'PackageComponentRepository',
+    'ComponentCache',
+    'BookingRepository',
+    'InventoryRepository',
+    'HotelInventoryRepository',
+    'AttractionInventoryRepository'
 ]
@@ -0,0 +1,106 @@
+"""
+Inventory repository for bulk loading provider hotel / attraction feeds.
+"""
+
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Type
+from uuid import uuid4
+from sqlalchemy.orm import Session
+
+from .base_repository import BaseRepository, T
+from models.inventory import AttractionInventory, HotelInventory
+
+# Identity of a feed record; also the unique constraint the upsert targets
+KEY_COLUMNS = ('provider', 'provider_id')
+
+
+class InventoryRepository(BaseRepository[T]):
+    """Repository for inventory tables keyed by (provider, provider_id)."""
+    
+    def __init__(self, model: Type[T]):
+        super().__init__(model)
+        self.table = model.__table__
+        self.columns = [c.name for c in self.table.columns]
+        # Columns an upsert overwrites: everything but the row's identity and creation time
+        self.update_columns = [c for c in self.columns if c not in KEY_COLUMNS + ('id', 'created_at')]
+    
+    def upsert_many(self, db: Session, records: List[Dict[str, Any]]) -> int:
+        """Insert or update a batch of validated records by (provider, provider_id), then commit."""
+        if not records:
+            return 0
+        
+        # One row per key: Postgres refuses to upsert the same row twice in one statement
+        now = datetime.utcnow()
+        rows = {}
+        for record in records:
+            rows[(record['provider'], record['provider_id'])] = dict(record, id=uuid4(), created_at=now, updated_at=now)
+        rows = list(rows.values())
+        
+        if db.get_bind().dialect.name == 'postgresql':
+            self._copy_upsert(db, rows)
+        else:
+            self._insert_upsert(db, rows)
+        db.commit()
+        return len(rows)
+    
+    def _copy_upsert(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        # COPY the batch into a temporary staging table, then upsert it with one INSERT ... SELECT
+        table = self.table.name
+        stage = f"{table}_stage"
+        columns = ", ".join(self.columns)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in self.update_columns)
+        
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(self._copy_field(row.get(c)) for c in self.columns))
+            buffer.write("\n")
+        buffer.seek(0)
+        
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            cursor.copy_expert(f"COPY {stage} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage} "
+                f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}"
+            )
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _copy_field(value: Any) -> str:
+        # CSV COPY reads an unquoted empty field as NULL and a quoted one as text, so every value is
+        # quoted and empty strings stay empty strings; JSON columns go in as their text
+        if value is None:
+            return ''
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value)
+        return '"' + str(value).replace('"', '""') + '"'
+    
+    def _insert_upsert(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        # Other databases (SQLite for local runs): INSERT ... ON CONFLICT, executed once per row by the driver
+        from sqlalchemy.dialects.sqlite import insert
+        statement = insert(self.table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={c: statement.excluded[c] for c in self.update_columns},
+        )
+        db.execute(statement, [{c: row.get(c) for c in self.columns} for row in rows])
+
+
+class HotelInventoryRepository(InventoryRepository[HotelInventory]):
+    """Repository for HotelInventory model operations."""
+    
+    def __init__(self):
+        super().__init__(HotelInventory)
+
+
+class AttractionInventoryRepository(InventoryRepository[AttractionInventory]):
+    """Repository for AttractionInventory model operations."""
+    
+    def __init__(self):
+        super().__init__(AttractionInventory)
@@ -0,0 +1,387 @@
+"""
+Content-addressed store for the flight / hotel / car JSON of packages.
+
+Packages of a trip mostly share the same few flights, hotels and cars. Each component is
+serialized to canonical JSON (sorted keys, no whitespace) and stored once in
+package_components under its SHA-256; the package keeps the hash in flight_ref / hotel_ref /
+car_ref and an empty *_data column. The ORM listeners at the bottom of this module do this on
+every flush (one insert for all new components of the flush) and fill *_data back in when
+packages are loaded (one fetch per query, through a process-wide LRU), so the rest of the
+code keeps reading and writing package.flight_data. The app registers them with
+register_listeners() in dependencies.py; scripts opening their own sessions call it themselves.
+Rows written before the store existed keep their inline JSON and load unchanged.
+
+Move existing inline JSON into the store and print storage figures (run from backend/):
+    python -m repositories.package_component_repository [migrate|stats]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from uuid import uuid4
+from sqlalchemy import String, cast, event, func, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .base_repository import BaseRepository
+from core.config import settings
+from models.package import Package, PackageComponent
+
+# Package JSON column -> (hash column, component kind)
+COMPONENT_COLUMNS = {
+    'flight_data': ('flight_ref', 'flight'),
+    'hotel_data': ('hotel_ref', 'hotel'),
+    'car_data': ('car_ref', 'car'),
+}
+
+
+def canonical_json(data: Dict[str, Any]) -> str:
+    """One text per content: equal dicts always serialize to the same string."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def content_hash(canonical: str) -> str:
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ComponentCache:
+    """
+    In-process LRU of decoded components by hash, bounded by their encoded size. Entries never
+    go stale: a hash always names the same content.
+    
+    Packages loaded in this process share the cached dicts, so replace package.flight_data
+    instead of editing it in place (in-place edits of these JSON columns are not saved either).
+    """
+    
+    def __init__(self, max_bytes: int = settings.COMPONENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        # Sync endpoints run in a thread pool
+        self._lock = threading.Lock()
+    
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(digest)
+            return entry[1]
+    
+    def set(self, digest: str, canonical: str) -> Dict[str, Any]:
+        """Cache the component's canonical JSON; returns the decoded dict."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                return entry[1]
+        data = json.loads(canonical)
+        size = len(canonical.encode('utf-8'))
+        if size > self.max_bytes:
+            return data
+        with self._lock:
+            if digest not in self._entries:
+                self._entries[digest] = (size, data)
+                self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (oldest, _) = self._entries.popitem(last=False)
+                self.bytes -= oldest
+                self.evictions += 1
+        return data
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+        }
+
+
+_component_cache: Optional[ComponentCache] = None
+
+
+def get_component_cache() -> ComponentCache:
+    """Process-wide component LRU."""
+    global _component_cache
+    if _component_cache is None:
+        _component_cache = ComponentCache()
+    return _component_cache
+
+
+class PackageComponentRepository(BaseRepository[PackageComponent]):
+    """Repository for the content-addressed package components."""
+    
+    def __init__(self, cache: Optional[ComponentCache] = None):
+        super().__init__(PackageComponent)
+        self.table = PackageComponent.__table__
+        self.cache = cache if cache is not None else get_component_cache()
+    
+    def _insert(self, connection: Connection):
+        if connection.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(self.table).on_conflict_do_nothing(index_elements=['hash'])
+    
+    def store_many(self, connection: Connection, components: Dict[str, Tuple[str, str]]) -> None:
+        """Store components ({hash: (kind, canonical JSON)}) whose content is not there yet, in one statement."""
+        if not components:
+            return
+        now = datetime.utcnow()
+        connection.execute(self._insert(connection), [
+            {
+                'id': uuid4(), 'created_at': now, 'updated_at': now,
+                'hash': digest, 'kind': kind, 'data': json.loads(canonical), 'size_bytes': len(canonical.encode('utf-8')),
+            }
+            for digest, (kind, canonical) in components.items()
+        ])
+        for digest, (_, canonical) in components.items():
+            self.cache.set(digest, canonical)
+    
+    def fetch(self, db: Union[Session, Connection], digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Components by hash, from the LRU and one query for the misses."""
+        found, missing = {}, []
+        for digest in set(digests):
+            data = self.cache.get(digest)
+            if data is None:
+                missing.append(digest)
+            else:
+                found[digest] = data
+        if missing:
+            # Core query on the session's connection: no autoflush while the ORM is loading rows
+            connection = db.connection() if isinstance(db, Session) else db
+            rows = connection.execute(select(self.table.c.hash, self.table.c.data).where(self.table.c.hash.in_(missing)))
+            for digest, data in rows:
+                found[digest] = self.cache.set(digest, canonical_json(data))
+        return found
+    
+    def externalize(self, connection: Connection, packages: Iterable[Package]) -> List[Tuple[Package, str, Any]]:
+        """
+        Move the component JSON of new packages, and changed component JSON of loaded ones, into
+        the store, leaving hashes behind. Returns (package, column, data) to put back once flushed.
+        """
+        components: Dict[str, Tuple[str, str]] = {}
+        restore = []
+        for package in packages:
+            state = inspect(package)
+            for column, (ref, kind) in COMPONENT_COLUMNS.items():
+                if state.has_identity and not state.attrs[column].history.has_changes():
+                    continue
+                data = getattr(package, column)
+                if data:
+                    canonical = canonical_json(data)
+                    digest = content_hash(canonical)
+                    components[digest] = (kind, canonical)
+                    setattr(package, ref, digest)
+                    setattr(package, column, None)
+                    restore.append((package, column, data))
+                else:
+                    setattr(package, ref, None)
+        self.store_many(connection, components)
+        return restore
+    
+    def hydrate(self, db: Union[Session, Connection], packages: List[Package]) -> None:
+        """Fill in *_data of packages that reference stored components, without marking them modified."""
+        wanted = [(package, column, getattr(package, ref)) for package in packages
+                  for column, (ref, _) in COMPONENT_COLUMNS.items() if getattr(package, ref)]
+        if not wanted:
+            return
+        components = self.fetch(db, [digest for _, _, digest in wanted])
+        for package, column, digest in wanted:
+            set_committed_value(package, column, components.get(digest))
+    
+    def add_ref_columns(self, connection: Connection) -> List[str]:
+        """Add the *_ref columns to a packages table created before the store existed."""
+        existing = {c['name'] for c in inspect(connection).get_columns(Package.__tablename__)}
+        added = []
+        for ref, _ in COMPONENT_COLUMNS.values():
+            if ref not in existing:
+                connection.execute(text(f"ALTER TABLE {Package.__tablename__} ADD COLUMN {ref} VARCHAR(64)"))
+                added.append(ref)
+        return added
+    
+    def migrate_inline(self, db: Session, chunk_size: int = 1000) -> int:
+        """Move inline component JSON of existing packages into the store, one chunk per transaction."""
+        packages = Package.__table__
+        moved, last_id = 0, None
+        while True:
+            query = select(packages.c.id, *(packages.c[column] for column in COMPONENT_COLUMNS)).order_by(packages.c.id)
+            if last_id is not None:
+                query = query.where(packages.c.id > last_id)
+            rows = db.execute(query.limit(chunk_size)).all()
+            if not rows:
+                return moved
+            connection = db.connection()
+            components: Dict[str, Tuple[str, str]] = {}
+            updates = []
+            for row in rows:
+                values = {}
+                for column, (ref, kind) in COMPONENT_COLUMNS.items():
+                    if row[column]:
+                        canonical = canonical_json(row[column])
+                        values[ref] = content_hash(canonical)
+                        values[column] = None
+                        components[values[ref]] = (kind, canonical)
+                if values:
+                    updates.append((row.id, values))
+            self.store_many(connection, components)
+            for package_id, values in updates:
+                connection.execute(update(packages).where(packages.c.id == package_id).values(**values))
+            moved += len(updates)
+            db.commit()
+            last_id = rows[-1].id
+    
+    def storage_stats(self, db: Session) -> Dict[str, Any]:
+        """Component JSON bytes as stored versus what one inline copy per package would take."""
+        packages = Package.__table__
+        inline_bytes = sum(
+            db.execute(select(func.coalesce(func.sum(func.length(cast(packages.c[column], String))), 0))
+                       .where(packages.c[ref].is_(None))).scalar()
+            for column, (ref, _) in COMPONENT_COLUMNS.items()
+        )
+        sizes = dict(db.execute(select(self.table.c.hash, self.table.c.size_bytes)).all())
+        referenced_bytes = references = 0
+        for ref, _ in COMPONENT_COLUMNS.values():
+            counts = db.execute(select(packages.c[ref], func.count()).where(packages.c[ref].isnot(None)).group_by(packages.c[ref]))
+            for digest, count in counts:
+                referenced_bytes += sizes.get(digest, 0) * count
+                references += count
+        
+        component_bytes = sum(sizes.values())
+        stored = inline_bytes + component_bytes + 64 * references
+        logical = inline_bytes + referenced_bytes
+        return {
+            'packages': db.execute(select(func.count()).select_from(packages)).scalar(),
+            'components': len(sizes),
+            'references': references,
+            'inline_bytes': inline_bytes,
+            'component_bytes': component_bytes,
+            'stored_bytes': stored,
+            'undeduplicated_bytes': logical,
+            'saved_pct': round(100 * (1 - stored / logical), 1) if logical else None,
+        }
+
+
+_component_repository: Optional[PackageComponentRepository] = None
+
+
+def get_component_repository() -> PackageComponentRepository:
+    global _component_repository
+    if _component_repository is None:
+        _component_repository = PackageComponentRepository()
+    return _component_repository
+
+
+# Packages are written and read through these listeners wherever the ORM is used
+
+def _externalize_before_flush(session, flush_context, instances):
+    if not settings.PACKAGE_COMPONENT_DEDUP:
+        return
+    packages = [obj for obj in (*session.new, *session.dirty) if isinstance(obj, Package)]
+    if packages:
+        restore = get_component_repository().externalize(session.connection(), packages)
+        session.info.setdefault('component_restore', []).extend(restore)
+
+
+def _restore_after_flush(session, flush_context):
+    for package, column, data in session.info.pop('component_restore', []):
+        set_committed_value(package, column, data)
+
+
+def _forget_restore(session):
+    session.info.pop('component_restore', None)
+
+
+def _hydrate_per_query(orm_execute_state):
+    """Hydrate all packages one ORM query loads with a single component fetch, not one per row."""
+    options = orm_execute_state.execution_options
+    if not orm_execute_state.is_select or options.get('yield_per') or options.get('stream_results'):
+        return None
+    # Other queries (users, trips, ...) run untouched; packages they eager-load hydrate per row
+    if not any(mapper.class_ is Package for mapper in orm_execute_state.all_mappers):
+        return None
+    session = orm_execute_state.session
+    outer = session.info.get('component_batch')
+    batch = session.info['component_batch'] = []
+    try:
+        # Buffer the rows, so every package of the result is loaded before the fetch
+        frozen = orm_execute_state.invoke_statement().freeze()
+    finally:
+        if outer is None:
+            session.info.pop('component_batch', None)
+        else:
+            session.info['component_batch'] = outer
+    get_component_repository().hydrate(session, batch)
+    return frozen()
+
+
+def _collect_on_load(target, context):
+    batch = context.session.info.get('component_batch')
+    if batch is None:
+        # Loaded by a streamed (yield_per) query: no result to wait for
+        get_component_repository().hydrate(context.session, [target])
+    else:
+        batch.append(target)
+
+
+def _collect_on_refresh(target, context, attrs):
+    if attrs is None or any(column in attrs or ref in attrs for column, (ref, _) in COMPONENT_COLUMNS.items()):
+        _collect_on_load(target, context)
+
+
+_LISTENERS = (
+    (Session, 'before_flush', _externalize_before_flush),
+    (Session, 'after_flush_postexec', _restore_after_flush),
+    (Session, 'after_rollback', _forget_restore),
+    (Session, 'do_orm_execute', _hydrate_per_query),
+    (Package, 'load', _collect_on_load),
+    (Package, 'refresh', _collect_on_refresh),
+)
+
+
+def register_listeners() -> None:
+    """Route package reads and writes through the component store for every ORM session; idempotent."""
+    for target, name, listener in _LISTENERS:
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Package component store maintenance")
+    parser.add_argument("command", choices=["migrate", "stats"], nargs="?", default="stats")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from core.database import SessionLocal, engine
+    repository = get_component_repository()
+    report: Dict[str, Any] = {}
+    if args.command == "migrate":
+        PackageComponent.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as connection:
+            report['added_columns'] = repository.add_ref_columns(connection)
+    db = SessionLocal()
+    try:
+        if args.command == "migrate":
+            report['migrated_packages'] = repository.migrate_inline(db, args.chunk_size)
+        report.update(repository.storage_stats(db))
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
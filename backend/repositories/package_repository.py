@@ -2,7 +2,8 @@
 Package repository for package-specific database operations.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Any, Dict
+from sqlalchemy import Float, String, and_, bindparam, cast, column, or_, update, values
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -10,6 +11,13 @@ from .base_repository import BaseRepository
 from models.package import Package
 
 
+def _has_component(column, ref=None):
+    """SQL truth value of a JSON component column, matching Python truthiness of the stored dict."""
+    inline = and_(column.isnot(None), cast(column, String).notin_(['null', '{}']))
+    # Components moved to the store are non-empty by construction
+    return inline if ref is None else or_(ref.isnot(None), inline)
+
+
 class PackageRepository(BaseRepository[Package]):
     """Repository for Package model operations."""
     
@@ -66,13 +74,13 @@ class PackageRepository(BaseRepository[Package]):
             query = query.filter(Package.score <= search_params['max_score'])
         
         if 'has_flight' in search_params and search_params['has_flight']:
-            query = query.filter(Package.flight_data.isnot(None))
+            query = query.filter(_has_component(Package.flight_data, Package.flight_ref))
         
         if 'has_hotel' in search_params and search_params['has_hotel']:
-            query = query.filter(Package.hotel_data.isnot(None))
+            query = query.filter(_has_component(Package.hotel_data, Package.hotel_ref))
         
         if 'has_car' in search_params and search_params['has_car']:
-            query = query.filter(Package.car_data.isnot(None))
+            query = query.filter(_has_component(Package.car_data, Package.car_ref))
         
         # Order by score by default
         query = query.order_by(Package.score.desc())
@@ -87,3 +95,64 @@ class PackageRepository(BaseRepository[Package]):
             db.commit()
             db.refresh(package)
         return package
+    
+    def create_many(self, db: Session, objs_in: List[Any]) -> List[Package]:
+        """Insert several packages in one transaction."""
+        packages = [Package(**(obj.dict() if hasattr(obj, 'dict') else obj)) for obj in objs_in]
+        db.add_all(packages)
+        db.commit()
+        for package in packages:
+            db.refresh(package)
+        return packages
+    
+    def _scoring_query(self, db: Session):
+        """Only the columns the package score depends on: no JSON payloads are loaded."""
+        return db.query(
+            Package.id,
+            Package.total_price,
+            _has_component(Package.flight_data, Package.flight_ref).label('has_flight'),
+            _has_component(Package.hotel_data, Package.hotel_ref).label('has_hotel'),
+            _has_component(Package.car_data, Package.car_ref).label('has_car'),
+            _has_component(Package.attractions_data).label('has_attractions'),
+        )
+    
+    def get_scoring_rows(self, db: Session, trip_id: UUID) -> List[Any]:
+        """Get (id, total_price, has_flight, has_hotel, has_car, has_attractions) for a trip's packages."""
+        return self._scoring_query(db).filter(Package.trip_id == trip_id).all()
+    
+    def get_scoring_chunk(self, db: Session, after_id: Optional[UUID], limit: int) -> List[Any]:
+        """Get the next `limit` scoring rows ordered by id, keyset-paginated from `after_id`."""
+        query = self._scoring_query(db)
+        if after_id is not None:
+            query = query.filter(Package.id > after_id)
+        return query.order_by(Package.id).limit(limit).all()
+    
+    def bulk_update_scores(self, db: Session, scores: Dict[UUID, float]) -> int:
+        """Write many package scores with one bulk UPDATE."""
+        if not scores:
+            return 0
+        
+        if db.get_bind().dialect.name == 'postgresql':
+            # UPDATE ... FROM (VALUES ...): one statement joining packages to the new scores
+            new_scores = values(
+                column('id', String), column('score', Float), name='new_scores'
+            ).data([(str(package_id), score) for package_id, score in scores.items()])
+            statement = (
+                update(Package)
+                .where(Package.id == cast(new_scores.c.id, Package.id.type))
+                .values(score=new_scores.c.score)
+            )
+            result = db.execute(statement.execution_options(synchronize_session=False))
+        else:
+            # Other databases: the same single statement, executed once per row by the driver
+            statement = (
+                update(Package.__table__)
+                .where(Package.__table__.c.id == bindparam('package_id'))
+                .values(score=bindparam('new_score'))
+            )
+            result = db.execute(statement, [
+                {'package_id': package_id, 'new_score': score} for package_id, score in scores.items()
+            ])
+        
+        db.commit()
+        return result.rowcount
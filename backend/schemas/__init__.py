@@ -4,9 +4,11 @@ Pydantic schemas for request/response models.
 
 from .user import User, UserCreate, UserUpdate, UserInDB, UserLogin, PasswordResetRequest, PasswordResetConfirm, ChangePassword
 from .token import Token, TokenPayload, TokenCreate
+from .plan import PlanSlots, PlanPreferences, PlanBuildRequest, PlanBuildResponse, ProviderTiming
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserInDB", "UserLogin",
     "PasswordResetRequest", "PasswordResetConfirm", "ChangePassword",
-    "Token", "TokenPayload", "TokenCreate"
+    "Token", "TokenPayload", "TokenCreate",
+    "PlanSlots", "PlanPreferences", "PlanBuildRequest", "PlanBuildResponse", "ProviderTiming"
 ]
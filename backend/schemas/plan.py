@@ -0,0 +1,57 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+from models.package import Package
+
+class PlanDates(BaseModel):
+    """Travel dates as produced by the NLU service."""
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+class PlanPax(BaseModel):
+    """Travellers."""
+    adults: Optional[int] = Field(None, ge=1)
+    children: Optional[int] = Field(None, ge=0)
+
+class PlanHotelPreferences(BaseModel):
+    """Must-have hotel amenities."""
+    amenities: List[str] = []
+
+class PlanSlots(BaseModel):
+    """Slots filled by /nlu/parse (same shape as the NLU service's Slots)."""
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    dates: PlanDates = PlanDates()
+    pax: PlanPax = PlanPax()
+    budget: Optional[float] = Field(None, ge=0)
+    hotel: PlanHotelPreferences = PlanHotelPreferences()
+    car: Optional[bool] = None
+
+class PlanPreferences(BaseModel):
+    """Planning options: an existing trip to plan into and how many packages to build."""
+    trip_id: Optional[UUID] = None
+    max_packages: Optional[int] = Field(None, ge=1, le=20)
+
+class PlanBuildRequest(BaseModel):
+    """Body of POST /plan/build."""
+    slots: PlanSlots
+    prefs: PlanPreferences = PlanPreferences()
+
+class ProviderTiming(BaseModel):
+    """How one provider did within its deadline."""
+    provider: str
+    kind: str
+    status: str  # 'ok', 'timeout', 'error' or 'skipped'
+    latency_ms: float
+    offers: int = 0
+    error: Optional[str] = None
+    cache: Optional[str] = None  # 'hit', 'stale', 'negative' or 'miss'; None when the quote cache is off
+
+class PlanBuildResponse(BaseModel):
+    """Packages assembled for the trip plus the per-provider latency breakdown."""
+    trip_id: UUID
+    packages: List[Package]
+    providers: List[ProviderTiming]
+    elapsed_ms: float
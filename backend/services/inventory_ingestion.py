@@ -0,0 +1,203 @@
+"""
+Streaming ingestion of provider inventory feeds (hotels, attractions) into the local tables.
+
+Feeds are read one record at a time (CSV through csv.DictReader, JSON Lines line by line,
+JSON documents through the incremental ijson parser, optionally gzipped), validated in
+batches and upserted by (provider, provider_id) with one transaction per batch: COPY into a
+staging table plus INSERT ... ON CONFLICT on Postgres. Only the current batch is held in
+memory, so memory use does not grow with the size of the feed.
+
+Run from backend/:
+    python -m services.inventory_ingestion hotels feed.json --provider acme [--json-prefix item] [--batch-size 5000]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import validate_model
+
+from core.config import settings
+from models.inventory import AttractionInventoryBase, HotelInventoryBase
+from repositories.inventory_repository import AttractionInventoryRepository, HotelInventoryRepository
+
+FEED_KINDS = {
+    'hotels': (HotelInventoryBase, HotelInventoryRepository),
+    'attractions': (AttractionInventoryBase, AttractionInventoryRepository),
+}
+FEED_FORMATS = ('csv', 'jsonl', 'json')
+
+
+def detect_format(path: str) -> str:
+    """Feed format from the file name: .csv, .jsonl / .ndjson or .json, optionally + .gz."""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.json'):
+        return 'json'
+    raise ValueError(f"Cannot tell the feed format of {path}; pass it explicitly")
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode) if path.lower().endswith('.gz') else open(path, mode)
+
+
+def iter_feed(path: str, fmt: str, json_prefix: str = 'item') -> Iterator[Dict[str, Any]]:
+    """
+    Yield raw records from a feed without loading it. For JSON, `json_prefix` is the ijson
+    path of the records: "item" for a top-level array, "hotels.item" for {"hotels": [...]}.
+    """
+    if fmt == 'csv':
+        with _open(path, 'rb') as raw:
+            for row in csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8', newline='')):
+                # Empty CSV cells are missing values, not empty strings
+                yield {key: (value if value != '' else None) for key, value in row.items()}
+    elif fmt == 'jsonl':
+        with _open(path, 'rb') as raw:
+            for line in raw:
+                if line.strip():
+                    yield json.loads(line)
+    elif fmt == 'json':
+        import ijson  # incremental parser; only needed for JSON (not JSON Lines) feeds
+        with _open(path, 'rb') as raw:
+            yield from ijson.items(raw, json_prefix, use_float=True)
+    else:
+        raise ValueError(f"Unknown feed format: {fmt}")
+
+
+def batched(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory of this process so far (None where the platform doesn't report it)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class InventoryIngestion:
+    """Streams one inventory feed into its table."""
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+        max_errors: int = 20
+    ):
+        if session_factory is None:
+            from core.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+    
+    @staticmethod
+    def validate(schema, raws: List[Dict[str, Any]], provider: Optional[str], offset: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Valid records of a batch as column dicts, and the invalid ones with their feed position and errors."""
+        valid, invalid = [], []
+        for position, raw in enumerate(raws, start=offset):
+            if not isinstance(raw, dict):
+                invalid.append({'record': position, 'provider_id': None, 'errors': [{'msg': 'record is not an object'}]})
+                continue
+            if provider is not None:
+                raw = dict(raw, provider=provider)
+            # Field validation only; skips building model instances, which costs more than the checks
+            values, _, error = validate_model(schema, raw)
+            if error is None:
+                valid.append(values)
+            else:
+                invalid.append({'record': position, 'provider_id': raw.get('provider_id'), 'errors': error.errors()})
+        return valid, invalid
+    
+    def run(
+        self,
+        kind: str,
+        path: str,
+        fmt: Optional[str] = None,
+        provider: Optional[str] = None,
+        json_prefix: str = 'item',
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingest `path` into the `kind` ("hotels" or "attractions") table. `provider` overrides the
+        records' own provider field. Invalid records are skipped and counted, not fatal.
+        """
+        if kind not in FEED_KINDS:
+            raise ValueError(f"Unknown feed kind: {kind}")
+        schema, repository_class = FEED_KINDS[kind]
+        repository = repository_class()
+        fmt = fmt or detect_format(path)
+        
+        report = {
+            'kind': kind, 'path': path, 'format': fmt,
+            'read': 0, 'valid': 0, 'invalid': 0, 'upserted': 0, 'batches': 0,
+            'errors': [],
+        }
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            for raws in batched(iter_feed(path, fmt, json_prefix), self.batch_size):
+                valid, invalid = self.validate(schema, raws, provider, report['read'])
+                report['upserted'] += repository.upsert_many(db, valid)
+                report['read'] += len(raws)
+                report['valid'] += len(valid)
+                report['invalid'] += len(invalid)
+                report['batches'] += 1
+                report['errors'].extend(invalid[:self.max_errors - len(report['errors'])])
+                if progress is not None:
+                    progress(self._rates(report, started))
+        finally:
+            db.close()
+        return self._rates(report, started)
+    
+    @staticmethod
+    def _rates(report: Dict[str, Any], started: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started
+        return dict(
+            report,
+            elapsed_s=round(elapsed, 3),
+            rows_per_sec=round(report['read'] / elapsed, 1) if elapsed else None,
+            peak_memory_mb=peak_memory_mb(),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a provider inventory feed into the local tables")
+    parser.add_argument("kind", choices=sorted(FEED_KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FEED_FORMATS, default=None, help="default: from the file extension")
+    parser.add_argument("--provider", default=None, help="provider name stored with every record (overrides the feed's own)")
+    parser.add_argument("--json-prefix", default="item", help='ijson path of the records, e.g. "hotels.item"')
+    parser.add_argument("--batch-size", type=int, default=settings.INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    def progress(report: Dict[str, Any]) -> None:
+        if report['batches'] % 20 == 0:
+            print(f"{report['read']} records, {report['rows_per_sec']} rows/sec, {report['peak_memory_mb']} MB peak", file=sys.stderr)
+
+    ingestion = InventoryIngestion(batch_size=args.batch_size)
+    report = ingestion.run(args.kind, args.path, args.format, args.provider, args.json_prefix, progress=progress)
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
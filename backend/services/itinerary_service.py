@@ -0,0 +1,257 @@
+"""
+Day-by-day itinerary for a package's attractions.
+
+Travel times come from one vectorized haversine matrix over the hotel and every stop. Each
+day starts and ends at the hotel and is filled by nearest-neighbour: the next stop is the one
+that can start soonest (travel plus waiting for it to open) and still finish before it closes,
+leaving time to get back to the hotel before the day ends. Every day's loop is then shortened with 2-opt: gains of all segment reversals are
+computed at once with NumPy, and the best reversal that keeps every stop inside its opening
+hours is applied, until no reversal improves or the time budget runs out. Stops that fit no
+day are returned as unscheduled.
+"""
+
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from core.config import settings
+from models.package import Package
+from models.trip import Trip
+from providers import AttractionIndex, get_attraction_index
+from providers.attraction_index import haversine_km
+
+MINUTES_PER_DAY = 24 * 60
+MIN_GAIN_KM = 1e-6
+
+
+def parse_hhmm(value: Optional[str], default: int) -> int:
+    """Minutes after midnight of an "HH:MM" time, `default` when missing."""
+    if not value:
+        return default
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_hhmm(minutes: float) -> str:
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def distance_matrix(latitude: Sequence[float], longitude: Sequence[float]) -> np.ndarray:
+    """Pairwise great-circle distances in km."""
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    return haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+
+class DayPlanner:
+    """
+    Orders stops into days. Node 0 is the hotel, node i (1..n) is stop i - 1; times are
+    minutes after midnight.
+    """
+    
+    def __init__(
+        self,
+        distances_km: np.ndarray,
+        opens: Sequence[int],
+        closes: Sequence[int],
+        durations: Sequence[int],
+        day_start: int,
+        day_end: int,
+        speed_kmh: float = settings.ITINERARY_SPEED_KMH,
+        deadline: Optional[float] = None
+    ):
+        self.distances = distances_km
+        self.travel = distances_km * (60.0 / speed_kmh)
+        # Node 0 (the hotel) is always open and takes no time
+        self.opens = np.concatenate(([0], np.asarray(opens, dtype=np.float64)))
+        self.closes = np.concatenate(([MINUTES_PER_DAY], np.asarray(closes, dtype=np.float64)))
+        self.durations = np.concatenate(([0], np.asarray(durations, dtype=np.float64)))
+        self.day_start = day_start
+        self.day_end = day_end
+        self.latest_end = np.minimum(self.closes, day_end)
+        self.deadline = deadline
+        self.stats = {'nearest_neighbour_km': 0.0, 'two_opt_moves': 0, 'budget_exhausted': False}
+    
+    def _out_of_time(self) -> bool:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.stats['budget_exhausted'] = True
+            return True
+        return False
+    
+    def schedule(self, route: Sequence[int]) -> Optional[List[Tuple[float, float, float]]]:
+        """
+        (arrive, start, end) of each stop of a route from the hotel, or None if a stop misses its
+        hours or the hotel can't be reached again by the end of the day.
+        """
+        times = []
+        now, previous = float(self.day_start), 0
+        for node in route:
+            arrive = now + self.travel[previous, node]
+            start = max(arrive, self.opens[node])
+            now = start + self.durations[node]
+            if now > self.latest_end[node]:
+                return None
+            times.append((arrive, start, now))
+            previous = node
+        if now + self.travel[previous, 0] > self.day_end:
+            return None
+        return times
+    
+    def length_km(self, route: Sequence[int]) -> float:
+        path = [0, *route, 0]
+        return float(self.distances[path[:-1], path[1:]].sum())
+    
+    def nearest_neighbour_day(self, remaining: np.ndarray) -> List[int]:
+        """Greedy route for one day over the nodes flagged in `remaining`, which it clears."""
+        route: List[int] = []
+        now, current = float(self.day_start), 0
+        while remaining.any():
+            candidates = np.flatnonzero(remaining)
+            start = np.maximum(now + self.travel[current, candidates], self.opens[candidates])
+            end = start + self.durations[candidates]
+            # ...and the day must still end back at the hotel
+            feasible = (end <= self.latest_end[candidates]) & (end + self.travel[candidates, 0] <= self.day_end)
+            if not feasible.any():
+                break
+            best = int(np.argmin(np.where(feasible, start, np.inf)))
+            current, now = int(candidates[best]), float(end[best])
+            remaining[current] = False
+            route.append(current)
+        return route
+    
+    def two_opt(self, route: List[int]) -> List[int]:
+        """Shorten a day's loop by segment reversals that keep every stop within its hours."""
+        while len(route) >= 2 and not self._out_of_time():
+            path = np.array([0, *route, 0])
+            a, b = path[:-1], path[1:]
+            # gain[i, j]: km saved by replacing edges i and j with (a_i, a_j) and (b_i, b_j),
+            # i.e. by reversing route[i:j]
+            gain = (self.distances[a, b][:, None] + self.distances[a, b][None, :]
+                    - self.distances[a[:, None], a[None, :]] - self.distances[b[:, None], b[None, :]])
+            gain = np.triu(gain, k=2)
+            moves = np.flatnonzero(gain > MIN_GAIN_KM)
+            if not len(moves):
+                break
+            improved = False
+            for move in moves[np.argsort(-gain.ravel()[moves], kind='stable')]:
+                i, j = divmod(int(move), len(a))
+                candidate = route[:i] + route[i:j][::-1] + route[j:]
+                if self.schedule(candidate) is not None:
+                    route, improved = candidate, True
+                    self.stats['two_opt_moves'] += 1
+                    break
+                if self._out_of_time():
+                    break
+            if not improved:
+                break
+        return route
+    
+    def plan(self, days: int) -> Tuple[List[List[int]], List[int]]:
+        """Routes for `days` days and the nodes that fit none of them."""
+        remaining = np.ones(len(self.opens), dtype=bool)
+        remaining[0] = False
+        routes = []
+        for _ in range(days):
+            route = self.nearest_neighbour_day(remaining)
+            self.stats['nearest_neighbour_km'] += self.length_km(route)
+            routes.append(route)
+        # Greedy routes first, so every stop that fits somewhere is placed before 2-opt spends the budget
+        routes = [self.two_opt(route) for route in routes]
+        return routes, np.flatnonzero(remaining).tolist()
+
+
+class ItineraryService:
+    """Service for ordering package attractions into daily itineraries."""
+    
+    def __init__(self, attraction_index: Optional[AttractionIndex] = None):
+        self.attraction_index = attraction_index if attraction_index is not None else get_attraction_index()
+    
+    def anchor(self, package: Package, trip: Trip, stops: List[Dict[str, Any]]) -> Tuple[float, float]:
+        """Where each day starts and ends: the hotel, else the city centre, else the stops' centre."""
+        hotel = package.hotel_data or {}
+        if hotel.get('latitude') is not None and hotel.get('longitude') is not None:
+            return float(hotel['latitude']), float(hotel['longitude'])
+        center = self.attraction_index.city_center(trip.destination_code)
+        if center is not None:
+            return center
+        located = [s for s in stops if s.get('latitude') is not None and s.get('longitude') is not None]
+        if located:
+            return (float(np.mean([s['latitude'] for s in located])),
+                    float(np.mean([s['longitude'] for s in located])))
+        return 0.0, 0.0
+    
+    def plan_stops(
+        self,
+        stops: List[Dict[str, Any]],
+        anchor: Tuple[float, float],
+        first_day: date,
+        days: int,
+        day_start: str = settings.ITINERARY_DAY_START,
+        day_end: str = settings.ITINERARY_DAY_END,
+        budget_ms: float = settings.ITINERARY_BUDGET_MS
+    ) -> Dict[str, Any]:
+        """
+        Itinerary for attraction dicts (latitude, longitude, opens, closes, duration_minutes);
+        stops without coordinates are treated as being at the anchor.
+        """
+        if parse_hhmm(day_start, 0) >= parse_hhmm(day_end, MINUTES_PER_DAY):
+            raise ValueError(f"Day start {day_start} is not before day end {day_end}")
+        started = time.perf_counter()
+        latitude = [anchor[0]] + [s['latitude'] if s.get('latitude') is not None else anchor[0] for s in stops]
+        longitude = [anchor[1]] + [s['longitude'] if s.get('longitude') is not None else anchor[1] for s in stops]
+        planner = DayPlanner(
+            distance_matrix(latitude, longitude),
+            opens=[parse_hhmm(s.get('opens'), 0) for s in stops],
+            closes=[parse_hhmm(s.get('closes'), MINUTES_PER_DAY) for s in stops],
+            durations=[s.get('duration_minutes') or 0 for s in stops],
+            day_start=parse_hhmm(day_start, 0),
+            day_end=parse_hhmm(day_end, MINUTES_PER_DAY),
+            deadline=started + budget_ms / 1000,
+        )
+        routes, unscheduled = planner.plan(max(days, 1))
+        
+        itinerary_days = []
+        for offset, route in enumerate(routes):
+            visits, previous, back = [], 0, planner.day_start
+            for node, (arrive, start, end) in zip(route, planner.schedule(route)):
+                visits.append(dict(
+                    stops[node - 1],
+                    arrive=format_hhmm(arrive),
+                    start=format_hhmm(start),
+                    end=format_hhmm(end),
+                    travel_km=round(float(planner.distances[previous, node]), 3),
+                ))
+                previous = node
+                back = end + planner.travel[node, 0]
+            itinerary_days.append({
+                'date': str(first_day + timedelta(days=offset)),
+                'stops': visits,
+                'back_at_hotel': format_hhmm(back),
+                'distance_km': round(planner.length_km(route), 3),
+            })
+        
+        return {
+            'anchor': {'latitude': anchor[0], 'longitude': anchor[1]},
+            'days': itinerary_days,
+            'unscheduled': [stops[node - 1] for node in unscheduled],
+            'distance_km': round(sum(d['distance_km'] for d in itinerary_days), 3),
+            'nearest_neighbour_km': round(planner.stats['nearest_neighbour_km'], 3),
+            'two_opt_moves': planner.stats['two_opt_moves'],
+            'budget_exhausted': planner.stats['budget_exhausted'],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+    
+    def build_itinerary(
+        self,
+        package: Package,
+        trip: Trip,
+        day_start: str = settings.ITINERARY_DAY_START,
+        day_end: str = settings.ITINERARY_DAY_END
+    ) -> Dict[str, Any]:
+        """Itinerary of the package's attractions over the trip's days, from the package hotel."""
+        stops = list((package.attractions_data or {}).get('items', []))
+        days = (trip.end_date - trip.start_date).days + 1
+        itinerary = self.plan_stops(stops, self.anchor(package, trip, stops), trip.start_date, days, day_start, day_end)
+        return dict(itinerary, package_id=str(package.id))
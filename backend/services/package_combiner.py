@@ -0,0 +1,108 @@
+"""
+Vectorized top-k search over flight x hotel x car combinations under a budget.
+
+Every category is first pruned to the options that can still appear in a top-k
+bundle; the remaining combinations are then priced and scored in one NumPy
+broadcast instead of a Python loop over the full cross product.
+"""
+
+from functools import reduce
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+# Combinations scored per broadcast block, bounds peak memory for large inputs
+MAX_BLOCK_CELLS = 1 << 22
+
+
+class Combination(NamedTuple):
+    """One bundle: an option index per category (input order), its price and utility."""
+    indices: Tuple[int, ...]
+    total_price: float
+    utility: float
+
+
+def pareto_layers(prices: np.ndarray, utility: np.ndarray, layers: int) -> np.ndarray:
+    """
+    Indices of the options in the first `layers` Pareto layers (cheaper and/or higher utility).
+
+    An option outside them is dominated by at least `layers` others, each of which
+    gives a bundle that is no more expensive and no worse, so it cannot make the top `layers`.
+    """
+    remaining = np.arange(len(prices))
+    kept = []
+    for _ in range(layers):
+        if not remaining.size:
+            break
+        # Cheapest first, highest utility first among equal prices
+        order = remaining[np.lexsort((-utility[remaining], prices[remaining]))]
+        ordered_utility = utility[order]
+        best_cheaper = np.maximum.accumulate(np.concatenate(([-np.inf], ordered_utility[:-1])))
+        front = ordered_utility > best_cheaper
+        kept.append(order[front])
+        remaining = order[~front]
+    return np.sort(np.concatenate(kept)) if kept else remaining
+
+
+def top_k_combinations(
+    prices: Sequence[Sequence[float]],
+    values: Sequence[Sequence[float]],
+    k: int,
+    budget: Optional[float] = None,
+    extra_price: float = 0.0,
+) -> List[Combination]:
+    """
+    Best `k` bundles taking one option from every category.
+
+    `values` are what each option is worth to the traveller, in the same currency as
+    `prices`; a bundle's utility is its summed value minus its total price (including
+    `extra_price`, e.g. fixed attraction tickets). Bundles over `budget` are dropped.
+    Results are ordered by utility, then by price.
+    """
+    price_columns = [np.asarray(p, dtype=np.float64) for p in prices]
+    value_columns = [np.asarray(v, dtype=np.float64) for v in values]
+    if k <= 0 or not price_columns or any(not column.size for column in price_columns):
+        return []
+
+    candidates = [np.arange(column.size) for column in price_columns]
+    if budget is not None:
+        # Drop options that overshoot even when paired with the cheapest of everything else
+        slack = budget - extra_price - sum(column.min() for column in price_columns)
+        if slack < 0:
+            return []
+        candidates = [np.flatnonzero(column - column.min() <= slack) for column in price_columns]
+
+    # An option's share of bundle utility is its value minus its price; prune on (price, that share)
+    candidates = [c[pareto_layers(p[c], v[c] - p[c], k)] for c, p, v in zip(candidates, price_columns, value_columns)]
+    kept_prices = [p[c] for c, p in zip(candidates, price_columns)]
+    kept_values = [v[c] for c, v in zip(candidates, value_columns)]
+
+    # Price / value of every combination of the other categories, flattened in C order
+    rest_prices = reduce(np.add.outer, kept_prices[1:], np.zeros(())).ravel() + extra_price
+    rest_values = reduce(np.add.outer, kept_values[1:], np.zeros(())).ravel()
+    rest_size = rest_prices.size
+    rows_per_block = max(1, MAX_BLOCK_CELLS // rest_size)
+
+    best_index, best_total, best_utility = [], [], []
+    for start in range(0, kept_prices[0].size, rows_per_block):
+        stop = start + rows_per_block
+        totals = (kept_prices[0][start:stop, None] + rest_prices[None, :]).ravel()
+        utility = (kept_values[0][start:stop, None] + rest_values[None, :]).ravel() - totals
+        index = np.flatnonzero(totals <= budget) if budget is not None else np.arange(totals.size)
+        if index.size > k:
+            index = index[np.argpartition(-utility[index], k - 1)[:k]]
+        best_index.append(index + start * rest_size)
+        best_total.append(totals[index])
+        best_utility.append(utility[index])
+
+    index, totals, utility = (np.concatenate(parts) for parts in (best_index, best_total, best_utility))
+    if index.size > k:
+        top = np.argpartition(-utility, k - 1)[:k]
+        index, totals, utility = index[top], totals[top], utility[top]
+    order = np.lexsort((totals, -utility))
+
+    positions = np.unravel_index(index[order], [p.size for p in kept_prices])
+    options = [c[pos] for c, pos in zip(candidates, positions)]
+    return [
+        Combination(tuple(int(column[i]) for column in options), float(totals[j]), float(utility[j]))
+        for i, j in enumerate(order)
+    ]
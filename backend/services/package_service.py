@@ -2,9 +2,10 @@
 Package service for travel package management operations.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 from sqlalchemy.orm import Session
 from uuid import UUID
+import numpy as np
 
 from .base_service import BaseService
 from repositories.package_repository import PackageRepository
@@ -26,6 +27,10 @@ class PackageService(BaseService[Package]):
         """Create a new package."""
         return self.package_repository.create(db, package_create)
     
+    def create_packages(self, db: Session, packages_create: List[PackageCreate]) -> List[Package]:
+        """Create several packages in one transaction."""
+        return self.package_repository.create_many(db, packages_create)
+    
     def get_best_packages(self, db: Session, trip_id: UUID, limit: int = 5) -> List[Package]:
         """Get best packages for a trip ordered by score."""
         return self.package_repository.get_best_packages_for_trip(db, trip_id, limit=limit)
@@ -70,6 +75,35 @@ class PackageService(BaseService[Package]):
         final_score = min(10, (base_score + price_score + completeness_score) / 3)
         return round(final_score, 2)
     
+    def calculate_package_scores(
+        self,
+        total_price: Sequence[float],
+        has_flight: Sequence[bool],
+        has_hotel: Sequence[bool],
+        has_car: Sequence[bool],
+        has_attractions: Sequence[bool]
+    ) -> np.ndarray:
+        """Score many packages at once from column arrays; same results as calculate_package_score."""
+        price = np.asarray(total_price, dtype=np.float64)
+        price_score = np.maximum(0, 10 - (price / 100))
+        completeness_score = (
+            2 * np.asarray(has_flight, dtype=bool).astype(np.int64)
+            + 2 * np.asarray(has_hotel, dtype=bool).astype(np.int64)
+            + np.asarray(has_car, dtype=bool).astype(np.int64)
+            + np.asarray(has_attractions, dtype=bool).astype(np.int64)
+        )
+        # Same operation order as the scalar formula, so the floats match bit for bit
+        final_score = np.minimum(10, (5.0 + price_score + completeness_score) / 3)
+        
+        # np.round works on final_score * 100, which can land on .5 where round() sees the exact
+        # binary value; settle those few near-ties with round() itself
+        scores = np.round(final_score, 2)
+        scaled = final_score * 100
+        near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        for i in near_tie:
+            scores[i] = round(float(final_score[i]), 2)
+        return scores
+    
     def update_package_score(self, db: Session, package_id: UUID) -> Optional[Package]:
         """Recalculate and update package score."""
         package = self.package_repository.get_by_id(db, package_id)
@@ -88,6 +122,16 @@ class PackageService(BaseService[Package]):
         new_score = self.calculate_package_score(package_data)
         return self.package_repository.update_package_score(db, package_id, new_score)
     
+    def rescore_trip_packages(self, db: Session, trip_id: UUID) -> int:
+        """Recalculate scores of all packages of a trip and write them back in one UPDATE."""
+        rows = self.package_repository.get_scoring_rows(db, trip_id)
+        if not rows:
+            return 0
+        
+        ids, prices, has_flight, has_hotel, has_car, has_attractions = zip(*rows)
+        scores = self.calculate_package_scores(prices, has_flight, has_hotel, has_car, has_attractions)
+        return self.package_repository.bulk_update_scores(db, dict(zip(ids, scores.tolist())))
+    
     def get_package_recommendations(self, db: Session, trip_id: UUID, user_preferences: Dict[str, Any] = None) -> List[Package]:
         """Get package recommendations based on user preferences."""
         # This is a dummy implementation - you would implement ML-based recommendations
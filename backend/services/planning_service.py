@@ -0,0 +1,241 @@
+"""
+Planning service: turns NLU slots into persisted travel packages.
+
+Every enabled provider is queried concurrently under its own deadline; whatever
+arrived in time is combined into packages for the trip.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.package import Package, PackageCreate
+from models.trip import Trip, TripCreate
+from providers import AttractionIndex, BaseProvider, ProviderQuery, QuoteCache, get_attraction_index, get_providers, get_quote_cache
+from schemas.plan import PlanSlots, ProviderTiming
+from .package_service import PackageService
+from .package_combiner import top_k_combinations
+
+ATTRACTIONS_PER_PACKAGE = 3
+
+# Worth of offer attributes when ranking bundles by value for money (USD)
+FLIGHT_HOUR_VALUE = 25.0
+FLIGHT_STOP_PENALTY = 60.0
+HOTEL_STAR_NIGHT_VALUE = 20.0
+
+
+class PlanningService:
+    """Service for assembling trip packages from provider offers."""
+    
+    def __init__(self, providers: Optional[List[BaseProvider]] = None, quote_cache: Optional[QuoteCache] = None,
+                 attraction_index: Optional[AttractionIndex] = None):
+        self.providers = providers if providers is not None else get_providers(settings.PLAN_PROVIDERS)
+        self.quote_cache = quote_cache if quote_cache is not None else get_quote_cache()
+        self.attraction_index = attraction_index if attraction_index is not None else get_attraction_index()
+        self.package_service = PackageService()
+    
+    @staticmethod
+    def missing_slots(slots: PlanSlots) -> List[str]:
+        """Slots that must be filled before providers can be queried."""
+        missing = []
+        if not slots.origin:
+            missing.append('origin')
+        if not slots.destination:
+            missing.append('destination')
+        if not slots.dates.start or not slots.dates.end:
+            missing.append('dates')
+        return missing
+    
+    @staticmethod
+    def build_query(slots: PlanSlots) -> ProviderQuery:
+        """Provider query for filled slots (see missing_slots)."""
+        return ProviderQuery(
+            origin_code=slots.origin.upper(),
+            destination_code=slots.destination.upper(),
+            start_date=slots.dates.start,
+            end_date=slots.dates.end,
+            adults=slots.pax.adults or 1,
+            children=slots.pax.children or 0,
+            budget=slots.budget,
+            need_car=bool(slots.car),
+            hotel_amenities=slots.hotel.amenities,
+        )
+    
+    @staticmethod
+    def trip_create(query: ProviderQuery) -> TripCreate:
+        """Draft trip for a plan built without an existing trip."""
+        return TripCreate(
+            origin_code=query.origin_code,
+            origin_name=query.origin_code,
+            destination_code=query.destination_code,
+            destination_name=query.destination_code,
+            start_date=query.start_date,
+            end_date=query.end_date,
+            adults=query.adults,
+            budget=query.budget,
+        )
+    
+    async def call_provider(self, provider: BaseProvider, query: ProviderQuery) -> Tuple[List[Dict[str, Any]], ProviderTiming]:
+        """Run one provider under its deadline. Never raises."""
+        timeout_ms = provider.timeout_ms or settings.PLAN_PROVIDER_TIMEOUT_MS
+        started = time.perf_counter()
+        offers: List[Dict[str, Any]] = []
+        error = None
+        cache = None
+        try:
+            if self.quote_cache is not None:
+                cache = 'miss'
+                offers, cache = await asyncio.wait_for(self.quote_cache.search(provider, query), timeout_ms / 1000)
+            else:
+                offers = await asyncio.wait_for(provider.search(query), timeout_ms / 1000)
+            status = 'ok'
+        except asyncio.TimeoutError:
+            status = 'timeout'
+        except Exception as e:
+            status, error = 'error', repr(e)
+        
+        timing = ProviderTiming(
+            provider=provider.name,
+            kind=provider.kind,
+            status=status,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            offers=len(offers),
+            error=error,
+            cache=cache,
+        )
+        return offers, timing
+    
+    async def gather_offers(self, query: ProviderQuery) -> Tuple[Dict[str, List[Dict[str, Any]]], List[ProviderTiming]]:
+        """Fan out to all providers at once; slow or failing ones contribute nothing."""
+        calls = []
+        timings: List[ProviderTiming] = []
+        # Indexed cities take their attractions from the attraction index instead (see assemble_packages)
+        indexed = query.destination_code in self.attraction_index
+        for provider in self.providers:
+            if (provider.kind == 'car' and not query.need_car) or (provider.kind == 'attraction' and indexed):
+                timings.append(ProviderTiming(provider=provider.name, kind=provider.kind, status='skipped', latency_ms=0.0))
+                continue
+            calls.append(self.call_provider(provider, query))
+        
+        offers_by_kind: Dict[str, List[Dict[str, Any]]] = {'flight': [], 'hotel': [], 'car': [], 'attraction': []}
+        for (offers, timing) in await asyncio.gather(*calls):
+            offers_by_kind.setdefault(timing.kind, []).extend(offers)
+            timings.append(timing)
+        return offers_by_kind, timings
+    
+    @staticmethod
+    def offer_value(kind: str, offer: Dict[str, Any]) -> float:
+        """What an offer is worth to the traveller beyond its price, in the same currency."""
+        if kind == 'flight':
+            hours = offer.get('duration_minutes', 0) / 60
+            return -(hours * FLIGHT_HOUR_VALUE + offer.get('stops', 0) * FLIGHT_STOP_PENALTY)
+        if kind == 'hotel':
+            return offer.get('stars', 0) * HOTEL_STAR_NIGHT_VALUE * offer.get('nights', 1) * offer.get('rooms', 1)
+        return 0.0
+    
+    def nearby_attractions(self, query: ProviderQuery, hotel: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Indexed attractions nearest the hotel (the city centre for hotels without a position), priced for the party."""
+        if hotel is not None and hotel.get('latitude') is not None and hotel.get('longitude') is not None:
+            latitude, longitude = hotel['latitude'], hotel['longitude']
+        else:
+            latitude, longitude = self.attraction_index.city_center(query.destination_code)
+        travellers = query.adults + query.children
+        return [
+            dict(
+                item,
+                provider='attraction_index',
+                price=round(item['price'] * travellers, 2),
+                description=item['name'],
+                deeplink=f"https://www.example.com/attractions/{query.destination_code}?attraction={item['id']}",
+            )
+            for item in self.attraction_index.nearest(query.destination_code, latitude, longitude, ATTRACTIONS_PER_PACKAGE)
+        ]
+    
+    def assemble_packages(self, trip: Trip, query: ProviderQuery, offers_by_kind: Dict[str, List[Dict[str, Any]]],
+                          max_packages: int) -> List[PackageCreate]:
+        """Pick the best-value flight/hotel/car bundles, preferring ones within budget."""
+        hotels = offers_by_kind.get('hotel', [])
+        if query.hotel_amenities:
+            matching = [h for h in hotels if set(query.hotel_amenities) <= set(h.get('amenities', []))]
+            hotels = matching or hotels
+        categories = [('flight', offers_by_kind.get('flight', [])), ('hotel', hotels)]
+        if query.need_car:
+            categories.append(('car', offers_by_kind.get('car', [])))
+        # Providers that timed out or failed leave their category out of the bundle
+        categories = [(kind, offers) for kind, offers in categories if offers]
+        if not categories:
+            return []
+        
+        # Indexed cities get the attractions nearest each hotel, their tickets counted with that hotel;
+        # elsewhere every package gets the cheapest provider attractions
+        near_hotel: Optional[List[List[Dict[str, Any]]]] = None
+        if query.destination_code in self.attraction_index:
+            attractions = self.nearby_attractions(query, None)
+            if hotels:
+                near_hotel = [self.nearby_attractions(query, h) for h in hotels]
+        else:
+            attractions = sorted(offers_by_kind.get('attraction', []), key=lambda o: o['price'])[:ATTRACTIONS_PER_PACKAGE]
+        extras = 0.0 if near_hotel is not None else sum(a['price'] for a in attractions)
+        prices = [
+            [o['price'] + (sum(a['price'] for a in near_hotel[i]) if kind == 'hotel' and near_hotel is not None else 0.0)
+             for i, o in enumerate(offers)]
+            for kind, offers in categories
+        ]
+        values = [[self.offer_value(kind, o) for o in offers] for kind, offers in categories]
+        
+        over_budget = False
+        combinations = top_k_combinations(prices, values, max_packages, budget=query.budget, extra_price=extras)
+        if not combinations and query.budget is not None:
+            # Nothing fits: offer the cheapest bundles instead
+            combinations = top_k_combinations(prices, [[0.0] * len(p) for p in prices], max_packages, extra_price=extras)
+            over_budget = True
+        
+        packages = []
+        for combination in combinations:
+            picks = {kind: i for (kind, _), i in zip(categories, combination.indices)}
+            chosen = {kind: offers[picks[kind]] for kind, offers in categories}
+            flight, hotel, car = chosen.get('flight'), chosen.get('hotel'), chosen.get('car')
+            package_attractions = near_hotel[picks['hotel']] if near_hotel is not None and 'hotel' in picks else attractions
+            package_data = {
+                'total_price': round(combination.total_price, 2),
+                'flight_data': flight,
+                'hotel_data': hotel,
+                'car_data': car,
+                'attractions_data': {'items': package_attractions} if package_attractions else None,
+            }
+            packages.append(PackageCreate(
+                trip_id=trip.id,
+                score=self.package_service.calculate_package_score(package_data),
+                explanation=self._explain(flight, hotel, car, over_budget),
+                deeplinks={
+                    'flight': flight['deeplink'] if flight else None,
+                    'hotel': hotel['deeplink'] if hotel else None,
+                    'car': car['deeplink'] if car else None,
+                    'attractions': [a['deeplink'] for a in package_attractions],
+                },
+                **package_data,
+            ))
+        return packages
+    
+    @staticmethod
+    def _explain(flight: Optional[Dict[str, Any]], hotel: Optional[Dict[str, Any]],
+                 car: Optional[Dict[str, Any]], over_budget: bool) -> str:
+        parts = [o['description'] for o in (flight, hotel, car) if o]
+        explanation = '; '.join(parts)
+        if over_budget:
+            explanation += ' (over budget: cheapest available combination)'
+        return explanation
+    
+    async def build_plan(self, db: Session, trip: Trip, query: ProviderQuery,
+                         max_packages: Optional[int] = None) -> Tuple[List[Package], List[ProviderTiming]]:
+        """Query providers, persist the assembled packages and return them with provider timings."""
+        offers_by_kind, timings = await self.gather_offers(query)
+        packages_create = self.assemble_packages(trip, query, offers_by_kind, max_packages or settings.PLAN_MAX_PACKAGES)
+        if not packages_create:
+            return [], timings
+        
+        # The session is synchronous; keep the event loop free while it commits
+        packages = await asyncio.to_thread(self.package_service.create_packages, db, packages_create)
+        return packages, timings
@@ -0,0 +1,182 @@
+"""
+Flexible-date price matrix: cheapest flight + hotel total for every start x end date pair around a trip.
+
+Instead of one package build per cell, quotes are fetched once per leg: a one-way outbound flight
+per start date, a one-way return per end date and a one-night hotel stay per night of the window,
+all concurrently through the provider layer (and its quote cache). Cells are then reduced with
+NumPy: flight legs add as an outer sum, and each hotel's stay cost comes from prefix sums of its
+nightly prices, minimized over hotels.
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+
+from models.trip import Trip
+from providers import BaseProvider, ProviderQuery
+from .planning_service import PlanningService
+
+
+class PriceMatrixService:
+    """Service for flexible-date price grids of a trip."""
+    
+    def __init__(self, planning_service: Optional[PlanningService] = None):
+        self.planning_service = planning_service if planning_service is not None else PlanningService()
+    
+    @staticmethod
+    def date_window(center: date, flex_days: int) -> List[date]:
+        """Dates from `flex_days` before to `flex_days` after `center`."""
+        return [center + timedelta(days=offset) for offset in range(-flex_days, flex_days + 1)]
+    
+    async def _quote(self, providers: List[BaseProvider], query: ProviderQuery) -> Tuple[List[Dict[str, Any]], int]:
+        """Offers from every provider of one kind for one leg, plus how many providers failed."""
+        results = await asyncio.gather(*(self.planning_service.call_provider(p, query) for p in providers))
+        offers = [offer for provider_offers, _ in results for offer in provider_offers]
+        failed = sum(1 for _, timing in results if timing.status != 'ok')
+        return offers, failed
+    
+    async def stream_matrix(self, trip: Trip, flex_days: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a "meta" item, then one "row" per start date as soon as all of its quotes are in,
+        then a "summary" item. Prices are party totals; None marks impossible or unquoted cells.
+        
+        A row needs the hotel nights from its start date to the last end date, so later start
+        dates usually complete first and rows arrive out of order; place them by start_date.
+        Leg quotes still running when the consumer stops iterating are cancelled.
+        """
+        started = time.perf_counter()
+        start_dates = self.date_window(trip.start_date, flex_days)
+        end_dates = self.date_window(trip.end_date, flex_days)
+        first_night = start_dates[0]
+        nights = [first_night + timedelta(days=i) for i in range((end_dates[-1] - first_night).days)]
+        
+        providers = self.planning_service.providers
+        flight_providers = [p for p in providers if p.kind == 'flight']
+        hotel_providers = [p for p in providers if p.kind == 'hotel']
+        
+        def query(origin: str, destination: str, start: date, end: date, one_way: bool) -> ProviderQuery:
+            return ProviderQuery(
+                origin_code=origin, destination_code=destination, start_date=start, end_date=end,
+                adults=trip.adults, budget=trip.budget, one_way=one_way,
+            )
+        
+        yield {
+            'type': 'meta',
+            'trip_id': str(trip.id),
+            'start_dates': [str(d) for d in start_dates],
+            'end_dates': [str(d) for d in end_dates],
+            'leg_queries': (len(start_dates) + len(end_dates) if flight_providers else 0) + (len(nights) if hotel_providers else 0),
+            'cells': len(start_dates) * len(end_dates),
+        }
+        
+        # One task per leg: outbound by start date, return by end date, hotel by night
+        # (created after the meta item, with no yield before the try that cancels them)
+        tasks: Dict[asyncio.Task, Tuple[str, int]] = {}
+        if flight_providers:
+            for i, day in enumerate(start_dates):
+                leg = query(trip.origin_code, trip.destination_code, day, day, True)
+                tasks[asyncio.ensure_future(self._quote(flight_providers, leg))] = ('outbound', i)
+            for i, day in enumerate(end_dates):
+                leg = query(trip.destination_code, trip.origin_code, day, day, True)
+                tasks[asyncio.ensure_future(self._quote(flight_providers, leg))] = ('return', i)
+        if hotel_providers:
+            for i, night in enumerate(nights):
+                stay = query(trip.origin_code, trip.destination_code, night, night + timedelta(days=1), False)
+                tasks[asyncio.ensure_future(self._quote(hotel_providers, stay))] = ('night', i)
+        
+        # Without providers of a kind, that part of the price is simply left out
+        outbound = np.full(len(start_dates), np.inf if flight_providers else 0.0)
+        inbound = np.full(len(end_dates), np.inf if flight_providers else 0.0)
+        nightly: Dict[str, np.ndarray] = {}   # hotel id -> price per night, inf when not offered
+        done = {'outbound': set(), 'return': set(), 'night': set()}
+        failed = 0
+        
+        # Index of every end date / its checkout night relative to the first night
+        end_offsets = np.array([(d - first_night).days for d in end_dates])
+        rows: Dict[int, np.ndarray] = {}
+        
+        def row_ready(s: int) -> bool:
+            start_offset = (start_dates[s] - first_night).days
+            return (
+                (not flight_providers or (s in done['outbound'] and len(done['return']) == len(end_dates)))
+                and (not hotel_providers or all(n in done['night'] for n in range(start_offset, len(nights))))
+            )
+        
+        def compute_row(s: int) -> np.ndarray:
+            start_offset = (start_dates[s] - first_night).days
+            stay_possible = end_offsets > start_offset
+            if hotel_providers:
+                if nightly:
+                    prices = np.vstack(list(nightly.values()))
+                    missing = ~np.isfinite(prices)
+                    cumulative = np.hstack([np.zeros((len(prices), 1)), np.cumsum(np.where(missing, 0.0, prices), axis=1)])
+                    gaps = np.hstack([np.zeros((len(prices), 1), dtype=int), np.cumsum(missing, axis=1)])
+                    # Stay cost of every hotel for every end date, in one broadcast; a gap night rules it out
+                    last = np.clip(end_offsets, start_offset, len(nights))
+                    stay = cumulative[:, last] - cumulative[:, [start_offset]]
+                    stay[gaps[:, last] - gaps[:, [start_offset]] > 0] = np.inf
+                    hotel = stay.min(axis=0)
+                else:
+                    hotel = np.full(len(end_dates), np.inf)
+            else:
+                hotel = np.zeros(len(end_dates))
+            total = outbound[s] + inbound + hotel
+            return np.where(stay_possible, total, np.inf)
+        
+        pending = set(tasks)
+        try:
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    kind, i = tasks[task]
+                    offers, leg_failed = task.result()
+                    failed += leg_failed
+                    if kind == 'outbound' and offers:
+                        outbound[i] = min(o['price'] for o in offers)
+                    elif kind == 'return' and offers:
+                        inbound[i] = min(o['price'] for o in offers)
+                    elif kind == 'night':
+                        for offer in offers:
+                            hotel_id = f"{offer['provider']}:{offer['id']}"
+                            column = nightly.setdefault(hotel_id, np.full(len(nights), np.inf))
+                            column[i] = min(column[i], offer['price'])
+                    done[kind].add(i)
+                
+                for s in range(len(start_dates)):
+                    if s not in rows and row_ready(s):
+                        rows[s] = compute_row(s)
+                        yield self._row_item(start_dates[s], rows[s], started)
+        finally:
+            # A client that disconnects mid-stream would leave the remaining legs querying providers
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        # Rows left over only when there were no leg tasks at all
+        for s in range(len(start_dates)):
+            if s not in rows:
+                rows[s] = compute_row(s)
+                yield self._row_item(start_dates[s], rows[s], started)
+        
+        matrix = np.vstack([rows[s] for s in range(len(start_dates))])
+        cheapest = None
+        if np.isfinite(matrix).any():
+            s, e = np.unravel_index(np.argmin(matrix), matrix.shape)
+            cheapest = {'start_date': str(start_dates[s]), 'end_date': str(end_dates[e]), 'price': round(float(matrix[s, e]), 2)}
+        yield {
+            'type': 'summary',
+            'cheapest': cheapest,
+            'failed_quotes': failed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+    
+    @staticmethod
+    def _row_item(start_date: date, row: np.ndarray, started: float) -> Dict[str, Any]:
+        return {
+            'type': 'row',
+            'start_date': str(start_date),
+            'prices': [round(float(p), 2) if np.isfinite(p) else None for p in row],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
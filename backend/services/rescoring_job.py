@@ -0,0 +1,159 @@
+"""
+Background job that re-scores every package after a scoring-formula change.
+
+Packages are streamed in keyset-paginated chunks (ordered by id, scoring columns only),
+scored in one vectorized batch per chunk and written back with one bulk UPDATE per chunk.
+Progress is checkpointed after every chunk so an interrupted run resumes where it stopped.
+
+Run from backend/:
+    python -m services.rescoring_job [--chunk-size 5000] [--restart]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from core.config import settings
+from repositories.package_component_repository import register_listeners
+from .package_service import PackageService
+
+
+class RescoringJob:
+    """Resumable bulk re-scoring of all packages."""
+    
+    # One run per process at a time; a second start is refused rather than queued
+    _lock = threading.Lock()
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        chunk_size: int = settings.RESCORE_CHUNK_SIZE,
+        checkpoint_path: str = settings.RESCORE_CHECKPOINT_PATH
+    ):
+        if session_factory is None:
+            from core.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.package_service = PackageService()
+    
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._lock.locked()
+    
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Get the saved progress of the last run, if any."""
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        # Write-then-rename so a crash never leaves a truncated checkpoint behind
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def status(self) -> Dict[str, Any]:
+        """Get the checkpoint plus whether a run is in progress."""
+        checkpoint = self.load_checkpoint() or {}
+        return dict(checkpoint, running=self.is_running())
+    
+    def run(self, restart: bool = False, max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Re-score packages from the checkpoint (or from the start when `restart` is set,
+        or the last run finished). Stops early after `max_chunks` chunks if given.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A re-scoring run is already in progress")
+        try:
+            return self._run(restart, max_chunks)
+        finally:
+            self._lock.release()
+    
+    def _run(self, restart: bool, max_chunks: Optional[int]) -> Dict[str, Any]:
+        checkpoint = None if restart else self.load_checkpoint()
+        if checkpoint is None or checkpoint.get('done'):
+            checkpoint = {
+                'started_at': datetime.utcnow().isoformat(),
+                'last_id': None,
+                'processed': 0,
+                'updated': 0,
+                'chunks': 0,
+                'elapsed_s': 0.0,
+                'done': False,
+            }
+        
+        repository = self.package_service.package_repository
+        last_id = UUID(checkpoint['last_id']) if checkpoint['last_id'] else None
+        run_started = time.perf_counter()
+        run_processed = 0
+        db = self.session_factory()
+        try:
+            chunks = 0
+            while max_chunks is None or chunks < max_chunks:
+                chunk_started = time.perf_counter()
+                rows = repository.get_scoring_chunk(db, last_id, self.chunk_size)
+                if not rows:
+                    checkpoint['done'] = True
+                    break
+                
+                ids, prices, has_flight, has_hotel, has_car, has_attractions = zip(*rows)
+                scores = self.package_service.calculate_package_scores(prices, has_flight, has_hotel, has_car, has_attractions)
+                updated = repository.bulk_update_scores(db, dict(zip(ids, scores.tolist())))
+                
+                last_id = ids[-1]
+                chunks += 1
+                run_processed += len(rows)
+                checkpoint.update(
+                    last_id=str(last_id),
+                    processed=checkpoint['processed'] + len(rows),
+                    updated=checkpoint['updated'] + updated,
+                    chunks=checkpoint['chunks'] + 1,
+                    elapsed_s=round(checkpoint['elapsed_s'] + time.perf_counter() - chunk_started, 3),
+                )
+                checkpoint['rows_per_sec'] = round(checkpoint['processed'] / checkpoint['elapsed_s'], 1) if checkpoint['elapsed_s'] else None
+                self._save_checkpoint(checkpoint)
+                
+                if len(rows) < self.chunk_size:
+                    checkpoint['done'] = True
+                    break
+        finally:
+            db.close()
+        
+        run_elapsed = time.perf_counter() - run_started
+        checkpoint['finished_at'] = datetime.utcnow().isoformat() if checkpoint['done'] else None
+        checkpoint['run'] = {
+            'processed': run_processed,
+            'elapsed_s': round(run_elapsed, 3),
+            'rows_per_sec': round(run_processed / run_elapsed, 1) if run_elapsed else None,
+        }
+        self._save_checkpoint(checkpoint)
+        return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score all packages with the current scoring formula")
+    parser.add_argument("--chunk-size", type=int, default=settings.RESCORE_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", default=settings.RESCORE_CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the first package")
+    parser.add_argument("--max-chunks", type=int, default=None, help="stop after this many chunks (resume later)")
+    args = parser.parse_args()
+
+    register_listeners()
+    job = RescoringJob(chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+    print(json.dumps(job.run(restart=args.restart, max_chunks=args.max_chunks), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from providers.attraction_index import AttractionIndex, haversine_km
+
+# (city, centre); one far north, where longitude degrees are short
+CITIES = [("DOH", (25.29, 51.53)), ("CDG", (48.86, 2.35)), ("KEF", (64.13, -21.9))]
+
+
+def make_attractions(seed, per_city=400):
+    rng = np.random.default_rng(seed)
+    attractions = []
+    for city, (latitude, longitude) in CITIES:
+        spread = 0.15 / np.cos(np.radians(latitude))
+        for i in range(per_city):
+            attractions.append({
+                "provider_id": f"{city}-{i}",
+                "destination_code": city.lower() if i % 2 else city,
+                "name": f"{city} attraction {i}",
+                "latitude": float(latitude + rng.normal(0, 0.12)),
+                "longitude": float(longitude + rng.normal(0, spread)),
+                "price": float(rng.choice([0, 12.5, 30])),
+                "duration_minutes": 60,
+                "opens": "09:00",
+                "closes": "17:30",
+            })
+    attractions.append({"provider_id": "nowhere", "destination_code": "DOH", "name": "No position",
+                        "latitude": None, "longitude": None})
+    return attractions
+
+
+def brute_force(attractions, city, latitude, longitude, max_km):
+    located = [a for a in attractions if a["destination_code"].upper() == city and a["latitude"] is not None]
+    distances = haversine_km(latitude, longitude, np.array([a["latitude"] for a in located]),
+                             np.array([a["longitude"] for a in located]))
+    order = np.argsort(distances, kind="stable")
+    return [(located[i]["provider_id"], float(distances[i])) for i in order if distances[i] <= max_km]
+
+
+def query_points(rng, count=40):
+    for _ in range(count):
+        city, (latitude, longitude) = CITIES[rng.integers(len(CITIES))]
+        yield city, latitude + rng.normal(0, 0.2), longitude + rng.normal(0, 0.3)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+def test_nearest_matches_brute_force(seed, k):
+    attractions = make_attractions(seed)
+    index = AttractionIndex.build(attractions)
+    for city, latitude, longitude in query_points(np.random.default_rng(seed + 100)):
+        found = index.nearest(city, latitude, longitude, k, max_radius_km=40)
+        expected = brute_force(attractions, city, latitude, longitude, 40)[:k]
+        assert [a["id"] for a in found] == [i for i, _ in expected]
+        assert [a["distance_km"] for a in found] == pytest.approx([d for _, d in expected], abs=1e-3)
+
+
+@pytest.mark.parametrize("radius_km", [0.5, 3, 12])
+def test_within_matches_brute_force(radius_km):
+    attractions = make_attractions(5)
+    index = AttractionIndex.build(attractions)
+    for city, latitude, longitude in query_points(np.random.default_rng(6)):
+        found = index.within(city, latitude, longitude, radius_km)
+        assert [a["id"] for a in found] == [i for i, _ in brute_force(attractions, city, latitude, longitude, radius_km)]
+
+
+def test_max_radius_caps_nearest():
+    attractions = make_attractions(1)
+    index = AttractionIndex.build(attractions)
+    far = index.nearest("DOH", 26.5, 51.53, 5, max_radius_km=10)
+    assert far == [] == brute_force(attractions, "DOH", 26.5, 51.53, 10)
+
+
+def test_saved_index_maps_to_the_same_results(tmp_path):
+    attractions = make_attractions(2)
+    index = AttractionIndex.build(attractions)
+    path = str(tmp_path / "attractions.idx.npy")
+    index.save(path)
+    loaded = AttractionIndex.load(path)
+    assert isinstance(loaded.records, np.memmap)
+    assert sorted(loaded.cities) == sorted(city for city, _ in CITIES)
+    assert len(loaded) == len(attractions) - 1
+    for city, latitude, longitude in query_points(np.random.default_rng(3), 10):
+        assert loaded.nearest(city, latitude, longitude, 5) == index.nearest(city, latitude, longitude, 5)
+
+
+def test_unknown_city():
+    index = AttractionIndex.build(make_attractions(0, per_city=5))
+    assert "XXX" not in index and "doh" in index
+    assert index.nearest("XXX", 0, 0, 3) == []
+    assert index.city_center("XXX") is None
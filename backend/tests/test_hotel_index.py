@@ -0,0 +1,128 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from providers.hotel_index import HotelIndex
+
+AMENITIES = ["breakfast", "pool", "wifi", "gym", "spa"]
+DESTINATIONS = ["DOH", "LHR", "CDG"]
+
+
+def make_hotels(rng, ids):
+    # Distinct prices, so every index returns ties in the same order
+    prices = rng.permutation(len(ids) * 10)[:len(ids)] * 0.37 + 40
+    return [
+        {
+            "hotel_id": hotel_id,
+            "destination_code": str(rng.choice(DESTINATIONS)),
+            "name": f"Hotel {hotel_id}",
+            "stars": int(rng.integers(2, 6)),
+            "nightly_price": round(float(price), 2),
+            "amenities": [a for a in AMENITIES if rng.random() < 0.5],
+        }
+        for hotel_id, price in zip(ids, prices)
+    ]
+
+
+def changed_feed(rng, hotels):
+    """The feed a while later: some hotels gone, some repriced, moved or re-equipped, some new."""
+    feed = []
+    for hotel in hotels:
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        if roll < 0.45:
+            hotel = dict(hotel, nightly_price=round(hotel["nightly_price"] + 0.001 * len(feed) + 3.5, 3))
+        elif roll < 0.55:
+            hotel = dict(hotel, destination_code=str(rng.choice(DESTINATIONS)), amenities=list(reversed(AMENITIES[:2])))
+        feed.append(hotel)
+    # Off the 0.37 grid of the existing prices, so no new hotel ties with an old one
+    return feed + [dict(h, nightly_price=h["nightly_price"] + 0.004) for h in make_hotels(rng, [f"N{i:04d}" for i in range(60)])]
+
+
+def queries():
+    for destination in DESTINATIONS:
+        for size in range(3):
+            for amenities in itertools.combinations(AMENITIES, size):
+                for max_price in (None, 120.0):
+                    for min_stars in (0, 4):
+                        yield destination, list(amenities), max_price, min_stars
+
+
+def results(index, destination, amenities, max_price, min_stars):
+    found = index.search(destination, amenities, max_price=max_price, min_stars=min_stars, limit=15)
+    return [(h["hotel_id"], h["nightly_price"], h["destination_code"]) for h in found]
+
+
+def naive(hotels, destination, amenities, max_price, min_stars):
+    found = sorted(
+        (h for h in hotels
+         if h["destination_code"] == destination and set(amenities) <= set(h["amenities"])
+         and (max_price is None or h["nightly_price"] <= max_price) and h["stars"] >= min_stars),
+        key=lambda h: h["nightly_price"],
+    )
+    return [(h["hotel_id"], h["nightly_price"], h["destination_code"]) for h in found[:15]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_feed_matches_full_rebuild(seed):
+    rng = np.random.default_rng(seed)
+    first = make_hotels(rng, [f"H{i:04d}" for i in range(300)])
+    second = changed_feed(rng, first)
+
+    incremental = HotelIndex()
+    incremental.apply_feed(first)
+    incremental.apply_feed(second)
+    rebuilt = HotelIndex()
+    rebuilt.apply_feed(second)
+
+    assert len(incremental) == len(rebuilt) == len(second)
+    for query in queries():
+        assert results(incremental, *query) == results(rebuilt, *query) == naive(second, *query), query
+
+
+def test_apply_upserts_and_removals_match_full_rebuild():
+    rng = np.random.default_rng(11)
+    hotels = make_hotels(rng, [f"H{i:04d}" for i in range(200)])
+    index = HotelIndex()
+    index.apply(hotels)
+    updated = [dict(h, nightly_price=h["nightly_price"] + 100.25) for h in hotels[:40]]
+    removed = [h["hotel_id"] for h in hotels[40:70]]
+    index.apply(updated, removed)
+
+    expected = updated + hotels[70:]
+    rebuilt = HotelIndex()
+    rebuilt.apply(expected)
+    for query in queries():
+        assert results(index, *query) == results(rebuilt, *query) == naive(expected, *query), query
+
+
+def test_unchanged_feed_rebuilds_nothing():
+    hotels = make_hotels(np.random.default_rng(2), [f"H{i:04d}" for i in range(100)])
+    index = HotelIndex()
+    index.apply_feed(hotels)
+    rebuilds = index.segment_rebuilds
+    assert index.apply_feed([dict(h) for h in hotels]) == {"upserted": 0, "removed": 0, "destinations": 0}
+    assert index.segment_rebuilds == rebuilds
+
+
+def test_segments_in_use_are_not_modified_by_updates():
+    hotels = make_hotels(np.random.default_rng(4), [f"H{i:04d}" for i in range(100)])
+    index = HotelIndex()
+    index.apply(hotels)
+    segment = index.segments["DOH"]
+    before = [(r["hotel_id"], r["nightly_price"]) for r in segment.records]
+
+    doh = [h for h in hotels if h["destination_code"] == "DOH"]
+    index.apply([dict(h, nightly_price=1.0) for h in doh[:5]], [h["hotel_id"] for h in doh[5:]])
+
+    assert [(r["hotel_id"], r["nightly_price"]) for r in segment.records] == before
+    assert [r["nightly_price"] for r in index.search("DOH", limit=50)] == [1.0] * 5
+
+
+def test_unknown_amenity_or_destination():
+    index = HotelIndex()
+    index.apply(make_hotels(np.random.default_rng(0), ["H1", "H2"]))
+    assert index.search("DOH", ["helipad"]) == []
+    assert index.search("XXX") == []
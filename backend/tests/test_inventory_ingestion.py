@@ -0,0 +1,94 @@
+"""
+Set TEST_POSTGRES_URL (e.g. postgresql://postgres@localhost/test) to also run the COPY upsert
+against Postgres and compare it with the SQLite path; the tables there are dropped and recreated.
+"""
+
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from models.inventory import AttractionInventory, HotelInventory, HotelInventoryBase
+from services.inventory_ingestion import InventoryIngestion
+
+TABLES = [HotelInventory.__table__, AttractionInventory.__table__]
+COMPARED = ["provider", "provider_id", "destination_code", "name", "stars", "nightly_price", "currency",
+            "amenities", "latitude", "longitude"]
+
+
+def hotel(i, **fields):
+    return dict({
+        "provider_id": f"H{i:03d}", "destination_code": "doh", "name": f"Hotel {i}", "stars": 1 + i % 5,
+        "nightly_price": 40.5 + i, "amenities": ["pool", "wifi"][:i % 3], "latitude": 25.2 + i / 1000, "longitude": 51.5,
+    }, **fields)
+
+
+# Values the CSV encoding of COPY could get wrong
+TRICKY = [
+    hotel(1, name=""),
+    hotel(2, name="Quote \" comma , semicolon ;"),
+    hotel(3, name="Line\nbreak\r\nand tab\t"),
+    hotel(4, name="\\N"),
+    hotel(5, name="Back\\slash \\\\ and \"\""),
+    hotel(6, name="Ünïcødé ホテル"),
+    hotel(7, currency="", latitude=None, longitude=None, stars=None),
+    hotel(8, amenities=['say "hi"', "a,b", "back\\slash"]),
+    hotel(9, nightly_price=0.1 + 0.2),
+]
+
+
+def write_feed(tmp_path, name, records):
+    path = tmp_path / name
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def ingest_twice(url, tmp_path):
+    """Insert the feed, then upsert a changed version of it; returns the table contents by key."""
+    engine = create_engine(url)
+    for table in reversed(TABLES):
+        table.drop(engine, checkfirst=True)
+    for table in TABLES:
+        table.create(engine)
+    ingestion = InventoryIngestion(session_factory=sessionmaker(bind=engine, autoflush=False), batch_size=4)
+
+    first = TRICKY + [hotel(i) for i in range(10, 30)]
+    second = [dict(r, name=r["name"] + " (renovated)", nightly_price=r["nightly_price"] * 2) for r in first[::2]]
+    second += [hotel(i) for i in range(30, 35)]
+    reports = [
+        ingestion.run("hotels", write_feed(tmp_path, "first.jsonl", first), provider="acme"),
+        ingestion.run("hotels", write_feed(tmp_path, "second.jsonl", second), provider="acme"),
+    ]
+    with engine.connect() as connection:
+        columns = [HotelInventory.__table__.c[name] for name in COMPARED]
+        rows = {row.provider_id: dict(row._mapping) for row in connection.execute(select(*columns))}
+    engine.dispose()
+    return reports, rows
+
+
+def test_validate_counts_non_objects_as_invalid_when_provider_is_set():
+    valid, invalid = InventoryIngestion.validate(HotelInventoryBase, [hotel(1), ["not", "an", "object"], 7], "acme", 10)
+    assert [v["provider"] for v in valid] == ["acme"]
+    assert [i["record"] for i in invalid] == [11, 12]
+
+
+def test_sqlite_upsert_keeps_values(tmp_path):
+    reports, rows = ingest_twice(f"sqlite:///{tmp_path / 'inventory.db'}", tmp_path)
+    assert [r["upserted"] for r in reports] == [29, 20]
+    assert len(rows) == 34
+    assert rows["H001"]["name"] == " (renovated)"
+    assert rows["H002"]["name"] == "Quote \" comma , semicolon ;"
+    assert rows["H004"]["name"] == "\\N"
+    assert rows["H003"]["name"] == "Line\nbreak\r\nand tab\t (renovated)"
+    assert rows["H007"]["currency"] == "" and rows["H007"]["latitude"] is None and rows["H007"]["stars"] is None
+    assert rows["H008"]["amenities"] == ['say "hi"', "a,b", "back\\slash"]
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+def test_postgres_copy_upsert_matches_sqlite(tmp_path):
+    sqlite_reports, expected = ingest_twice(f"sqlite:///{tmp_path / 'inventory.db'}", tmp_path)
+    postgres_reports, rows = ingest_twice(os.environ["TEST_POSTGRES_URL"], tmp_path)
+    assert [r["upserted"] for r in postgres_reports] == [r["upserted"] for r in sqlite_reports]
+    assert rows == expected
@@ -0,0 +1,83 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from providers.attraction_index import AttractionIndex
+from services.itinerary_service import ItineraryService, distance_matrix, parse_hhmm
+from core.config import settings
+
+CENTER = (48.8566, 2.3522)
+
+
+def make_stops(rng, count):
+    opens = rng.choice([0, 8, 9, 10, 11, 14], count)
+    closes = np.minimum(opens + rng.integers(3, 10, count), 23)
+    return [
+        {
+            'id': f"a{i}",
+            'latitude': float(CENTER[0] + rng.normal(0, 0.05)),
+            'longitude': float(CENTER[1] + rng.normal(0, 0.08)),
+            'opens': None if opens[i] == 0 else f"{opens[i]:02d}:00",
+            'closes': None if opens[i] == 0 else f"{closes[i]:02d}:00",
+            'duration_minutes': int(rng.choice([15, 30, 60, 90, 120])),
+        }
+        for i in range(count)
+    ]
+
+
+def replay(itinerary, anchor, day_start, day_end):
+    """Re-simulate every day from the hotel and check each visit and the way back against the rules."""
+    speed = 60.0 / settings.ITINERARY_SPEED_KMH
+    for day in itinerary['days']:
+        now, position = parse_hhmm(day_start, 0), anchor
+        for stop in day['stops']:
+            travel = distance_matrix([position[0], stop['latitude']], [position[1], stop['longitude']])[0, 1] * speed
+            start = max(now + travel, parse_hhmm(stop['opens'], 0))
+            now = start + stop['duration_minutes']
+            assert abs(parse_hhmm(stop['start'], 0) - start) <= 1
+            assert start >= parse_hhmm(stop['opens'], 0) - 1
+            assert now <= parse_hhmm(stop['closes'], 24 * 60) + 1e-6
+            position = (stop['latitude'], stop['longitude'])
+        back = now + distance_matrix([position[0], anchor[0]], [position[1], anchor[1]])[0, 1] * speed
+        assert back <= parse_hhmm(day_end, 24 * 60) + 1e-6
+        assert abs(parse_hhmm(day['back_at_hotel'], 0) - back) <= 1
+
+
+@pytest.fixture
+def service():
+    return ItineraryService(attraction_index=AttractionIndex.build([]))
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("window", [("09:00", "21:00"), ("10:00", "13:00"), ("08:00", "23:59")])
+def test_days_keep_opening_hours_and_end_at_the_hotel(service, seed, window):
+    rng = np.random.default_rng(seed)
+    stops = make_stops(rng, 40)
+    itinerary = service.plan_stops(stops, CENTER, date(2026, 12, 1), 3, *window, budget_ms=1000)
+    replay(itinerary, CENTER, *window)
+    placed = [s['id'] for day in itinerary['days'] for s in day['stops']] + [s['id'] for s in itinerary['unscheduled']]
+    assert sorted(placed) == sorted(s['id'] for s in stops)
+    assert itinerary['distance_km'] <= itinerary['nearest_neighbour_km'] + 1e-2  # each rounded to 3 decimals
+
+
+def test_stop_too_far_to_return_from_is_unscheduled(service):
+    far = {'id': 'far', 'latitude': CENTER[0] + 1.0, 'longitude': CENTER[1], 'duration_minutes': 30}
+    # ~111 km each way: reachable by noon but not back by 13:00
+    itinerary = service.plan_stops([far], CENTER, date(2026, 12, 1), 1, "09:00", "13:00")
+    assert itinerary['days'][0]['stops'] == []
+    assert [s['id'] for s in itinerary['unscheduled']] == ['far']
+    itinerary = service.plan_stops([far], CENTER, date(2026, 12, 1), 1, "06:00", "23:00")
+    assert [s['id'] for s in itinerary['days'][0]['stops']] == ['far']
+
+
+@pytest.mark.parametrize("window", [("12:00", "12:00"), ("18:00", "09:00")])
+def test_empty_or_inverted_day_is_rejected(service, window):
+    with pytest.raises(ValueError):
+        service.plan_stops(make_stops(np.random.default_rng(0), 3), CENTER, date(2026, 12, 1), 1, *window)
+
+
+def test_no_stops(service):
+    itinerary = service.plan_stops([], CENTER, date(2026, 12, 1), 2)
+    assert [day['stops'] for day in itinerary['days']] == [[], []]
+    assert itinerary['unscheduled'] == [] and itinerary['distance_km'] == 0
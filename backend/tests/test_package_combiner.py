@@ -0,0 +1,64 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from services.package_combiner import pareto_layers, top_k_combinations
+
+
+def brute_force(prices, values, k, budget=None, extra_price=0.0):
+    bundles = []
+    for indices in itertools.product(*(range(len(p)) for p in prices)):
+        total = sum(p[i] for p, i in zip(prices, indices)) + extra_price
+        if budget is not None and total > budget:
+            continue
+        utility = sum(v[i] for v, i in zip(values, indices)) - total
+        bundles.append((utility, total))
+    bundles.sort(key=lambda b: (-b[0], b[1]))
+    return bundles[:k]
+
+
+def make_categories(rng, sizes):
+    prices = [rng.uniform(50, 1500, size=n).round(2) for n in sizes]
+    values = [(p * rng.uniform(0.7, 1.3) + rng.normal(0, 150, size=p.size)).round(2) for p in prices]
+    return prices, values
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("k, budget", [(1, None), (5, None), (5, 2000.0), (10, 1200.0)])
+def test_matches_brute_force(seed, k, budget):
+    rng = np.random.default_rng(seed)
+    prices, values = make_categories(rng, rng.integers(1, 15, size=rng.integers(1, 4)))
+    extra_price = float(rng.choice([0.0, 75.5]))
+
+    result = top_k_combinations(prices, values, k, budget=budget, extra_price=extra_price)
+    expected = brute_force(prices, values, k, budget, extra_price)
+
+    assert len(result) == len(expected)
+    assert [c.utility for c in result] == pytest.approx([utility for utility, _ in expected])
+    assert [c.total_price for c in result] == pytest.approx([total for _, total in expected])
+    for combination in result:
+        total = sum(p[i] for p, i in zip(prices, combination.indices)) + extra_price
+        assert combination.total_price == pytest.approx(total)
+        if budget is not None:
+            assert combination.total_price <= budget
+
+
+def test_nothing_within_budget():
+    assert top_k_combinations([[500.0, 600.0], [400.0]], [[0.0, 0.0], [0.0]], 3, budget=800.0) == []
+
+
+def test_empty_category_or_k():
+    assert top_k_combinations([[100.0], []], [[0.0], []], 3) == []
+    assert top_k_combinations([[100.0]], [[0.0]], 0) == []
+
+
+def test_pareto_layers_keep_every_option_that_can_rank():
+    rng = np.random.default_rng(3)
+    prices = rng.uniform(0, 100, size=200)
+    utility = rng.uniform(0, 100, size=200)
+    kept = set(pareto_layers(prices, utility, 3).tolist())
+    for i in range(prices.size):
+        dominating = np.sum((prices <= prices[i]) & (utility >= utility[i]) & ((prices < prices[i]) | (utility > utility[i])))
+        if dominating < 3:
+            assert i in kept
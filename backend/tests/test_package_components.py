@@ -0,0 +1,124 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from core.config import settings
+from models.package import Package, PackageCreate
+from models.trip import Trip
+from models.user import User
+from repositories.package_component_repository import get_component_cache, register_listeners
+from repositories.package_repository import PackageRepository
+
+FLIGHTS = [{'id': f"f{i}", 'price': 400.0 + i, 'carrier': 'QR'} for i in range(3)]
+HOTELS = [{'id': f"h{i}", 'price': 900.0 + i, 'amenities': ['pool']} for i in range(4)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'PACKAGE_COMPONENT_DEDUP', True)
+    register_listeners()
+    engine = create_engine(f"sqlite:///{tmp_path / 'packages.db'}")
+    SQLModel.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    user = User(email="components@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    trip = Trip(user_id=user.id, origin_code="SFO", origin_name="San Francisco", destination_code="DOH",
+                destination_name="Doha", start_date=date(2026, 12, 1), end_date=date(2026, 12, 8), budget=5000)
+    db.add(trip)
+    db.commit()
+    PackageRepository().create_many(db, [
+        PackageCreate(trip_id=trip.id, total_price=1500.0 + i, score=5.0, explanation="",
+                      flight_data=FLIGHTS[i % 3], hotel_data=HOTELS[i % 4], car_data=None)
+        for i in range(24)
+    ])
+    trip_id = trip.id
+    db.close()
+
+    component_queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "package_components" in statement:
+            component_queries.append(statement)
+
+    get_component_cache().clear()
+    yield Session, trip_id, component_queries
+    get_component_cache().clear()
+    engine.dispose()
+
+
+def test_components_are_stored_once_and_referenced(store):
+    Session, trip_id, _ = store
+    db = Session()
+    rows = db.execute(Package.__table__.select()).all()
+    assert len(rows) == 24
+    assert all(row.flight_data is None and row.flight_ref for row in rows)
+    assert len({row.flight_ref for row in rows}) == 3 and len({row.hotel_ref for row in rows}) == 4
+    db.close()
+
+
+def test_list_query_hydrates_with_one_component_fetch(store):
+    Session, trip_id, component_queries = store
+    db = Session()
+    packages = PackageRepository().get_trip_packages(db, trip_id)
+    assert len(packages) == 24
+    assert len(component_queries) == 1
+    for package in packages:
+        index = int(round(package.total_price - 1500.0))
+        assert package.flight_data == FLIGHTS[index % 3]
+        assert package.hotel_data == HOTELS[index % 4]
+        assert package.car_data is None
+    assert not db.dirty
+    db.close()
+
+    # Warm LRU: no component query at all
+    db = Session()
+    PackageRepository().get_trip_packages(db, trip_id)
+    assert len(component_queries) == 1
+    db.close()
+
+
+def test_streamed_and_refreshed_packages_are_hydrated(store):
+    Session, trip_id, _ = store
+    db = Session()
+    streamed = list(db.query(Package).filter(Package.trip_id == trip_id).yield_per(5))
+    assert all(package.flight_data in FLIGHTS for package in streamed)
+    package = streamed[0]
+    db.expire(package)
+    assert package.hotel_data in HOTELS
+    db.close()
+
+
+def test_get_by_id_after_commit(store):
+    Session, trip_id, _ = store
+    db = Session()
+    package = PackageRepository().get_trip_packages(db, trip_id, limit=1)[0]
+    package.hotel_data = {'id': 'new', 'price': 1.0}
+    db.add(package)
+    db.commit()
+    assert package.hotel_data == {'id': 'new', 'price': 1.0}
+    db.close()
+    db = Session()
+    assert PackageRepository().get_by_id(db, package.id).hotel_data == {'id': 'new', 'price': 1.0}
+    db.close()
+
+
+def test_only_package_queries_are_buffered(store, monkeypatch):
+    Session, trip_id, _ = store
+    import repositories.package_component_repository as components
+    hydrated = []
+    repository = components.get_component_repository()
+    monkeypatch.setattr(repository, 'hydrate', lambda db, packages: hydrated.append(len(packages)))
+
+    db = Session()
+    assert db.query(User).count() == 1
+    assert db.query(Trip).filter(Trip.id == trip_id).one().destination_code == "DOH"
+    assert hydrated == []
+    assert len(db.query(Package).all()) == 24
+    assert hydrated == [24]
+    db.close()
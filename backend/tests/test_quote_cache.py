@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date
+
+from providers import BaseProvider, MemoryQuoteStore, ProviderQuery, QuoteCache
+
+
+class FilteringHotels(BaseProvider):
+    """Applies the budget and amenities itself, like InventoryHotelProvider."""
+    name = "filtering_hotels"
+    kind = "hotel"
+    cache_key_fields = ("budget", "hotel_amenities")
+
+    def __init__(self):
+        self.calls = 0
+
+    async def search(self, query):
+        self.calls += 1
+        if query.budget is not None and query.budget < 500:
+            return []
+        return [{"id": "h1", "provider": self.name, "price": 400.0, "description": "Pool hotel", "deeplink": ""}]
+
+
+class PlainHotels(FilteringHotels):
+    name = "plain_hotels"
+    cache_key_fields = ()
+
+
+def query(**fields):
+    return ProviderQuery(origin_code="SFO", destination_code="DOH", start_date=date(2026, 12, 1),
+                         end_date=date(2026, 12, 8), adults=2, **fields)
+
+
+def test_filtered_results_are_not_shared_across_budgets_or_amenities():
+    async def run():
+        cache, provider = QuoteCache(MemoryQuoteStore()), FilteringHotels()
+        cheap = await cache.search(provider, query(budget=100))
+        rich = await cache.search(provider, query(budget=20000, hotel_amenities=["pool"]))
+        same = await cache.search(provider, query(budget=20000, hotel_amenities=[" POOL"]))
+        return cheap, rich, same, provider.calls
+
+    cheap, rich, same, calls = asyncio.run(run())
+    assert cheap == ([], "miss")
+    assert rich[1] == "miss" and len(rich[0]) == 1
+    assert same[1] == "hit"
+    assert calls == 2
+
+
+def test_key_ignores_fields_the_provider_does_not_filter_on():
+    assert QuoteCache.key(PlainHotels(), query(budget=100)) == QuoteCache.key(PlainHotels(), query(budget=20000, hotel_amenities=["pool"]))
+    assert QuoteCache.key(FilteringHotels(), query(hotel_amenities=["wifi", "Pool"])) == \
+        QuoteCache.key(FilteringHotels(), query(hotel_amenities=["pool", "wifi"]))
+    assert QuoteCache.key(FilteringHotels(), query(budget=100)) != QuoteCache.key(FilteringHotels(), query(budget=200))
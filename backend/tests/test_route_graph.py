@@ -0,0 +1,81 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from providers.route_graph import MINUTES_PER_DAY, RouteGraph
+
+MAX_STOPS = 2
+MIN_CONNECTION = 45
+MAX_LAYOVER = 6 * 60
+
+
+def make_graph(seed: int, airports: int = 12, routes: int = 45) -> RouteGraph:
+    rng = np.random.default_rng(seed)
+    codes = [f"A{i:02d}" for i in range(airports)]
+    pairs = [p for p in itertools.permutations(range(airports), 2)]
+    rows = []
+    for n in rng.choice(len(pairs), size=routes, replace=False):
+        a, b = pairs[n]
+        duration = int(rng.integers(45, 600))
+        for departure in rng.choice(np.arange(0, MINUTES_PER_DAY, 15), size=int(rng.integers(1, 4)), replace=False):
+            rows.append((codes[a], codes[b], int(departure), duration, round(float(rng.uniform(40, 900)), 2), "XX", f"XX{n}-{departure}"))
+    return RouteGraph.from_rows(rows)
+
+
+def brute_force(graph: RouteGraph, origin: str, destination: str):
+    """Pareto set (price, duration, stops) of every itinerary within the limits, by exhaustive enumeration."""
+    source, target = graph.index[origin], graph.index[destination]
+    found = []
+
+    def extend(node, first, arrive, price, stops):
+        if node == target:
+            found.append((round(price, 2), arrive - first, stops))
+            return
+        if stops >= MAX_STOPS:
+            return
+        for edge, departure in graph._departures(node, arrive + MIN_CONNECTION, arrive + MAX_LAYOVER):
+            if graph.destination[edge] != source:
+                extend(graph.destination[edge], first, departure + graph.duration[edge], price + graph.fare[edge], stops + 1)
+
+    for edge, departure in graph._departures(source, 0, MINUTES_PER_DAY - 1):
+        extend(graph.destination[edge], departure, departure + graph.duration[edge], graph.fare[edge], 0)
+
+    front = []
+    for candidate in sorted(found):
+        if not any(f[0] <= candidate[0] and f[1] <= candidate[1] and f[2] <= candidate[2] for f in front):
+            front.append(candidate)
+    return front
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_pareto_set_matches_exhaustive_enumeration(seed):
+    graph = make_graph(seed)
+    connecting = 0
+    for origin, destination in itertools.permutations(graph.codes, 2):
+        itineraries = graph.search(origin, destination, max_stops=MAX_STOPS,
+                                   min_connection=MIN_CONNECTION, max_layover=MAX_LAYOVER)
+        expected = brute_force(graph, origin, destination)
+        assert [(i.price, i.duration, i.stops) for i in itineraries] == expected, (origin, destination)
+        connecting += any(stops for _, _, stops in expected)
+    assert connecting
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_itineraries_are_connected_within_limits(seed):
+    graph = make_graph(seed)
+    for origin, destination in itertools.permutations(graph.codes, 2):
+        for itinerary in graph.search(origin, destination, max_stops=MAX_STOPS,
+                                      min_connection=MIN_CONNECTION, max_layover=MAX_LAYOVER):
+            assert itinerary.legs[0].origin == origin and itinerary.legs[-1].destination == destination
+            assert itinerary.stops <= MAX_STOPS
+            assert itinerary.price == pytest.approx(sum(leg.fare for leg in itinerary.legs))
+            for previous, leg in zip(itinerary.legs, itinerary.legs[1:]):
+                assert leg.origin == previous.destination
+                assert MIN_CONNECTION <= leg.depart - previous.arrive <= MAX_LAYOVER
+
+
+def test_unknown_or_same_airport():
+    graph = make_graph(0)
+    assert graph.search("A00", "ZZZ") == []
+    assert graph.search("A00", "A00") == []